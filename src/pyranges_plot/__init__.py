@@ -10,8 +10,12 @@ from .core import (
     print_options,  # noqa: F401
     set_options,  # noqa: F401
     reset_options,  # noqa: F401
+    set_cache,  # noqa: F401
+    get_cache_info,  # noqa: F401
 )
-from .plot_main import plot  # noqa: F401
+from .plot_main import plot, prepare, PreparedPlot  # noqa: F401
+from .export import export_many, shutdown_export_pool  # noqa: F401
+from .region_index import RegionIndex  # noqa: F401
 from .pr_register_plot import register_plot  # noqa: F401
 from .example_data import p1, p2, p3, p_ala, p_cys, ncbi_gff, ncbi_vcf  # noqa: F401
 from . import vcf  # noqa: F401
@@ -1,8 +1,7 @@
 import pandas as pd
 import importlib
-from pyranges.core.names import END_COL
-
-from .names import CUM_DELTA_COL
+import hashlib
+from collections import OrderedDict
 from .plot_features import (
     plot_features_dict,
     plot_features_dict_in_use,
@@ -63,7 +62,9 @@ def set_engine(name):
     Parameters
     ----------
     name: str
-        Indicates if Matplotlib ('plt', 'matplotlib') or Plotly ('ply', 'plotly') should be used.
+        Indicates if Matplotlib ('plt', 'matplotlib'), Plotly ('ply', 'plotly'), the raster engine ('raster') or
+        the SVG engine ('svg') should be used. The raster engine writes PNG images without text and the SVG engine
+        writes SVG files.
 
     Examples
     --------
@@ -115,6 +116,122 @@ def get_warnings():
     return WARNINGS
 
 
+# prepared data cache
+CACHE_MAX_ENTRIES = 0
+CACHE_MAX_SIZE = None
+_prepare_cache = OrderedDict()
+_cache_stats = {"hits": 0, "misses": 0, "size": 0}
+
+
+def set_cache(max_entries=32, max_size=None):
+    """
+    Defines the cache of prepared data, reused when the same data is plotted with the same options.
+
+    Data is compared by the content of the columns used by the prepare options and the ones given as its
+    columns, so changes in other columns reuse the stored plot. The least recently used entries are
+    discarded when the number of entries or their memory size exceed the given maximums. The cache is
+    disabled by default.
+
+    Parameters
+    ----------
+    max_entries: int, default 32
+
+         Maximum number of prepared plots kept. Use 0 to disable and empty the cache.
+
+    max_size: int, default None
+
+         Maximum memory size of the prepared plots kept in bytes. When None, the size is not limited.
+
+    Examples
+    --------
+    >>> import pyranges_plot as prp
+
+    >>> prp.set_cache(max_entries=10, max_size=500_000_000)
+
+    >>> prp.set_cache(0)
+
+    """
+
+    global CACHE_MAX_ENTRIES, CACHE_MAX_SIZE
+    CACHE_MAX_ENTRIES = max_entries
+    CACHE_MAX_SIZE = max_size
+
+    # reset counters and fit the stored entries to the new limits
+    _cache_stats["hits"] = 0
+    _cache_stats["misses"] = 0
+    cache_evict()
+
+
+def get_cache_info():
+    """Returns the state of the prepared data cache: hits, misses, entries, size and limits."""
+
+    return {
+        "hits": _cache_stats["hits"],
+        "misses": _cache_stats["misses"],
+        "entries": len(_prepare_cache),
+        "size": _cache_stats["size"],
+        "max_entries": CACHE_MAX_ENTRIES,
+        "max_size": CACHE_MAX_SIZE,
+    }
+
+
+def cache_key(data, options, columns=None):
+    """Provide a hash of the content of the given data columns, all if None, and the options, None if not cached or not hashable."""
+
+    if not CACHE_MAX_ENTRIES:
+        return None
+
+    key = hashlib.sha1(repr(sorted(options.items(), key=str)).encode())
+    try:
+        for df in data:
+            cols = [c for c in df.columns if columns is None or c in columns]
+            key.update(repr([(c, str(df[c].dtype)) for c in cols]).encode())
+            for c in cols:
+                key.update(pd.util.hash_pandas_object(df[c], index=False).to_numpy())
+    except TypeError:  # unhashable values
+        return None
+
+    return key.hexdigest()
+
+
+def cache_get(key):
+    """Provide the cached prepared plot of the given key, if stored."""
+
+    if not CACHE_MAX_ENTRIES or key is None:
+        return None
+
+    if key in _prepare_cache:
+        _cache_stats["hits"] += 1
+        _prepare_cache.move_to_end(key)
+        return _prepare_cache[key][0]
+
+    _cache_stats["misses"] += 1
+    return None
+
+
+def cache_put(key, prepared, size):
+    """Store the prepared plot of the given key and memory size."""
+
+    if not CACHE_MAX_ENTRIES or key is None:
+        return
+
+    if key in _prepare_cache:
+        _cache_stats["size"] -= _prepare_cache.pop(key)[1]
+    _prepare_cache[key] = (prepared, size)
+    _cache_stats["size"] += size
+    cache_evict()
+
+
+def cache_evict():
+    """Discard the least recently used entries exceeding the cache limits."""
+
+    while _prepare_cache and (
+        len(_prepare_cache) > CACHE_MAX_ENTRIES
+        or (CACHE_MAX_SIZE is not None and _cache_stats["size"] > CACHE_MAX_SIZE)
+    ):
+        _cache_stats["size"] -= _prepare_cache.popitem(last=False)[1][1]
+
+
 theme = None
 
 
@@ -393,6 +510,8 @@ def print_options(return_keys=False):
                     "v_spacer",
                     "text_size",
                     "text_pad",
+                    "text_mode",
+                    "text_cull",
                     "arrow_line_width",
                     "arrow_color",
                     "arrow_size",
@@ -402,7 +521,15 @@ def print_options(return_keys=False):
         ].copy()
 
         other_feat_df = feat_df[
-            feat_df.index.isin(["shrink_threshold", "plotly_port"])
+            feat_df.index.isin(
+                [
+                    "shrink_threshold",
+                    "plotly_port",
+                    "dash_lod",
+                    "file_dpi",
+                    "file_rasterized",
+                ]
+            )
         ].copy()
 
         # Create table rows
@@ -433,19 +560,3 @@ def print_options(return_keys=False):
 
     if return_keys:
         return set(plot_features_dict_in_use.keys())
-
-
-def cumdelting(num_l, ts_data, chrom):
-    """Update a list of coordinates according to cumdelta."""
-
-    for i in range(len(num_l)):
-        cdel = 0
-        # get proper cumdelta
-        for ix, row in ts_data[chrom].iterrows():
-            if row[END_COL] <= num_l[i]:
-                cdel = row[CUM_DELTA_COL]
-            else:
-                break
-        num_l[i] -= cdel
-
-    return num_l
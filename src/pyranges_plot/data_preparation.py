@@ -1,5 +1,8 @@
+import heapq
+import re
+import string
 import numpy as np
-from intervaltree import IntervalTree
+import pandas as pd
 import pyranges as pr
 from pyranges.core.names import CHROM_COL, START_COL, END_COL
 
@@ -28,7 +31,7 @@ from .names import (
     COLOR_TAG_COL,
     BORDER_COLOR_COL,
 )
-from .core import cumdelting, get_engine, get_warnings, check4dependency
+from .core import get_engine, get_warnings, check4dependency
 from .matplotlib_base.core import plt_popup_warning
 
 
@@ -56,6 +59,61 @@ def compute_tpad(df, chrmd_df_grouped):
     return df
 
 
+############ LIMITS FILTER
+def limits_filter(df, limits, id_col, margin=0):
+    """Keep the genes overlapping the limits of their chromosome, widened by the margin fraction of the range."""
+
+    if limits is None:
+        return df
+
+    # limits of each chromosome
+    if type(limits) is tuple:
+        chrom_limits = dict.fromkeys(df[CHROM_COL].drop_duplicates(), limits)
+    elif type(limits) is pr.PyRanges:
+        chrom_limits = {
+            chrom: (row[START_COL], row[END_COL])
+            for chrom, row in limits.groupby(CHROM_COL, observed=True)
+            .agg({START_COL: "min", END_COL: "max"})
+            .iterrows()
+        }
+    else:
+        chrom_limits = limits
+
+    # not given limits do not filter
+    chrom_ix, chroms = df[CHROM_COL].factorize()
+    lim_min = np.full(len(chroms), -np.inf)
+    lim_max = np.full(len(chroms), np.inf)
+    for i, chrom in enumerate(chroms):
+        minmax_t = chrom_limits.get(chrom)
+        if minmax_t is None:
+            continue
+        if minmax_t[0] is not None and not np.isnan(minmax_t[0]):
+            lim_min[i] = minmax_t[0]
+        if minmax_t[1] is not None and not np.isnan(minmax_t[1]):
+            lim_max[i] = minmax_t[1]
+
+    # margin of the plot range, open sides given by the data of the chromosome
+    if margin:
+        data_min = np.full(len(chroms), np.inf)
+        data_max = np.full(len(chroms), -np.inf)
+        np.minimum.at(data_min, chrom_ix, df[START_COL].to_numpy())
+        np.maximum.at(data_max, chrom_ix, df[END_COL].to_numpy())
+        lo = np.where(np.isinf(lim_min), data_min, lim_min)
+        hi = np.where(np.isinf(lim_max), data_max, lim_max)
+        lim_min = lim_min - margin * (hi - lo)
+        lim_max = lim_max + margin * (hi - lo)
+
+    # whole genes are kept so their introns are still connected
+    by_gene = df.groupby([CHROM_COL] + id_col, observed=True, dropna=False)
+    gene_start = by_gene[START_COL].transform("min").to_numpy()
+    gene_end = by_gene[END_COL].transform("max").to_numpy()
+    keep = (gene_end > lim_min[chrom_ix]) & (gene_start < lim_max[chrom_ix])
+
+    if keep.all():
+        return df
+    return df[keep].copy()
+
+
 ############ SUBSET
 def make_subset(df, id_col, max_shown):
     """Reduce the number of genes to work with."""
@@ -76,30 +134,165 @@ def make_subset(df, id_col, max_shown):
     return subdf, tot_ngenes
 
 
+############ TRANSCRIPT STRUCTURE
+def split_utr(df, id_col):
+    """Replace the exon intervals by their parts not covered by the CDS of the same transcript."""
+
+    gene_ix = (
+        df.groupby([CHROM_COL, PR_INDEX_COL] + id_col, observed=True, dropna=False)
+        .ngroup()
+        .to_numpy()
+    )
+    starts = df[START_COL].to_numpy()
+    ends = df[END_COL].to_numpy()
+    is_cds = (df["Feature"] == "CDS").to_numpy()
+    if not is_cds.any():
+        return df
+    span = int(ends.max()) + 1
+
+    # CDS union of each transcript as sorted blocks, coordinates offset to keep transcripts apart
+    cds = np.flatnonzero(is_cds)
+    cds = cds[np.lexsort((starts[cds], gene_ix[cds]))]
+    c_starts = gene_ix[cds] * span + starts[cds]
+    c_ends = np.maximum.accumulate(gene_ix[cds] * span + ends[cds])
+    new_block = np.concatenate([[True], c_starts[1:] > c_ends[:-1]])
+    block_starts = c_starts[new_block]
+    block_ends = c_ends[np.append(np.flatnonzero(new_block)[1:] - 1, len(cds) - 1)]
+
+    # CDS blocks overlapping each exon split it in one more piece than blocks
+    e_starts = gene_ix * span + starts
+    e_ends = gene_ix * span + ends
+    lo = np.searchsorted(block_ends, e_starts, side="right")
+    hi = np.searchsorted(block_starts, e_ends, side="left")
+    n_pieces = np.where(is_cds, 1, np.maximum(hi - lo, 0) + 1)
+    rows = np.repeat(np.arange(len(df)), n_pieces)
+    j = np.arange(len(rows)) - np.repeat(np.cumsum(n_pieces) - n_pieces, n_pieces)
+
+    # exon pieces go from the end of a block to the start of the next one
+    offset = gene_ix[rows] * span
+    first = j == 0
+    last = j == n_pieces[rows] - 1
+    piece_starts = np.where(
+        first | is_cds[rows],
+        starts[rows],
+        block_ends[np.minimum(lo[rows] + j - 1, len(block_ends) - 1)] - offset,
+    )
+    piece_ends = np.where(
+        last | is_cds[rows],
+        ends[rows],
+        block_starts[np.minimum(lo[rows] + j, len(block_starts) - 1)] - offset,
+    )
+    piece_starts = np.maximum(piece_starts, starts[rows])
+    piece_ends = np.minimum(piece_ends, ends[rows])
+
+    # exons entirely within the CDS are removed
+    keep = piece_ends > piece_starts
+    df = df.take(rows[keep])
+    df[START_COL] = piece_starts[keep]
+    df[END_COL] = piece_ends[keep]
+
+    return df
+
+
+############ TEMPLATES
+def format_template(template, df):
+    """Format the template string with the values of the df columns, column-wise."""
+
+    # template fields must refer to column names
+    parsed = list(string.Formatter().parse(template))
+    if any(field is not None and field not in df.columns for _, field, _, _ in parsed):
+        return np.array(
+            [template.format(**row) for row in df.to_dict("records")], dtype=object
+        )
+
+    result = np.full(len(df), "", dtype=object)
+    for literal, field, spec, conversion in parsed:
+        result += literal
+        if field is None:
+            continue
+        values = df[field]
+        if conversion:
+            conv = {"r": repr, "s": str, "a": ascii}[conversion]
+            values = values.map(conv)
+        if spec:
+            result += np.array([format(v, spec) for v in values], dtype=object)
+        else:
+            result += values.astype(str).to_numpy(dtype=object)
+
+    return result
+
+
+def format_tooltips(tooltip, df, newline="<br>"):
+    """Format the tooltip of each row, taking the template from a column if given as '$column', with line breaks as newline."""
+
+    # template taken from a column, format rows sharing template together
+    if tooltip.startswith("$") and tooltip[1:] in df.columns:
+        tooltips = np.empty(len(df), dtype=object)
+        template_ixs = df.groupby(tooltip[1:], observed=True).indices
+        for template, ix in template_ixs.items():
+            tooltips[ix] = format_template(template, df.iloc[ix])
+    else:
+        tooltips = format_template(tooltip, df)
+
+    # line breaks given as newlines or html breaks written in the engine's way
+    other = "\n" if newline == "<br>" else "<br>"
+    return pd.Series(tooltips, dtype=object).str.replace(other, newline).to_numpy()
+
+
+def template_columns(template):
+    """Provide the names of the columns referred in the fields of a template string."""
+
+    # fields can be sliced or have attributes, as in '{col[:4]}'
+    return [
+        re.split(r"[.\[]", field)[0]
+        for _, field, _, _ in string.Formatter().parse(template)
+        if field
+    ]
+
+
 ############ GENESMD_DF
 
 
 ###packed
 def genesmd_packed(genesmd_df):
-    """xxx"""
-
-    # Initialize IntervalTree and used y-coordinates list
-    trees = [IntervalTree()]
+    """Assign to each gene, swept by start within its chromosome and pr, the lowest row free at its start."""
 
-    def find_tree(row):
-        for tree in trees:
-            if not tree.overlaps(row[START_COL], row[END_COL]):
-                return tree
-        trees.append(IntervalTree())
-        return trees[-1]
+    group = (
+        genesmd_df.groupby([CHROM_COL, PR_INDEX_COL], observed=True).ngroup().to_numpy()
+    )
+    starts = genesmd_df[START_COL].to_numpy()
+    ends = genesmd_df[END_COL].to_numpy()
+    ycoord = np.empty(len(genesmd_df), dtype=int)
+
+    # rows in use as a heap of (end, row), rows freed before the next start as a heap of rows
+    prev_group = None
+    sweep = np.lexsort((starts, group))
+    for ix, g, start, end in zip(
+        sweep.tolist(),
+        group[sweep].tolist(),
+        starts[sweep].tolist(),
+        ends[sweep].tolist(),
+    ):
+        if g != prev_group:
+            prev_group = g
+            busy = []
+            free = []
+            n_rows = 0
+
+        while busy and busy[0][0] <= start:
+            heapq.heappush(free, heapq.heappop(busy)[1])
+        if free:
+            row = heapq.heappop(free)
+        else:
+            row = n_rows
+            n_rows += 1
+        heapq.heappush(busy, (end, row))
+        ycoord[ix] = row
 
-    # Assign y-coordinates
-    for idx, row in genesmd_df.iterrows():
-        tree = find_tree(row)
-        tree.addi(row[START_COL], row[END_COL], idx)
-        genesmd_df.at[idx, "ycoord"] = trees.index(tree)
+    genesmd_df["ycoord"] = ycoord
 
-    return genesmd_df
+    # keep genes grouped by chromosome and pr
+    return genesmd_df.iloc[np.argsort(group, kind="stable")]
 
 
 def update_y(genesmd_df, exon_height, v_spacer):
@@ -295,12 +488,11 @@ def get_genes_metadata(df, id_col, color_col, packed, exon_height, v_spacer):
         ["chrix", PR_INDEX_COL], group_keys=False, observed=True
     ).cumcount()
 
-    # Assign y-coordinate to genes
-    if packed:
-        genesmd_df["ycoord"] = -1
-        genesmd_df = genesmd_df.groupby(
-            [CHROM_COL, PR_INDEX_COL], group_keys=False, observed=True
-        ).apply(genesmd_packed)  # add packed ycoord column
+    # Assign y-coordinate to genes, none left by the limits
+    if genesmd_df.empty:
+        genesmd_df["ycoord"] = 0
+    elif packed:
+        genesmd_df = genesmd_packed(genesmd_df)  # add packed ycoord column
         genesmd_df.reset_index(level=CHROM_COL, inplace=True)
         genesmd_df = genesmd_df.groupby(CHROM_COL, observed=True).apply(
             lambda x: update_y(x, exon_height, v_spacer)
@@ -392,7 +584,7 @@ def chrmd_limits(chrmd_df, limits):
         ]  # fills with None the chromosomes not specified
 
 
-def fill_min_max(row, ts_data):
+def fill_min_max(row, shrink_tf_d):
     """Complete min_max column for chromosome metadata if needed."""
 
     minmax_t = row["min_max"]
@@ -403,17 +595,22 @@ def fill_min_max(row, ts_data):
     # check both items and put default if necessary
     minmax_l = list(minmax_t)
 
+    # consider introns off for given limits
+    chrom = row.name[0]
+    if shrink_tf_d and chrom in shrink_tf_d:
+        minmax_l = [
+            lim
+            if lim is None or np.isnan(lim)
+            else shrink_tf_d[chrom].shrink(lim).item()
+            for lim in minmax_l
+        ]
+
     # add default to lower limit
     if minmax_l[0] is None or np.isnan(minmax_l[0]):
         minmax_l[0] = row["min"]
     # add default to higher limit
     if minmax_l[1] is None or np.isnan(minmax_l[1]):
         minmax_l[1] = row["max"]
-    # consider introns off for higher limit
-    else:
-        if len(row) == 5:
-            new_upper_lim = cumdelting([minmax_l[1]], ts_data, row.name[0], row.name[1])
-            minmax_l[1] = new_upper_lim[0]
 
     # put plot coordinates in min_max
     row["min_max"] = minmax_l
@@ -421,9 +618,16 @@ def fill_min_max(row, ts_data):
 
 
 def get_chromosome_metadata(
-    df, limits, genesmd_df, packed, v_spacer, exon_height, ts_data=None
+    df,
+    limits,
+    genesmd_df,
+    packed,
+    v_spacer,
+    exon_height,
+    shrink_tf_d=None,
+    empty_chroms=None,
 ):
-    """Create chromosome metadata df."""
+    """Create chromosome metadata df, including the chromosomes left without genes by the limits."""
 
     # Start df
     agg_funcs = {
@@ -438,6 +642,14 @@ def get_chromosome_metadata(
         inplace=True,
     )
 
+    # chromosomes without genes in the limits, spanning their data
+    if empty_chroms is not None:
+        empty_df = empty_chroms.set_index([CHROM_COL, PR_INDEX_COL]).rename(
+            columns={START_COL: "min", END_COL: "max"}
+        )
+        empty_df["n_genes"] = 0
+        chrmd_df = pd.concat([chrmd_df, empty_df]).sort_index()
+
     # Adjust limits in case +1 pr
     if len(df[PR_INDEX_COL].drop_duplicates()) > 1:
         chrmd_df["min"] = chrmd_df.groupby(CHROM_COL, group_keys=False, observed=True)[
@@ -449,7 +661,7 @@ def get_chromosome_metadata(
 
     # Add limits
     chrmd_limits(chrmd_df, limits)  # unknown limits are nan
-    chrmd_df = chrmd_df.apply(lambda x: fill_min_max(x, ts_data), axis=1)
+    chrmd_df = chrmd_df.apply(lambda x: fill_min_max(x, shrink_tf_d), axis=1)
 
     chrmd_df_grouped = (
         chrmd_df.reset_index(level=PR_INDEX_COL)
@@ -470,6 +682,7 @@ def get_chromosome_metadata(
         genesmd_df.groupby([CHROM_COL], group_keys=False, observed=True)["ycoord"].max()
     )
     chrmd_df_grouped.rename(columns={"ycoord": "y_height"}, inplace=True)
+    chrmd_df_grouped["y_height"] = chrmd_df_grouped["y_height"].fillna(0)
     chrmd_df_grouped["y_height"] += (
         0.5 + exon_height / 2
     )  # the middle of the rectangle is +.5 of ycoord
@@ -481,6 +694,7 @@ def get_chromosome_metadata(
         ].max()
     )
     chrmd_df.rename(columns={"ycoord": "pr_line"}, inplace=True)
+    chrmd_df["pr_line"] = chrmd_df["pr_line"].fillna(0)
     chrmd_df["pr_line"] = chrmd_df.groupby(CHROM_COL, observed=True)["pr_line"].shift(
         -1, fill_value=-(0.5 + exon_height / 2 + v_spacer)
     )
@@ -0,0 +1,567 @@
+import numpy as np
+import pandas as pd
+from pyranges.core.names import CHROM_COL, START_COL, END_COL, STRAND_COL
+
+from .names import (
+    PR_INDEX_COL,
+    ORISTART_COL,
+    ORIEND_COL,
+    ADJSTART_COL,
+    ADJEND_COL,
+    EXON_IX_COL,
+    TEXT_PAD_COL,
+    COLOR_INFO,
+    COLOR_TAG_COL,
+    BORDER_COLOR_COL,
+    THICK_COL,
+    TOOLTIP_COL,
+)
+from .data_preparation import format_template
+from .introns_off import get_introns
+
+# Columns of every display list table giving the drawing order of its items
+ORDER_COLS = ["gene", "stage", "item", "part", "sub"]
+
+
+def make_display_list(
+    subdf,
+    genesmd_df,
+    chrmd_df_grouped,
+    ts_data,
+    id_col,
+    feat_dict,
+    transcript_str=False,
+    depth_col=None,
+    text=True,
+    file_size=(1600, 800),
+):
+    """
+    Convert the prepared data to tables of the items to plot, shared by the engines.
+
+    Parameters
+    ----------
+    subdf, genesmd_df, chrmd_df_grouped, ts_data
+        Prepared intervals, genes and chromosomes metadata and to-shrink regions.
+
+    id_col: list
+        Columns containing the gene ID.
+
+    feat_dict: dict
+        Plot features, the ones for introns, exons and arrows are used.
+
+    transcript_str, depth_col, text
+        Same as in the plot function.
+
+    file_size: tuple, default (1600, 800)
+        Width and height of the figure in px, used to estimate the space taken by the labels when
+        text_cull is set.
+
+    Returns
+    -------
+    dict
+        One DataFrame per kind of item ("genes", "introns", "exons", "arrows" and "labels") with the
+        subplot index (chrom_ix), the gene index (gene) and data coordinates of each item. The ORDER_COLS
+        columns give the drawing order of all the items, each table is sorted by them.
+    """
+
+    arrow_size = feat_dict["arrow_size"]
+    exon_height = feat_dict["exon_height"]
+    intron_color = feat_dict["intron_color"]
+    v_spacer = feat_dict["v_spacer"]
+
+    # genes in plotting order, rows with unknown id are not plotted
+    by_gene = subdf.groupby(id_col + [PR_INDEX_COL, CHROM_COL], observed=True)
+    gene_ix = by_gene.ngroup().to_numpy()
+    gene_keys = by_gene.size().index
+    known = ~pd.isna(gene_ix)
+    if not known.all():
+        subdf = subdf[known]
+        gene_ix = gene_ix[known]
+    gene_ix = gene_ix.astype(int)
+    n_genes = len(gene_keys)
+
+    # rows of each gene keeping the data order
+    gene_rows = np.argsort(gene_ix, kind="stable")
+    gene_bounds = np.searchsorted(gene_ix[gene_rows], np.arange(n_genes + 1))
+    first = gene_rows[gene_bounds[:-1]]
+
+    starts = subdf[START_COL].to_numpy().astype(int)
+    ends = subdf[END_COL].to_numpy().astype(int)
+    ori_starts = subdf[ORISTART_COL].to_numpy()
+    ori_ends = subdf[ORIEND_COL].to_numpy()
+
+    # x range of each subplot to size the arrows
+    chrom_ix_s = chrmd_df_grouped["chrom_ix"]
+    x_rang = np.empty(len(chrom_ix_s))
+    for chrom, (x_min, x_max) in chrmd_df_grouped["min_max"].items():
+        rang = x_max - x_min
+        x_rang[chrom_ix_s[chrom]] = (x_max + 0.05 * rang) - (x_min - 0.05 * rang)
+    if isinstance(arrow_size, int):
+        arrow_size = arrow_size / x_rang
+    else:
+        arrow_size = np.full(len(x_rang), arrow_size)
+    incl = arrow_size / 2 * x_rang
+
+    # GENES
+    genes_chrom = subdf[CHROM_COL].to_numpy()[first]
+    md_keys = gene_keys.reorder_levels([CHROM_COL, PR_INDEX_COL] + id_col)
+    if len(id_col) == 1:
+        geneid = gene_keys.get_level_values(id_col[0]).astype(str)
+    else:
+        geneid = [str(list(key[: len(id_col)])) for key in gene_keys]
+    if STRAND_COL in subdf.columns:
+        strand = subdf[STRAND_COL].to_numpy()[first].astype(object)
+    else:
+        strand = np.full(n_genes, "", dtype=object)
+    genes = pd.DataFrame(
+        {
+            "chrom_ix": chrom_ix_s.to_numpy()[
+                chrom_ix_s.index.get_indexer(genes_chrom)
+            ],
+            "y": genesmd_df["ycoord"].reindex(md_keys).to_numpy() + 0.5,
+            "start": np.minimum.reduceat(starts[gene_rows], gene_bounds[:-1]),
+            "end": np.maximum.reduceat(ends[gene_rows], gene_bounds[:-1]),
+            "ori_start": np.minimum.reduceat(ori_starts[gene_rows], gene_bounds[:-1]),
+            "ori_end": np.maximum.reduceat(ori_ends[gene_rows], gene_bounds[:-1]),
+            "strand": strand,
+            "geneid": np.asarray(geneid, dtype=object),
+            "color": subdf[COLOR_INFO].to_numpy()[first],
+            "border": subdf[BORDER_COLOR_COL].to_numpy()[first],
+        }
+    )
+    if "vcf" in subdf.columns and "Tooltip_col" in subdf.columns:
+        genes["vcf"] = by_gene["vcf"].any().to_numpy()
+        genes["vcf_tooltip"] = subdf["Tooltip_col"].to_numpy()[first]
+    genes["gene"] = np.arange(n_genes)
+    genes["stage"] = genes["item"] = genes["part"] = genes["sub"] = 0
+    chrom_ix = genes["chrom_ix"].to_numpy()
+    y = genes["y"].to_numpy()
+
+    # only genes with known strand have arrows, drawn for + and - strands
+    strand_on = strand.astype(bool)
+    strand_sign = np.where(strand == "+", 1, np.where(strand == "-", -1, 0))
+
+    # INTRONS as the gaps between the intervals of each gene, by strand if valid in the gene
+    row_strand = 0
+    if STRAND_COL in subdf.columns:
+        valid = subdf[STRAND_COL].isin(["+", "-"]).to_numpy()
+        gene_valid = np.ones(n_genes, dtype=bool)
+        gene_valid[gene_ix[~valid]] = False
+        row_strand = (subdf[STRAND_COL] == "-").to_numpy() & gene_valid[gene_ix]
+    i_group, i_start, i_end = get_introns(gene_ix * 2 + row_strand, starts, ends)
+    i_gene = i_group // 2
+    i_item = np.arange(len(i_gene)) - np.searchsorted(i_gene, i_gene)
+
+    # to-shrink regions within each intron
+    n_ts = np.zeros(len(i_gene), dtype=int)
+    ts_first = np.zeros(len(i_gene), dtype=int)
+    ts_starts = [np.array([], dtype=int)]
+    ts_ends = [np.array([], dtype=int)]
+    offset = 0
+    for chrom, ts_chrom in ts_data.items():
+        in_chrom = genes_chrom[i_gene] == chrom
+        adj_starts = ts_chrom[ADJSTART_COL].to_numpy()
+        lo = np.searchsorted(adj_starts, i_start[in_chrom], side="left")
+        hi = np.searchsorted(adj_starts, i_end[in_chrom], side="left")
+        ts_first[in_chrom] = lo + offset
+        n_ts[in_chrom] = hi - lo
+        ts_starts.append(adj_starts)
+        ts_ends.append(ts_chrom[ADJEND_COL].to_numpy())
+        offset += len(ts_chrom)
+    ts_starts = np.concatenate(ts_starts)
+    ts_ends = np.concatenate(ts_ends)
+
+    # intron lines alternate fixed and shrunk pieces between the to-shrink regions limits
+    n_pts = 2 * n_ts + 2
+    pt_intron = np.repeat(np.arange(len(i_gene)), n_pts)
+    pt_pos = np.arange(n_pts.sum()) - np.repeat(np.cumsum(n_pts) - n_pts, n_pts)
+    pts = np.where(pt_pos == 0, i_start[pt_intron], i_end[pt_intron])
+    pts = pts.astype(np.result_type(pts, ts_starts))
+    inner = (pt_pos > 0) & (pt_pos < n_pts[pt_intron] - 1)
+    ts_ix = (pt_pos[inner] - 1) // 2 + ts_first[pt_intron[inner]]
+    pts[inner] = np.where(pt_pos[inner] % 2 == 1, ts_starts[ts_ix], ts_ends[ts_ix])
+
+    # pieces from each point to the next one within the intron
+    is_piece = pt_pos < n_pts[pt_intron] - 1
+    piece = np.flatnonzero(is_piece)
+    p_intron = pt_intron[piece]
+    p_sub = pt_pos[piece]
+    x0, x1 = pts[piece], pts[piece + 1]
+    # fixed pieces at the intron limits only if not empty
+    with_ts = n_ts[p_intron] > 0
+    first_piece = p_sub == 0
+    last_piece = p_sub == 2 * n_ts[p_intron]
+    keep = ~(with_ts & (first_piece | last_piece) & (x0 == x1))
+    p_gene = i_gene[p_intron][keep]
+    if intron_color is None:
+        p_color = genes["color"].to_numpy()[p_gene]
+    else:
+        p_color = [intron_color] * len(p_gene)
+    intron_lines = pd.DataFrame(
+        {
+            "chrom_ix": chrom_ix[p_gene],
+            "x0": x0[keep],
+            "x1": x1[keep],
+            "y": y[p_gene],
+            "shrunk": (p_sub % 2 == 1)[keep],
+            "color": p_color,
+            "gene": p_gene,
+            "stage": 1,
+            "item": i_item[p_intron][keep],
+            "part": 0,
+            "sub": p_sub[keep],
+        }
+    )
+
+    # arrows in introns longer than the arrow size
+    i_chrom_ix = chrom_ix[i_gene]
+    i_arrow = strand_on[i_gene] & (
+        arrow_size[i_chrom_ix] <= (i_end - i_start) / x_rang[i_chrom_ix]
+    )
+    dir_flag = np.zeros(n_genes, dtype=bool)
+    dir_flag[i_gene[i_arrow]] = True
+    intron_arrows = arrow_segments(
+        i_start[i_arrow],
+        i_end[i_arrow],
+        y[i_gene[i_arrow]],
+        np.full(i_arrow.sum(), exon_height),
+        incl[i_chrom_ix[i_arrow]],
+        strand_sign[i_gene[i_arrow]],
+    )
+    intron_arrows["chrom_ix"] = i_chrom_ix[i_arrow][intron_arrows["arrow"]]
+    intron_arrows["gene"] = i_gene[i_arrow][intron_arrows["arrow"]]
+    intron_arrows["stage"] = 1
+    intron_arrows["item"] = i_item[i_arrow][intron_arrows["arrow"]]
+    intron_arrows["part"] = 1
+
+    # EXONS, CDS before the rest of intervals and then by depth
+    row_keys = [np.arange(len(subdf))]
+    if transcript_str:
+        row_keys.append((subdf["Feature"] != "CDS").to_numpy())
+    if depth_col:
+        depth, _ = pd.factorize(subdf[depth_col], sort=True)
+        row_keys.append(np.where(depth < 0, depth.max() + 1, depth))
+    row_keys.append(gene_ix)
+    rows = np.lexsort(row_keys)
+    e_gene = gene_ix[rows]
+    e_chrom_ix = chrom_ix[e_gene]
+    e_height = subdf[THICK_COL].to_numpy()[rows]
+    gene_first_row = np.zeros(len(subdf), dtype=bool)
+    gene_first_row[first] = True
+    if TOOLTIP_COL in subdf.columns:
+        e_tooltip = subdf[TOOLTIP_COL].to_numpy()[rows]
+    else:
+        e_tooltip = np.full(len(rows), "", dtype=object)
+    exons = pd.DataFrame(
+        {
+            "chrom_ix": e_chrom_ix,
+            "x0": starts[rows],
+            "x1": ends[rows],
+            "y0": y[e_gene] - e_height / 2,
+            "y1": y[e_gene] + e_height / 2,
+            "height": e_height,
+            "ori_start": ori_starts[rows],
+            "ori_end": ori_ends[rows],
+            "color": subdf[COLOR_INFO].to_numpy()[rows],
+            "border": subdf[BORDER_COLOR_COL].to_numpy()[rows],
+            "color_tag": subdf[COLOR_TAG_COL].astype(str).to_numpy()[rows],
+            "tooltip": e_tooltip,
+            "legend": gene_first_row[rows],
+            "gene": e_gene,
+            "stage": 2,
+            "item": np.arange(len(rows)) - gene_bounds[e_gene],
+            "part": 0,
+            "sub": 0,
+        }
+    )
+
+    # arrows in the exons of genes without arrows in introns
+    e_arrow = strand_on[e_gene] & ~dir_flag[e_gene]
+    e_arrow &= incl[e_chrom_ix] * 2 <= ends[rows] - starts[rows]
+    exon_arrows = arrow_segments(
+        starts[rows][e_arrow],
+        ends[rows][e_arrow],
+        y[e_gene[e_arrow]],
+        e_height[e_arrow],
+        incl[e_chrom_ix[e_arrow]],
+        strand_sign[e_gene[e_arrow]],
+    )
+    exon_arrows["chrom_ix"] = e_chrom_ix[e_arrow][exon_arrows["arrow"]]
+    exon_arrows["gene"] = e_gene[e_arrow][exon_arrows["arrow"]]
+    exon_arrows["stage"] = 2
+    exon_arrows["item"] = exons["item"].to_numpy()[e_arrow][exon_arrows["arrow"]]
+    exon_arrows["part"] = 2
+
+    arrows = pd.concat([intron_arrows, exon_arrows], ignore_index=True)
+    arrows = arrows.sort_values(ORDER_COLS, kind="stable", ignore_index=True)
+
+    # LABELS beside the first interval of each gene
+    if text:
+        l_row = np.flatnonzero(subdf[EXON_IX_COL].to_numpy()[rows] == 0)
+        if isinstance(text, bool):
+            l_text = genes["geneid"].to_numpy()[e_gene[l_row]]
+        else:
+            l_text = format_template(text, subdf.iloc[rows[l_row]])
+    else:
+        l_row = np.array([], dtype=int)
+        l_text = np.array([], dtype=object)
+    labels = pd.DataFrame(
+        {
+            "chrom_ix": e_chrom_ix[l_row],
+            "x": exons["x0"].to_numpy()[l_row]
+            - subdf[TEXT_PAD_COL].to_numpy()[rows[l_row]],
+            "y": y[e_gene[l_row]],
+            "text": l_text,
+            "gene": e_gene[l_row],
+            "stage": 2,
+            "item": exons["item"].to_numpy()[l_row],
+            "part": 1,
+            "sub": 0,
+        }
+    )
+    if feat_dict["text_cull"]:
+        labels = cull_labels(
+            labels, chrmd_df_grouped, feat_dict["text_size"], v_spacer, file_size
+        )
+
+    return {
+        "genes": genes,
+        "introns": intron_lines,
+        "exons": exons,
+        "arrows": arrows,
+        "labels": labels,
+    }
+
+
+def arrow_segments(starts, ends, y, height, incl, sign):
+    """Provide the two segments of the direction arrow in the middle of each item."""
+
+    # only + and - strands are drawn
+    drawn = sign != 0
+    mid = (starts + ends) / 2
+    low = y - height / 2 + 0.01
+    high = y + height / 2 - 0.01
+
+    # bottom and top segments, pointing to the end for + strand and to the start for -
+    bot = (
+        mid - incl,
+        np.where(sign > 0, low, y),
+        mid + incl,
+        np.where(sign > 0, y, high),
+    )
+    top = (
+        mid + incl,
+        np.where(sign > 0, y, low),
+        mid - incl,
+        np.where(sign > 0, high, y),
+    )
+    segments = pd.DataFrame(
+        {
+            "arrow": np.repeat(np.arange(len(starts)), 2),
+            "x0": np.column_stack([bot[0], top[0]]).ravel(),
+            "y0": np.column_stack([bot[1], top[1]]).ravel(),
+            "x1": np.column_stack([bot[2], top[2]]).ravel(),
+            "y1": np.column_stack([bot[3], top[3]]).ravel(),
+            "sub": np.tile([0, 1], len(starts)),
+            "sign": np.repeat(sign, 2),
+        }
+    )
+
+    return segments[np.repeat(drawn, 2)].reset_index(drop=True)
+
+
+def merge_subpixel(display, chrmd_df_grouped, width):
+    """Merge the intervals of a gene closer than one pixel and drop the arrows narrower than one pixel."""
+
+    # data units per pixel of each plot
+    px = np.empty(len(chrmd_df_grouped))
+    for ix, (lo, hi) in zip(chrmd_df_grouped["chrom_ix"], chrmd_df_grouped["min_max"]):
+        px[ix] = 1.1 * (hi - lo) / width
+    display = dict(display)
+
+    # arrow segments narrower than one pixel
+    arrows = display["arrows"]
+    a_px = px[arrows["chrom_ix"].to_numpy()]
+    wide = (arrows["x1"] - arrows["x0"]).abs().to_numpy() >= a_px
+    display["arrows"] = arrows[wide].reset_index(drop=True)
+    exons = display["exons"]
+
+    # runs of intervals of a gene with the same style separated by less than one pixel
+    style = exons[["gene", "y0", "y1"]].assign(
+        color=exons["color"].astype(str), border=exons["border"].astype(str)
+    )
+    group = style.groupby(list(style.columns), sort=False).ngroup().to_numpy()
+    order = np.lexsort([exons["x0"].to_numpy(), group])
+    g = group[order]
+    x0 = exons["x0"].to_numpy()[order]
+    x1 = exons["x1"].to_numpy()[order]
+    reach = pd.Series(x1).groupby(g).cummax().to_numpy()
+    new_run = np.ones(len(order), dtype=bool)
+    new_run[1:] = (g[1:] != g[:-1]) | (
+        x0[1:] >= reach[:-1] + px[exons["chrom_ix"].to_numpy()[order][1:]]
+    )
+    run = np.empty(len(order), dtype=int)
+    run[order] = np.cumsum(new_run) - 1
+    if new_run.all():
+        return display
+
+    # merged intervals keep the data of the first one in drawing order
+    by_run = exons.groupby(run, sort=False)
+    merged = by_run.first()
+    merged["x0"] = by_run["x0"].min()
+    merged["x1"] = by_run["x1"].max()
+    merged["ori_start"] = by_run["ori_start"].min()
+    merged["ori_end"] = by_run["ori_end"].max()
+    merged["legend"] = by_run["legend"].any()
+    n_run = by_run.size().to_numpy()
+    display["exons"] = merged.sort_values(ORDER_COLS, kind="stable", ignore_index=True)
+
+    # intron lines within the merged intervals are not drawn
+    spans = merged[n_run > 1].sort_values(["gene", "x0"])
+    introns = display["introns"]
+    scale = max(spans["x1"].max(), np.max(introns["x1"].to_numpy(), initial=0)) + 1
+    span_key = spans["gene"].to_numpy() * scale + spans["x0"].to_numpy()
+    i_gene = introns["gene"].to_numpy()
+    j = np.searchsorted(span_key, i_gene * scale + introns["x0"].to_numpy(), "right")
+    j = np.maximum(j - 1, 0)
+    covered = (
+        (spans["gene"].to_numpy()[j] == i_gene)
+        & (spans["x0"].to_numpy()[j] <= introns["x0"].to_numpy())
+        & (spans["x1"].to_numpy()[j] >= introns["x1"].to_numpy())
+    )
+    display["introns"] = introns[~covered].reset_index(drop=True)
+
+    return display
+
+
+def cull_labels(labels, chrmd_df_grouped, text_size, v_spacer, file_size):
+    """Drop the labels overlapping a label drawn before them, using an occupancy grid of each plot."""
+
+    # pixels per data unit of each plot, plots sharing the figure height by their number of rows
+    n_plots = len(chrmd_df_grouped)
+    chrom_ix = chrmd_df_grouped["chrom_ix"].to_numpy()
+    x_min = np.empty(n_plots)
+    x_scale = np.empty(n_plots)
+    for ix, (lo, hi) in zip(chrom_ix, chrmd_df_grouped["min_max"]):
+        x_min[ix] = lo - 0.05 * (hi - lo)
+        x_scale[ix] = file_size[0] / (1.1 * (hi - lo))
+    y_height = np.empty(n_plots)
+    y_height[chrom_ix] = chrmd_df_grouped["y_height"].to_numpy()
+    plot_px = file_size[1] * y_height / y_height.sum()
+    y_scale = plot_px / (y_height + 2 * v_spacer)
+
+    # label boxes in grid cells, right aligned and with an approximate width per character
+    cell = max(text_size / 4, 1)
+    l_ix = labels["chrom_ix"].to_numpy()
+    right = (labels["x"].to_numpy() - x_min[l_ix]) * x_scale[l_ix]
+    width = labels["text"].astype(str).str.len().to_numpy() * 0.6 * text_size
+    mid = (labels["y"].to_numpy() + v_spacer) * y_scale[l_ix]
+    c0 = np.floor((right - width) / cell).astype(int)
+    c1 = np.floor(right / cell).astype(int) + 1
+    r0 = np.floor((mid - text_size / 2) / cell).astype(int)
+    r1 = np.floor((mid + text_size / 2) / cell).astype(int) + 1
+
+    # keep the labels in drawing order when their cells are free, the grid includes the margins
+    n_cols = int(file_size[0] / cell) + 1
+    offset_c = max(-c0.min(initial=0), 0)
+    offset_r = max(-r0.min(initial=0), 0)
+    grids = [
+        np.zeros((int(px / cell) + 1 + offset_r, n_cols + offset_c), dtype=bool)
+        for px in plot_px
+    ]
+    keep = np.zeros(len(labels), dtype=bool)
+    for i in range(len(labels)):
+        grid = grids[l_ix[i]]
+        box = (
+            slice(r0[i] + offset_r, r1[i] + offset_r),
+            slice(c0[i] + offset_c, c1[i] + offset_c),
+        )
+        if not grid[box].any():
+            grid[box] = True
+            keep[i] = True
+
+    return labels[keep].reset_index(drop=True)
+
+
+def plot_boxes(width, height, chrmd_df_grouped, v_spacer, margin, title_space=0):
+    """Provide the pixel box and data limits of each plot, placed one below the other in the figure."""
+
+    # plots sharing the height by their number of rows, with the title space above each one
+    n_plots = len(chrmd_df_grouped)
+    chrom_ix = chrmd_df_grouped["chrom_ix"].to_numpy()
+    weight = np.empty(n_plots)
+    weight[chrom_ix] = chrmd_df_grouped["y_height"].to_numpy() + 2 * v_spacer
+    plot_h = (
+        (height - (margin + title_space) * n_plots - margin) * weight / weight.sum()
+    )
+    top = margin + title_space
+    top += np.concatenate([[0], np.cumsum(plot_h + margin + title_space)[:-1]])
+    x_lo = np.empty(n_plots)
+    x_hi = np.empty(n_plots)
+    for ix, (x_min, x_max) in zip(chrom_ix, chrmd_df_grouped["min_max"]):
+        x_rang = x_max - x_min
+        x_lo[ix] = x_min - 0.05 * x_rang
+        x_hi[ix] = x_max + 0.05 * x_rang
+
+    return {
+        "left": np.full(n_plots, margin),
+        "right": np.full(n_plots, width - margin),
+        "top": top,
+        "bottom": top + plot_h,
+        "x_lo": x_lo,
+        "x_hi": x_hi,
+        "y_lo": np.full(n_plots, -v_spacer),
+        "y_hi": weight - v_spacer,
+    }
+
+
+def to_px_x(boxes, chrom_ix, x):
+    """Convert x data coordinates of the given plots to pixels."""
+
+    scale = (boxes["right"] - boxes["left"]) / (boxes["x_hi"] - boxes["x_lo"])
+
+    return boxes["left"][chrom_ix] + (x - boxes["x_lo"][chrom_ix]) * scale[chrom_ix]
+
+
+def to_px_y(boxes, chrom_ix, y):
+    """Convert y data coordinates of the given plots to pixels, growing downwards."""
+
+    scale = (boxes["bottom"] - boxes["top"]) / (boxes["y_hi"] - boxes["y_lo"])
+
+    return boxes["top"][chrom_ix] + (boxes["y_hi"][chrom_ix] - y) * scale[chrom_ix]
+
+
+def gene_info(genes, newline):
+    """Provide the default hover text of the given genes."""
+
+    info = (
+        "("
+        + genes["ori_start"].astype(str)
+        + ", "
+        + genes["ori_end"].astype(str)
+        + ")"
+        + newline
+        + "ID: "
+        + genes["geneid"].astype(str)
+    )
+
+    # add strand when known
+    strand_on = genes["strand"].notna() & genes["strand"].astype(bool)
+    info = info.where(~strand_on, "[" + genes["strand"].astype(str) + "] " + info)
+
+    return info
+
+
+def draw_order(display):
+    """Provide the kind and position of all the items of the display list in drawing order."""
+
+    stream = pd.concat(
+        [
+            table[ORDER_COLS].assign(kind=kind, pos=np.arange(len(table)))
+            for kind, table in display.items()
+        ],
+        ignore_index=True,
+    )
+    stream = stream.sort_values(ORDER_COLS, kind="stable")
+
+    return zip(stream["kind"], stream["pos"])
@@ -0,0 +1,174 @@
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+from .core import (
+    get_engine,
+    get_theme,
+    get_options,
+    get_warnings,
+    set_engine,
+    set_theme,
+    set_options,
+    set_warnings,
+)
+from .plot_main import PreparedPlot
+
+# pool kept between calls so the workers only start and warm up once
+EXPORT_POOL = None
+EXPORT_WORKERS = None
+
+
+def export_many(figs, paths, *, workers=None, **kargs):
+    """
+    Export several figures or prepared plots to files using a pool of worker processes.
+
+    The worker processes are started once, with Plotly's image export and Matplotlib already loaded, and
+    kept for the following calls, so exporting many plots does not pay the startup of the image renderer
+    each time. The files are written in parallel and futures are returned to follow them. Keeping the image
+    renderer running relies on Kaleido 0.2, which keeps its renderer process alive; with Kaleido 1.x each
+    Plotly export starts its own browser and the warm-up only saves the imports.
+
+    Parameters
+    ----------
+    figs: list
+        Plotly figures, Matplotlib figures or PreparedPlot objects to export. Plotly figures are sent to the
+        workers as their specification and prepared plots are rendered by the workers.
+
+    paths: list
+        Name of the file for each of the figs, specifying the desired extension.
+
+    workers: int, default None
+        Number of worker processes. When None, as many as processors. The pool is started again only when
+        a different number is given.
+
+    **kargs
+        Arguments of PreparedPlot.render used for the prepared plots, such as engine or theme. The engine,
+        theme, options and warnings set in this session are used by the workers when not given.
+
+    Returns
+    -------
+    list of concurrent.futures.Future
+        One future per file, giving the path once the file is written.
+
+    Examples
+    --------
+    >>> import pyranges_plot as prp
+
+    >>> prepared = [prp.prepare(p1, region=region) for region in regions]
+
+    >>> futures = prp.export_many(prepared, [f"region{i}.png" for i in range(len(regions))], workers=4, engine="ply")
+
+    >>> [future.result() for future in futures]
+    """
+
+    if len(figs) != len(paths):
+        raise Exception(
+            f"Please provide one path per figure. {len(figs)} figures and {len(paths)} paths were provided."
+        )
+
+    # session settings, sent with every task so workers follow later changes
+    settings = {
+        "engine": get_engine(),
+        "theme": get_theme(),
+        "options": get_options("values"),
+        "warnings": get_warnings(),
+    }
+
+    pool = get_export_pool(workers)
+    futures = []
+    for fig, path in zip(figs, paths):
+        futures.append(pool.submit(export_one, fig_spec(fig), path, settings, kargs))
+
+    return futures
+
+
+def shutdown_export_pool():
+    """Stop the worker processes used by export_many."""
+
+    global EXPORT_POOL, EXPORT_WORKERS
+    if EXPORT_POOL is not None:
+        EXPORT_POOL.shutdown()
+    EXPORT_POOL = None
+    EXPORT_WORKERS = None
+
+
+def get_export_pool(workers):
+    """Provide the pool of worker processes, started if needed."""
+
+    global EXPORT_POOL, EXPORT_WORKERS
+    if EXPORT_POOL is None or workers != EXPORT_WORKERS:
+        shutdown_export_pool()
+        # spawned workers, forking the already threaded session may deadlock
+        EXPORT_POOL = ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=warm_up,
+        )
+        EXPORT_WORKERS = workers
+
+    return EXPORT_POOL
+
+
+def warm_up():
+    """Load the available image exporters in a worker process."""
+
+    # matplotlib without interactive backend
+    try:
+        import matplotlib
+
+        matplotlib.use("Agg")
+    except ImportError:
+        pass
+
+    # plotly image export, the renderer is started by exporting an empty figure and
+    # kept by kaleido 0.2, kaleido 1.x starts a new one on each export
+    try:
+        import plotly.graph_objects as go
+        import plotly.io as pio
+
+        pio.to_image(go.Figure(), format="png", width=10, height=10)
+    except (ImportError, ValueError):
+        pass
+
+
+def fig_spec(fig):
+    """Provide what is sent to the workers for a figure."""
+
+    if isinstance(fig, PreparedPlot):
+        return fig
+
+    # plotly figures as their specification
+    if hasattr(fig, "to_plotly_json"):
+        return ("plotly", fig.to_dict())
+
+    return fig
+
+
+def export_one(fig, path, settings, kargs):
+    """Write one figure to file in a worker process."""
+
+    # plotly specification
+    if isinstance(fig, tuple) and fig[0] == "plotly":
+        import plotly.graph_objects as go
+        import plotly.io as pio
+
+        pio.write_image(go.Figure(fig[1]), path)
+
+    # prepared plot rendered with the session settings
+    elif isinstance(fig, PreparedPlot):
+        set_engine(settings["engine"])
+        set_warnings(settings["warnings"])
+        set_theme(settings["theme"])
+        set_options(settings["options"])
+        fig.render(to_file=path, **kargs)
+
+    # matplotlib figure
+    elif hasattr(fig, "savefig"):
+        fig.savefig(path)
+
+    else:
+        raise Exception(
+            f"The figure for {path} is not a Plotly figure, a Matplotlib figure or a PreparedPlot."
+        )
+
+    return path
@@ -1,5 +1,5 @@
-import pyranges as pr
 import pandas as pd
+import numpy as np
 from pyranges.core.names import CHROM_COL, START_COL, END_COL
 
 from .names import (
@@ -11,171 +11,139 @@ from .names import (
 )
 
 
-# def get_introns(self, id_col: str) -> "pr.PyRanges":
-def get_introns(p, id_cols) -> "pr.PyRanges":
-    """Calculate introns from a PyRanges object.
+def get_introns(group_ix, starts, ends):
+    """Find the gaps between the intervals of each group at once.
 
-     Parameters
+    Parameters
     ----------
-    id_col : str
-        Name of column containing the ID infromation.
+    group_ix : numpy.ndarray
+        Non-negative group (gene, chromosome...) index of each interval.
+
+    starts, ends : numpy.ndarray
+        Interval coordinates.
+
+    Returns
+    -------
+    tuple of numpy.ndarray
+        Group, start and end of the gaps of the union of the intervals of each group, sorted by
+        group and start.
 
     Examples
     --------
-    >>> gr = pr.PyRanges({"Chromosome": [1, 1, 1],
-    ...                   "Start": [0, 20, 40],
-    ...                   "End": [10, 35, 50],
-    ...                   "transcript_id": ['t1', 't1' ,'t1']})
-    >>> gr
-      index  |      Chromosome    Start      End  transcript_id
-      int64  |           int64    int64    int64  object
-    -------  ---  ------------  -------  -------  ---------------
-          0  |               1        0       10  t1
-          1  |               1       20       35  t1
-          2  |               1       40       50  t1
-    PyRanges with 3 rows, 4 columns, and 1 index columns.
-    Contains 1 chromosomes.
-
-    >>> gr.get_introns("transcript_id")
-      index  |      Chromosome      End    Start  transcript_id
-      int64  |           int64    int64    int64  object
-    -------  ---  ------------  -------  -------  ---------------
-          1  |               1       20       10  t1
-          2  |               1       40       35  t1
-    PyRanges with 2 rows, 4 columns, and 1 index columns.
-    Contains 1 chromosomes.
+    >>> get_introns(np.array([0, 0, 0, 1]), np.array([0, 40, 20, 5]), np.array([10, 50, 45, 8]))
+    (array([0]), array([10]), array([20]))
     """
 
-    introns = p.merge_overlaps(match_by=id_cols).sort_ranges(
-        by=id_cols, use_strand=False
-    )
+    # sort intervals by group and start
+    order = np.lexsort((starts, group_ix))
+    s_group = group_ix[order]
+    s_starts = starts[order]
 
-    # intron start is exon end shifted
-    introns[END_COL] = introns.groupby(id_cols, group_keys=False, observed=True)[
-        END_COL
-    ].shift()
+    # covered union, running maximum of ends offset to stay within each group
+    span = int(ends.max()) + 1 if len(ends) else 1
+    offset = s_group * span
+    covered_end = np.maximum.accumulate(ends[order] + offset) - offset
 
-    # remove first exon rows
-    introns.dropna(subset=END_COL, inplace=True)
-    # introns.reset_index(inplace=True)
+    # gaps between the covered union and the next start
+    is_gap = (s_group[1:] == s_group[:-1]) & (s_starts[1:] > covered_end[:-1])
 
-    # intron end is exon start
-    introns.rename(columns={START_COL: END_COL, END_COL: START_COL}, inplace=True)
-    introns[START_COL] = [int(i) for i in introns[START_COL]]
+    return s_group[1:][is_gap], covered_end[:-1][is_gap], s_starts[1:][is_gap]
 
-    return introns
 
+def introns_resize(df, ts_data, empty_chroms=()):
+    """Calculate intron resizes of all chromosomes at once and provide info for plotting, none for the empty ones"""
 
-def introns_resize(df, ts_data, id_col):
-    """Calculate intron resizes and provide info for plotting"""
+    chrom_ix, chroms = pd.factorize(df[CHROM_COL], sort=True)
+    starts = df[START_COL].to_numpy()
+    ends = df[END_COL].to_numpy()
+    thresh = df[SHRTHRES_COL].to_numpy()
 
-    chrom = df[CHROM_COL].iloc[0]
-    p = df
-    thresh = df[SHRTHRES_COL].iloc[0]
+    # shrinkable regions are the gaps of the union longer than the threshold
+    chrom_thresh = np.zeros(len(chroms), dtype=thresh.dtype)
+    chrom_thresh[chrom_ix] = thresh
+    ts_chrom_ix, ts_starts, ts_ends = get_introns(chrom_ix, starts, ends)
+    is_ts = ts_ends - ts_starts > chrom_thresh[ts_chrom_ix]
+    ts_chrom_ix = ts_chrom_ix[is_ts]
+    ts_starts = ts_starts[is_ts]
+    ts_ends = ts_ends[is_ts]
 
-    # Calculate shrinkable intron ranges
-    # get flexible introns
-    exons = p.copy()
-    # introns = get_introns(p, [PR_INDEX_COL] + id_col)
-    introns = p.complement(use_strand=False)
-    introns.reset_index(drop=True, inplace=True)  # reset duplicate labels in index
+    # get coordinate shift (delta) and cumulative coordinate shift (cumdelta)
+    delta = (ts_ends - ts_starts) - chrom_thresh[ts_chrom_ix]
+    cumdelta = np.cumsum(delta)
+    chrom_bounds = np.searchsorted(ts_chrom_ix, np.arange(len(chroms) + 1))
+    first = chrom_bounds[:-1][ts_chrom_ix]
+    cumdelta -= cumdelta[first] - delta[first]
+
+    # store to shrink data with adjusted coords to plot shrunk intron regions
+    bounds = {chrom: chrom_bounds[i : i + 2] for i, chrom in enumerate(chroms)}
+    for chrom in list(chroms) + [c for c in empty_chroms if c not in bounds]:
+        b, e = bounds.get(chrom, (0, 0))
+        ts_data[chrom] = pd.DataFrame(
+            {
+                CHROM_COL: [chrom] * (e - b),
+                START_COL: ts_starts[b:e],
+                END_COL: ts_ends[b:e],
+                DELTA_COL: delta[b:e],
+                CUM_DELTA_COL: cumdelta[b:e],
+                ADJSTART_COL: ts_starts[b:e] - (cumdelta[b:e] - delta[b:e]),
+                ADJEND_COL: ts_ends[b:e] - cumdelta[b:e],
+            }
+        )
 
-    to_shrink = pr.PyRanges()
+    # match intervals with the cumdelta of the last region before them
+    span = int(ends.max()) + 1 if len(df) else 1
+    n_prev = np.searchsorted(
+        ts_chrom_ix * span + ts_ends, chrom_ix * span + starts, side="right"
+    )
+    df[CUM_DELTA_COL] = np.where(
+        n_prev > chrom_bounds[chrom_ix], np.concatenate([[0], cumdelta])[n_prev], 0
+    )
 
-    if not introns.empty:
-        flex_introns = introns.subtract_ranges(exons, strand_behavior="ignore")
+    # Adjust coordinates
+    df[ADJSTART_COL] = starts - df[CUM_DELTA_COL].to_numpy()
+    df[ADJEND_COL] = ends - df[CUM_DELTA_COL].to_numpy()
 
-        # obtain shrinkable regions
-        to_shrink = flex_introns.merge_overlaps(use_strand=False)  # unique ranges
-        if not to_shrink.empty:
-            to_shrink = to_shrink[
-                to_shrink[END_COL] - to_shrink[START_COL] > thresh
-            ]  # filtered
+    return df
 
-    # nohing to shrink
-    if to_shrink.empty:
-        ts_data[chrom] = pd.DataFrame(
-            columns=[
-                CHROM_COL,
-                START_COL,
-                END_COL,
-                ADJSTART_COL,
-                ADJEND_COL,
-                CUM_DELTA_COL,
-            ]
-        )
-        result = p
-        result[ADJSTART_COL] = result[START_COL]
-        result[ADJEND_COL] = result[END_COL]
-        result[DELTA_COL] = [0] * len(result)
-        result[CUM_DELTA_COL] = [0] * len(result)
 
-        return result
+class ShrinkTransform:
+    """Map original coordinates of one chromosome to shrunk coordinates and back.
 
-    # get coordinate shift (delta) and cumulative coordinate shift (cumdelta)
-    to_shrink[DELTA_COL] = (
-        to_shrink[END_COL] - to_shrink[START_COL]
-    ) - thresh  # calculate coord shift considering margins
-    assert to_shrink.sort_values(START_COL).equals(to_shrink), "PyRanges not sorted."
-    to_shrink[CUM_DELTA_COL] = to_shrink[DELTA_COL].cumsum()
-
-    # store adjusted coord to plot shrunk intron regions
-    to_shrink[ADJSTART_COL] = to_shrink[
-        START_COL
-    ] - to_shrink.__cumdelta__.shift().fillna(0)
-    to_shrink[ADJEND_COL] = to_shrink[END_COL] - to_shrink.__cumdelta__
-
-    # store to shrink data
-    ts_data[chrom] = to_shrink
-
-    # Calculate exons coordinate shift
-    exons = pr.concat([exons, to_shrink])
-    exons.sort_values(START_COL, inplace=True)
-    exons[CUM_DELTA_COL] = exons[CUM_DELTA_COL].ffill()
-    exons = exons.fillna({CUM_DELTA_COL: 0})
-    # match exons with its cumdelta
-    result = exons.dropna(subset=id_col)
+    Parameters
+    ----------
+    ts_chrom : pandas.DataFrame
+        To-shrink regions of the chromosome, sorted by start, with their cumulative shift.
+    """
 
-    # Adjust coordinates
-    result[ADJSTART_COL] = result[START_COL] - result[CUM_DELTA_COL]
-    result[ADJEND_COL] = result[END_COL] - result[CUM_DELTA_COL]
+    def __init__(self, ts_chrom):
+        self.starts = ts_chrom[START_COL].to_numpy()
+        self.ends = ts_chrom[END_COL].to_numpy()
+        # shift of each coordinate according to the last region ending before it
+        self.cumdelta = np.concatenate([[0], ts_chrom[CUM_DELTA_COL].to_numpy()])
+        self.adj_ends = self.ends - self.cumdelta[1:]
 
-    # Provide result
-    return result[list(p.columns) + [ADJSTART_COL, ADJEND_COL, DELTA_COL]]
+    def shrink(self, coords):
+        """Provide the shrunk coordinates of the given original ones."""
+
+        coords = np.asarray(coords)
+        return coords - self.cumdelta[np.searchsorted(self.ends, coords, side="right")]
+
+    def expand(self, coords):
+        """Provide the original coordinates of the given shrunk ones."""
+
+        coords = np.asarray(coords)
+        return (
+            coords + self.cumdelta[np.searchsorted(self.adj_ends, coords, side="right")]
+        )
 
 
-def recalc_axis(ts_data, tick_pos_d, ori_tick_pos_d):
+def recalc_axis(shrink_tf_d, tick_pos_d, ori_tick_pos_d):
     """Calculate shrunk axis values according to original coordinates."""
 
-    for chrom in ts_data.keys():
-        # add to-shrunk reagions limits to axis
-        ori_tick_pos = []
-        tick_pos = []
-
-        if ts_data[chrom].empty:  # nothing to shrink
-            tick_pos_d[chrom] = []
-            ori_tick_pos_d[chrom] = []
-
-        else:
-            pos = [
-                [a, b]
-                for a, b in zip(ts_data[chrom][START_COL], ts_data[chrom][END_COL])
-            ]
-            cdel = list(ts_data[chrom][CUM_DELTA_COL])
-
-            # update tick positions for shrunk regions and keep original values as names
-            for i in range(len(pos)):
-                if i == 0:
-                    tick_pos.append(pos[i][0])
-                    tick_pos.append(pos[i][1] - cdel[i])
-                else:
-                    tick_pos.append(pos[i][0] - cdel[i - 1])
-                    tick_pos.append(pos[i][1] - cdel[i])
-
-                ori_tick_pos.append(pos[i][0])
-                ori_tick_pos.append(pos[i][1])
-
-            tick_pos_d[chrom] = tick_pos
-            ori_tick_pos_d[chrom] = ori_tick_pos
+    for chrom, shrink_tf in shrink_tf_d.items():
+        # add to-shrunk regions limits to axis, shrunk positions and original values as names
+        ori_tick_pos = np.column_stack([shrink_tf.starts, shrink_tf.ends]).ravel()
+        tick_pos_d[chrom] = shrink_tf.shrink(ori_tick_pos).tolist()
+        ori_tick_pos_d[chrom] = ori_tick_pos.tolist()
 
     return tick_pos_d, ori_tick_pos_d
@@ -1,24 +1,18 @@
 import tkinter as tk
+import weakref
+import numpy as np
+from matplotlib.collections import LineCollection, PolyCollection
 
+# Hover state of each figure and distance in pixels to hover lines
+_hover_registry = weakref.WeakKeyDictionary()
+HOVER_TOL = 5
 
-def coord2percent(ax, X0, X1):
-    """Provides the plot percentage length from the points given. Matplotlib friendly"""
-
-    x_min, x_max = ax.get_xlim()
-    x_rang = x_max - x_min
-    percent_size = float(((X1 - X0) / x_rang))
-
-    return percent_size
-
-
-def percent2coord(ax, x_percent):
-    """Provides the coordinates distance from the plot percentage given. Matplotlib friendly"""
-
-    x_min, x_max = ax.get_xlim()
-    x_rang = x_max - x_min
-    percent_coord = float(x_percent * x_rang)
-
-    return percent_coord
+# Fixed collection properties of each kind of batched item, in drawing order
+BATCH_KINDS = {
+    "intron": dict(zorder=1),
+    "exon": dict(zorder=1),
+    "arrow": dict(zorder=2, capstyle="round"),
+}
 
 
 def plt_popup_warning(txt, bkg="#1f1f1f", txtcol="white", botcol="#D6AA00"):
@@ -47,36 +41,271 @@ def plt_popup_warning(txt, bkg="#1f1f1f", txtcol="white", botcol="#D6AA00"):
 def make_annotation(item, fig, ax, geneinfo, tag_background):
     """Create annotation for a given plot item."""
 
-    # create annotation and make it not visible
-    annotation = ax.annotate(
-        "",
-        xy=(0, 0),
-        xytext=(20, 20),
-        textcoords="offset points",
-        bbox=dict(
-            boxstyle="round",
-            edgecolor=tag_background,
-            facecolor=tag_background,
-        ),
-        arrowprops=dict(arrowstyle="->"),
-        color="white",
+    # lines are hovered within a few pixels, patches within their area
+    if hasattr(item, "get_xdata"):
+        xdata = np.asarray(item.get_xdata(), dtype=float)
+        ydata = np.asarray(item.get_ydata(), dtype=float)
+        register_hover(
+            fig,
+            ax,
+            xdata.min(),
+            xdata.max(),
+            ydata.min(),
+            ydata.max(),
+            geneinfo,
+            tag_background,
+            pad=True,
+        )
+    else:
+        bbox = item.get_bbox()
+        register_hover(
+            fig,
+            ax,
+            bbox.x0,
+            bbox.x1,
+            bbox.y0,
+            bbox.y1,
+            geneinfo,
+            tag_background,
+        )
+
+
+def register_hover(fig, ax, x0, x1, y0, y1, geneinfo, tag_background, pad=False):
+    """Register the extent and hover text of one or several items of an axis."""
+
+    # one dispatcher per figure
+    if fig not in _hover_registry:
+        hover = {"axes": {}, "background": None}
+        _hover_registry[fig] = hover
+        fig.canvas.mpl_connect("motion_notify_event", on_hover)
+        fig.canvas.mpl_connect("draw_event", on_draw)
+    hover = _hover_registry[fig]
+
+    # one annotation per axis
+    if ax not in hover["axes"]:
+        annotation = ax.annotate(
+            "",
+            xy=(0, 0),
+            xytext=(20, 20),
+            textcoords="offset points",
+            bbox=dict(
+                boxstyle="round",
+                edgecolor=tag_background,
+                facecolor=tag_background,
+            ),
+            arrowprops=dict(arrowstyle="->"),
+            color="white",
+        )
+        annotation.set_visible(False)
+        # left out of regular draws when it can be blitted
+        annotation.set_animated(fig.canvas.supports_blit)
+        hover["axes"][ax] = {
+            "annotation": annotation,
+            "items": [],
+            "texts": [],
+            "index": None,
+        }
+    ax_hover = hover["axes"][ax]
+
+    # store extents, the index is rebuilt on next hover
+    x0, x1, y0, y1 = np.broadcast_arrays(
+        *[np.atleast_1d(np.asarray(v, dtype=float)) for v in (x0, x1, y0, y1)]
+    )
+    if not isinstance(geneinfo, list):
+        geneinfo = [geneinfo] * len(x0)
+
+    # items with undefined coordinates are not drawn
+    drawn = np.isfinite(x0) & np.isfinite(x1) & np.isfinite(y0) & np.isfinite(y1)
+    ax_hover["items"].append(
+        np.column_stack(
+            [
+                x0[drawn],
+                x1[drawn],
+                y0[drawn],
+                y1[drawn],
+                np.broadcast_to(pad, x0.shape)[drawn],
+            ]
+        )
     )
-    annotation.set_visible(False)
+    ax_hover["texts"] += [info for info, d in zip(geneinfo, drawn) if d]
+    ax_hover["index"] = None
+
+
+def build_hover_index(ax_hover):
+    """Group the items of an axis by gene row, sorted by start within each row."""
+
+    items = np.concatenate(ax_hover["items"])
+    x0, x1, y0, y1, pad = items.T
+    row_center, row_ix = np.unique((y0 + y1) / 2, return_inverse=True)
+
+    # sort by row and start, keeping registration order to find the topmost item
+    order = np.lexsort((x0, row_ix))
+    bounds = np.searchsorted(row_ix[order], np.arange(len(row_center) + 1))
+    rows = []
+    for b, e in zip(bounds[:-1], bounds[1:]):
+        ix = order[b:e]
+        rows.append(
+            {
+                "ix": ix,
+                "x0": x0[ix],
+                # running maximum of ends to discard items ending before the cursor
+                "x1_cummax": np.maximum.accumulate(x1[ix]),
+            }
+        )
+
+    return {
+        "items": items,
+        "rows": rows,
+        "row_y0": np.array([items[row["ix"], 2].min() for row in rows]),
+        "row_y1": np.array([items[row["ix"], 3].max() for row in rows]),
+        "row_pad": np.array([items[row["ix"], 4].max() for row in rows]),
+    }
+
 
-    # make annotation visible when over the gene line
-    def on_hover(event):
-        visible = annotation.get_visible()
-        contains_item, _ = item.contains(event)  # Check if mouse is over the gene line
-        if contains_item:
+def find_hovered(ax_hover, x, y, tol_x, tol_y):
+    """Provide the text of the topmost item under the given data coordinates."""
+
+    if ax_hover["index"] is None:
+        ax_hover["index"] = build_hover_index(ax_hover)
+    index = ax_hover["index"]
+
+    # rows containing the cursor
+    row_pad = index["row_pad"] * tol_y
+    in_rows = np.nonzero(
+        (index["row_y0"] - row_pad <= y) & (y <= index["row_y1"] + row_pad)
+    )[0]
+
+    hovered = -1
+    for r in in_rows:
+        row = index["rows"][r]
+        lo = np.searchsorted(row["x1_cummax"], x - tol_x, side="left")
+        hi = np.searchsorted(row["x0"], x + tol_x, side="right")
+        if lo >= hi:
+            continue
+        cand = row["ix"][lo:hi]
+        x0, x1, y0, y1, pad = index["items"][cand].T
+        hit = (
+            (x0 - pad * tol_x <= x)
+            & (x <= x1 + pad * tol_x)
+            & (y0 - pad * tol_y <= y)
+            & (y <= y1 + pad * tol_y)
+        )
+        if hit.any():
+            hovered = max(hovered, cand[hit].max())
+
+    if hovered < 0:
+        return None
+    return ax_hover["texts"][hovered]
+
+
+def on_draw(event):
+    """Store the figure background to blit the annotations on it."""
+
+    hover = _hover_registry.get(event.canvas.figure)
+    if hover is not None and event.canvas.supports_blit:
+        hover["background"] = event.canvas.copy_from_bbox(event.canvas.figure.bbox)
+        for ax_hover in hover["axes"].values():
+            if ax_hover["annotation"].get_visible():
+                event.canvas.figure.draw_artist(ax_hover["annotation"])
+
+
+def on_hover(event):
+    """Show the annotation of the item under the mouse, if any."""
+
+    canvas = event.canvas
+    hover = _hover_registry.get(canvas.figure)
+    if hover is None:
+        return
+
+    changed = False
+    for ax, ax_hover in hover["axes"].items():
+        annotation = ax_hover["annotation"]
+        geneinfo = None
+        if event.inaxes is ax:
+            # pixel tolerance in data units
+            inv = ax.transData.inverted()
+            (x_a, y_a), (x_b, y_b) = inv.transform(
+                [(event.x, event.y), (event.x + HOVER_TOL, event.y + HOVER_TOL)]
+            )
+            geneinfo = find_hovered(
+                ax_hover, event.xdata, event.ydata, abs(x_b - x_a), abs(y_b - y_a)
+            )
+
+        if geneinfo is not None:
             annotation.set_text(geneinfo)
             annotation.xy = (event.xdata, event.ydata)
             annotation.set_visible(True)
-            fig.canvas.draw()
-        elif visible:
+            changed = True
+        elif annotation.get_visible():
             annotation.set_visible(False)
-            fig.canvas.draw()
+            changed = True
+
+    if not changed:
+        return
+
+    # redraw only the annotations when possible
+    if hover["background"] is not None:
+        canvas.restore_region(hover["background"])
+        for ax_hover in hover["axes"].values():
+            if ax_hover["annotation"].get_visible():
+                canvas.figure.draw_artist(ax_hover["annotation"])
+        canvas.blit(canvas.figure.bbox)
+    else:
+        canvas.draw_idle()
+
+
+def add_batch_collections(fig, batch, tag_background, rasterized=False):
+    """Add one collection per batch entry to its axis."""
+
+    for kind in BATCH_KINDS:
+        for (entry_kind, ax), entry in batch.items():
+            if entry_kind != kind:
+                continue
+
+            x0 = np.asarray(entry["x0"], dtype=float)
+            x1 = np.asarray(entry["x1"], dtype=float)
+            y0 = np.asarray(entry["y0"], dtype=float)
+            y1 = np.asarray(entry["y1"], dtype=float)
+
+            # exons as rectangles, introns and arrows as segments
+            if kind == "exon":
+                verts = np.stack(
+                    [
+                        np.column_stack([x0, y0]),
+                        np.column_stack([x1, y0]),
+                        np.column_stack([x1, y1]),
+                        np.column_stack([x0, y1]),
+                    ],
+                    axis=1,
+                )
+                collection = PolyCollection(
+                    verts, **entry["style"], **BATCH_KINDS[kind], rasterized=rasterized
+                )
+            else:
+                segments = np.stack(
+                    [np.column_stack([x0, y0]), np.column_stack([x1, y1])], axis=1
+                )
+                collection = LineCollection(
+                    segments,
+                    **entry["style"],
+                    **BATCH_KINDS[kind],
+                    rasterized=rasterized,
+                )
+            ax.add_collection(collection, autolim=False)
 
-    fig.canvas.mpl_connect("motion_notify_event", on_hover)
+            # arrows have no hover information, nor any item without hover
+            if entry["geneinfo"] is not None:
+                register_hover(
+                    fig,
+                    ax,
+                    x0,
+                    x1,
+                    y0,
+                    y1,
+                    entry["geneinfo"],
+                    tag_background,
+                    pad=kind == "intron",
+                )
 
 
 def rgb_string_to_tuple(rgb_string):
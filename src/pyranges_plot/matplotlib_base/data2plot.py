@@ -1,388 +1,190 @@
-import pyranges as pr
-from pyranges.core.names import START_COL, END_COL
-
-from .core import coord2percent, percent2coord, make_annotation, rgb_string_to_tuple
-from matplotlib.patches import Rectangle
+import numpy as np
 import pandas as pd
+from matplotlib.patches import Rectangle
 
-from ..names import (
-    ADJSTART_COL,
-    ADJEND_COL,
-    EXON_IX_COL,
-    TEXT_PAD_COL,
-    COLOR_INFO,
-    BORDER_COLOR_COL,
-    THICK_COL,
-)
-
-
-def plot_direction(
-    ax,
-    strand,
-    item_size,
-    item_threshold,
-    start,
-    stop,
-    incl,
-    gene_ix,
-    exon_height,
-    arrow_color,
-    arrow_style,
-    arrow_width,
-):
-    """Plot the direction arrow in the given item if it proceeds."""
-
-    dir_flag = 0
-
-    if strand:
-        # create and plot direction lines
-        if item_size <= item_threshold:
-            dir_flag = 1
-            ##diagonal_line = OX arrow extension(item middle point +- incl), OY arrow extension (item middle point + half of exon width)
-            top_plus = (
-                [(start + stop) / 2 + incl, (start + stop) / 2 - incl],
-                [gene_ix, gene_ix + exon_height / 2 - 0.01],
-            )
-            bot_plus = (
-                [(start + stop) / 2 - incl, (start + stop) / 2 + incl],
-                [gene_ix - exon_height / 2 + 0.01, gene_ix],
-            )
-            top_minus = (
-                [(start + stop) / 2 + incl, (start + stop) / 2 - incl],
-                [gene_ix - exon_height / 2 + 0.01, gene_ix],
-            )
-            bot_minus = (
-                [(start + stop) / 2 - incl, (start + stop) / 2 + incl],
-                [gene_ix, gene_ix + exon_height / 2 - 0.01],
-            )
-
-            if strand == "+":
-                ax.plot(
-                    bot_plus[0],
-                    bot_plus[1],
-                    color=arrow_color,
-                    linewidth=arrow_width,
-                    solid_capstyle=arrow_style,
-                )
-
-                ax.plot(
-                    top_plus[0],
-                    top_plus[1],
-                    color=arrow_color,
-                    linewidth=arrow_width,
-                    solid_capstyle=arrow_style,
-                )
-
-            elif strand == "-":
-                ax.plot(
-                    bot_minus[0],
-                    bot_minus[1],
-                    color=arrow_color,
-                    linewidth=arrow_width,
-                    solid_capstyle=arrow_style,
-                )
-
-                ax.plot(
-                    top_minus[0],
-                    top_minus[1],
-                    color=arrow_color,
-                    linewidth=arrow_width,
-                    solid_capstyle=arrow_style,
-                )
-
-    return dir_flag
-
-
-def apply_gene_bridge(
-    transcript_str,
-    text,
-    text_size,
-    df,
-    fig,
-    ax,
-    strand,
-    gene_ix,
-    tag_background,
-    plot_border,
-    genename,
-    showinfo,
-    arrow_size,
-    arrow_color,
-    arrow_style,
-    arrow_width,
-    dir_flag,
-    depth_col,
-):
-    """Evaluate data and provide plot_row with right parameters."""
-
-    # If transcript structure subtract exons
-    if transcript_str:
-        cds = df[df["Feature"] == "CDS"]
-        exons = df[df["Feature"] == "exon"]
-
-        # if there are exons and cds, subtract
-        if sum([cds.empty, exons.empty]) == 2:
-            exons = exons.subtract_ranges(cds)
-        df = pr.concat([cds, exons])
-
-    # Define depth order
-    if depth_col:
-        df.sort_values(depth_col, inplace=True)
-
-    # plot rows
-    df.apply(
-        plot_row,
-        args=(
-            fig,
-            ax,
-            strand,
-            gene_ix,
-            tag_background,
-            plot_border,
-            genename,
-            showinfo,
-            arrow_size,
-            arrow_color,
-            arrow_style,
-            arrow_width,
-            dir_flag,
-            text,
-            text_size,
-        ),
-        axis=1,
-    )
-
-
-def plot_row(
-    row,
-    fig,
-    ax,
-    strand,
-    gene_ix,
-    tag_background,
-    plot_border,
-    genename,
-    showinfo,
-    arrow_size,
-    arrow_color,
-    arrow_style,
-    arrow_width,
-    dir_flag,
-    text,
-    text_size,
-):
-    """Plot elements corresponding to one row of one gene."""
-
-    # Make gene annotation
-    # get the gene information to print on hover
-    # default
-    if strand:
-        geneinfo = f"[{strand}] ({row.__oriStart__}, {row.__oriEnd__})\nID: {genename}"  # default with strand
-    else:
-        geneinfo = f"({row.__oriStart__}, {row.__oriEnd__})\nID: {genename}"  # default without strand
-
-    # customized
-    showinfo_dict = row.to_dict()  # first element of gene rows
-    if showinfo:
-        geneinfo += "\n" + showinfo.format(**showinfo_dict)
-
-    # Exon start, stop and color
-    start = int(row[START_COL])
-    stop = int(row[END_COL])
-    exon_color = row[COLOR_INFO]
-    if isinstance(exon_color, str) and exon_color[:3] == "rgb":
-        exon_color = rgb_string_to_tuple(exon_color)
-    exon_border = row[BORDER_COLOR_COL]
-    if isinstance(exon_border, str) and exon_border[:3] == "rgb":
-        exon_border = rgb_string_to_tuple(exon_border)
-    exon_height = row[THICK_COL]
-    if isinstance(arrow_color, str) and arrow_color[:3] == "rgb":
-        arrow_color = rgb_string_to_tuple(arrow_color)
-
-    # Plot EXON as rectangle
-    exon_rect = Rectangle(
-        (start, gene_ix - exon_height / 2),
-        stop - start,
-        exon_height,
-        edgecolor=exon_border,
-        facecolor=exon_color,
-        fill=True,
-    )
-    ax.add_patch(exon_rect)
-
-    # create annotation for exon
-    make_annotation(exon_rect, fig, ax, geneinfo, tag_background)
-
-    # Add ID annotation if it is the first exon
-    if row[EXON_IX_COL] == 0 and text:
-        text_pad = row[TEXT_PAD_COL]
-        # text == True
-        if isinstance(text, bool):
-            ann = genename
-        # text == '{string}'
-        else:
-            row_dict = row.to_dict()
-            ann = text.format_map(row_dict)
-
-        ax.annotate(
-            ann,
-            xy=(start - text_pad, gene_ix),
+from .core import register_hover, rgb_string_to_tuple, add_batch_collections
+from ..display_list import ORDER_COLS, gene_info, draw_order
+
+arrow_style = "round"
+
+
+def mpl_colors(colors):
+    """Convert the rgb strings of the given colors to Matplotlib tuples."""
+
+    return [
+        rgb_string_to_tuple(c) if isinstance(c, str) and c[:3] == "rgb" else c
+        for c in colors
+    ]
+
+
+def plot_display_list(fig, axes, display, feat_dict, tooltip, render=None, hover=True):
+    """Add the items of the display list to the axes, with their hover information if hover."""
+
+    genes = display["genes"]
+    introns = display["introns"]
+    exons = display["exons"]
+    arrows = display["arrows"]
+    labels = display["labels"]
+    tag_bkg = feat_dict["tag_bkg"]
+    arrow_color = feat_dict["arrow_color"]
+    arrow_width = feat_dict["arrow_line_width"]
+    rasterized = feat_dict["file_rasterized"]
+
+    # hover information of introns (gene) and exons (interval)
+    intron_info = None
+    exon_info = None
+    if hover:
+        intron_info = gene_info(genes, "\n").to_numpy()[introns["gene"].to_numpy()]
+        exon_rows = pd.DataFrame(
+            {
+                "ori_start": exons["ori_start"],
+                "ori_end": exons["ori_end"],
+                "strand": genes["strand"].to_numpy()[exons["gene"].to_numpy()],
+                "geneid": genes["geneid"].to_numpy()[exons["gene"].to_numpy()],
+            }
+        )
+        exon_info = gene_info(exon_rows, "\n")
+        if tooltip:
+            exon_info = exon_info + "\n" + exons["tooltip"].astype(str)
+        exon_info = exon_info.to_numpy()
+
+    intron_color = mpl_colors(introns["color"])
+    intron_width = np.where(introns["shrunk"], 0.5, 1)
+    intron_style = np.where(introns["shrunk"], "--", "-")
+    exon_color = mpl_colors(exons["color"])
+    exon_border = mpl_colors(exons["border"])
+
+    # gene labels are annotated in any case
+    for chrom_ix, x, y, label in zip(
+        labels["chrom_ix"], labels["x"], labels["y"], labels["text"]
+    ):
+        axes[chrom_ix].annotate(
+            label,
+            xy=(x, y),
             horizontalalignment="right",
             verticalalignment="center",
-            color=plot_border,
-            fontsize=text_size,
+            color=feat_dict["plot_border"],
+            fontsize=feat_dict["text_size"],
         )
 
-    # Plot DIRECTION ARROW in EXON
-    # decide about placing a direction arrow
-    incl = percent2coord(ax, arrow_size / 2)  # how long is the arrow in the plot (OX)
-
-    # create and plot lines
-    if not dir_flag:
-        plot_direction(
-            ax,
-            strand,
-            incl * 2,
-            stop - start,  # itself as threshold
-            start,
-            stop,
-            incl,
-            gene_ix,
-            exon_height,
-            arrow_color,
-            arrow_style,
-            arrow_width,
+    if render == "batched":
+        batch = {}
+        batch_items(
+            batch,
+            "intron",
+            axes,
+            introns,
+            introns["y"],
+            introns["y"],
+            intron_info,
+            colors=intron_color,
+            linewidths=intron_width,
+            linestyles=intron_style,
         )
-
-
-def plot_introns(
-    introns,
-    ts_chrom,
-    fig,
-    ax,
-    geneinfo,
-    tag_background,
-    gene_ix,
-    exon_color,
-    strand,
-    exon_height,
-    arrow_color,
-    arrow_style,
-    arrow_width,
-    arrow_size,
-):
-    """Plot intron lines as needed."""
-
-    dir_flag = []
-
-    def apply_plot_intron(row):
-        """Plot intron df as lines."""
-
-        start = row[START_COL]
-        stop = row[END_COL]
-
-        # NOT introns off
-        if ts_chrom.empty:
-            ts_intron = pd.DataFrame()
-
-        # INTRONS OFF
-        else:
-            ts_intron = ts_chrom[
-                (ts_chrom[ADJSTART_COL] >= start) & (ts_chrom[ADJSTART_COL] < stop)
-            ].reset_index()
-
-        # Plot LINES binding exons
-        # No to-shrink regions in intron
-        if ts_intron.empty:
-            # create continuous line
-            intron_line = ax.plot(
-                [start, stop],
-                [gene_ix, gene_ix],
-                color=exon_color,
-                linewidth=1,
+        batch_items(
+            batch,
+            "exon",
+            axes,
+            exons,
+            exons["y0"],
+            exons["y1"],
+            exon_info,
+            facecolors=exon_color,
+            edgecolors=exon_border,
+        )
+        batch_items(
+            batch,
+            "arrow",
+            axes,
+            arrows,
+            arrows["y0"],
+            arrows["y1"],
+            colors=[arrow_color] * len(arrows),
+            linewidths=[arrow_width] * len(arrows),
+        )
+        add_batch_collections(fig, batch, tag_bkg, rasterized)
+        return
+
+    # one artist per item in drawing order
+    introns_l = introns.to_dict("list")
+    exons_l = exons.to_dict("list")
+    arrows_l = arrows.to_dict("list")
+    for kind, i in draw_order(display):
+        if kind == "introns":
+            ax = axes[introns_l["chrom_ix"][i]]
+            ax.plot(
+                [introns_l["x0"][i], introns_l["x1"][i]],
+                [introns_l["y"][i], introns_l["y"][i]],
+                color=intron_color[i],
+                linewidth=intron_width[i],
+                linestyle=intron_style[i],
                 zorder=1,
+                rasterized=rasterized,
             )
-            # add to plot with annotation
-            make_annotation(intron_line[0], fig, ax, geneinfo, tag_background)
-
-        # Intron has to-shrink regions
-        else:
-            # alternating fixed and to-shrink regions or vice versa
-            prev_tsend = None
-
-            # Iterate over to-shrink regions
-            for ix, row in ts_intron.iterrows():
-                # (1) Add previous fixed region if needed
-                # consider intron starts with fixed region
-                if not prev_tsend and row[ADJSTART_COL] != start:
-                    prev_tsend = start
-
-                # create continuous line
-                intron_line = ax.plot(
-                    [prev_tsend, row[ADJSTART_COL]],
-                    [gene_ix, gene_ix],
-                    color=exon_color,
-                    linewidth=1,
-                    zorder=1,
-                )
-                # add to plot with annotation
-                make_annotation(intron_line[0], fig, ax, geneinfo, tag_background)
-
-                # (2) Add to-shrink region
-                intron_line = ax.plot(
-                    [row[ADJSTART_COL], row[ADJEND_COL]],
-                    [gene_ix, gene_ix],
-                    color=exon_color,
-                    linewidth=0.5,
-                    linestyle="--",
-                    zorder=1,
+        elif kind == "exons":
+            ax = axes[exons_l["chrom_ix"][i]]
+            ax.add_patch(
+                Rectangle(
+                    (exons_l["x0"][i], exons_l["y0"][i]),
+                    exons_l["x1"][i] - exons_l["x0"][i],
+                    exons_l["height"][i],
+                    edgecolor=exon_border[i],
+                    facecolor=exon_color[i],
+                    fill=True,
+                    rasterized=rasterized,
                 )
-                # add to plot with annotation
-                make_annotation(intron_line[0], fig, ax, geneinfo, tag_background)
-
-                # (3) Add final fixed region if needed
-                if (ix == len(ts_intron) - 1) and (row[ADJEND_COL] != stop):
-                    # add last fixed region
-                    # create continuous line
-                    intron_line = ax.plot(
-                        [row[ADJEND_COL], stop],
-                        [gene_ix, gene_ix],
-                        color=exon_color,
-                        linewidth=1,
-                        zorder=1,
-                    )
-                    # add to plot with annotation
-                    make_annotation(intron_line[0], fig, ax, geneinfo, tag_background)
-
-                # store interval end for next iteration
-                prev_tsend = row[ADJEND_COL]
-
-        intron_size = coord2percent(ax, start, stop)
-        incl = percent2coord(
-            ax, arrow_size / 2
-        )  # how long is the arrow in the plot (OX)
-
-        # Plot DIRECTION ARROW in INTRONS if strand is known
-        dir_flag.append(
-            plot_direction(
-                ax,
-                strand,
-                arrow_size,
-                intron_size,
-                start,
-                stop,
-                incl,
-                gene_ix,
-                exon_height,
-                arrow_color,
-                arrow_style,
-                arrow_width,
             )
+        elif kind == "arrows":
+            ax = axes[arrows_l["chrom_ix"][i]]
+            ax.plot(
+                [arrows_l["x0"][i], arrows_l["x1"][i]],
+                [arrows_l["y0"][i], arrows_l["y1"][i]],
+                color=arrow_color,
+                linewidth=arrow_width,
+                solid_capstyle=arrow_style,
+                rasterized=rasterized,
+            )
+
+    if not hover:
+        return
+
+    # hover of introns and exons registered per axis in drawing order
+    hover_items = pd.concat(
+        [
+            introns[ORDER_COLS + ["chrom_ix", "x0", "x1"]].assign(
+                y0=introns["y"], y1=introns["y"], info=intron_info, pad=True
+            ),
+            exons[ORDER_COLS + ["chrom_ix", "x0", "x1", "y0", "y1"]].assign(
+                info=exon_info, pad=False
+            ),
+        ],
+        ignore_index=True,
+    ).sort_values(ORDER_COLS, kind="stable")
+    for chrom_ix, items in hover_items.groupby("chrom_ix", sort=False):
+        register_hover(
+            fig,
+            axes[chrom_ix],
+            items["x0"].to_numpy(),
+            items["x1"].to_numpy(),
+            items["y0"].to_numpy(),
+            items["y1"].to_numpy(),
+            items["info"].tolist(),
+            tag_bkg,
+            pad=items["pad"].to_numpy(),
         )
 
-    introns.apply(apply_plot_intron, axis=1)
 
-    if 1 in dir_flag:
-        return 1
-    else:
-        return 0
+def batch_items(batch, kind, axes, items, y0, y1, geneinfo=None, **style):
+    """Store the items of one kind in the batch entries of the axes, one per axis."""
+
+    chrom_ix = items["chrom_ix"].to_numpy()
+    for c, ax in enumerate(axes):
+        ix = np.flatnonzero(chrom_ix == c)
+        batch[(kind, ax)] = {
+            "x0": items["x0"].to_numpy()[ix],
+            "x1": items["x1"].to_numpy()[ix],
+            "y0": np.asarray(y0)[ix],
+            "y1": np.asarray(y1)[ix],
+            "geneinfo": [geneinfo[j] for j in ix] if geneinfo is not None else None,
+            "style": {name: [val[j] for j in ix] for name, val in style.items()},
+        }
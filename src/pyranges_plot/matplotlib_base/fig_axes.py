@@ -1,13 +1,12 @@
 import numpy as np
 import matplotlib.pyplot as plt
 import matplotlib.gridspec as gridspec
+from matplotlib.figure import Figure
 from matplotlib.ticker import ScalarFormatter
 from matplotlib.ticker import MaxNLocator
 from matplotlib.patches import Rectangle
-from pyranges.core.names import START_COL, END_COL
-from pyranges_plot.core import cumdelting
 from .core import make_annotation
-from ..names import CUM_DELTA_COL, PR_INDEX_COL
+from ..names import PR_INDEX_COL
 
 
 def ax_display(ax, title, chrom, t_dict, plot_back, plot_border):
@@ -29,7 +28,7 @@ def ax_limits(ax, x_min, x_max, x_rang, grid_color):
     ax.set_xlim(
         x_min - 0.05 * x_rang, x_max + 0.05 * x_rang
     )  # add 5% to limit coordinates range
-    plt.ticklabel_format(style="plain")
+    ax.ticklabel_format(style="plain")
     ax.grid(visible=True, axis="x", linestyle=":", color=grid_color)  # , zorder = -1)
     ax.xaxis.set_major_formatter(ScalarFormatter())
     ax.xaxis.get_major_formatter().set_scientific(False)  # not scientific notation
@@ -39,20 +38,16 @@ def ax_limits(ax, x_min, x_max, x_rang, grid_color):
     )  # only integer ticks for bases
 
 
-def ax_shrink_rects(ax, fig, ts_data, chrom, y_min, y_max, shrunk_bkg, tag_background):
+def ax_shrink_rects(
+    ax, fig, shrink_tf, y_min, y_max, shrunk_bkg, tag_background, hover=True
+):
     """Add shrunk regions rectangles to the plot."""
 
-    rects_df = ts_data[chrom].copy()
-    rects_df["cumdelta_end"] = rects_df[CUM_DELTA_COL]
-    rects_df["cumdelta_start"] = rects_df[CUM_DELTA_COL].shift(periods=1, fill_value=0)
-    rects_df[START_COL] -= rects_df["cumdelta_start"]
-    rects_df[END_COL] -= rects_df["cumdelta_end"]
-
-    for a, b, c, d in zip(
-        rects_df[START_COL],
-        rects_df[END_COL],
-        rects_df["cumdelta_start"],
-        rects_df["cumdelta_end"],
+    for a, b, ori_a, ori_b in zip(
+        shrink_tf.shrink(shrink_tf.starts),
+        shrink_tf.shrink(shrink_tf.ends),
+        shrink_tf.starts,
+        shrink_tf.ends,
     ):
         ts_range = Rectangle(
             (a, y_min - 1),
@@ -64,13 +59,14 @@ def ax_shrink_rects(ax, fig, ts_data, chrom, y_min, y_max, shrunk_bkg, tag_backg
             linewidth=0,
         )
         ax.add_patch(ts_range)
-        make_annotation(
-            ts_range,
-            fig,
-            ax,
-            f"Shrinked region:\n[{a + c} - {b + d}]",
-            tag_background,
-        )
+        if hover:
+            make_annotation(
+                ts_range,
+                fig,
+                ax,
+                f"Shrinked region:\n[{ori_a} - {ori_b}]",
+                tag_background,
+            )
 
 
 def create_fig(
@@ -80,7 +76,7 @@ def create_fig(
     chrmd_df_grouped,
     genesmd_df,
     id_col,
-    ts_data,
+    shrink_tf_d,
     legend_item_d,
     title_chr,
     title_dict_plt,
@@ -98,16 +94,22 @@ def create_fig(
     shrunk_bkg,
     v_spacer,
     exon_height,
+    headless=False,
 ):
     """Generate the figure and axes fitting the data."""
 
     # Unify titles and start figure
     titles = [title_chr.format(**{"chrom": chrom}) for chrom in chrmd_df_grouped.index]
-    fig = plt.figure(figsize=(x, y), facecolor=fig_bkg)
+    # headless figures are not handled by pyplot, nor kept open after export
+    if headless:
+        fig = Figure(figsize=(x, y), facecolor=fig_bkg)
+    else:
+        fig = plt.figure(figsize=(x, y), facecolor=fig_bkg)
 
     gs = gridspec.GridSpec(
         len(titles),
         1,
+        figure=fig,
         height_ratios=chrmd_df_grouped["y_height"].to_list(),
     )  # size of chromosome subplot according to number of gene rows
 
@@ -115,7 +117,7 @@ def create_fig(
     axes = []
     for i in range(len(titles)):
         chrom = chrmd_df_grouped.index[i]
-        axes.append(plt.subplot(gs[i]))
+        axes.append(fig.add_subplot(gs[i]))
         ax = axes[i]
         # Adjust plot display
         ax_display(ax, title_chr, chrom, title_dict_plt, plot_background, plot_border)
@@ -206,8 +208,7 @@ def create_fig(
                 to_add_val += original_ticks
 
             # compute new coordinates of conserved previous ticks
-            to_add = to_add_val.copy()
-            to_add = cumdelting(to_add, ts_data, chrom)
+            to_add = shrink_tf_d[chrom].shrink(to_add_val).tolist()
 
             # set new ticks
             x_ticks_val = sorted(to_add)
@@ -227,26 +228,26 @@ def create_fig(
         y_min = 0.5 - exon_height / 2
         y_max = chrmd_df_grouped.loc[chrom]["y_height"]
         ax.set_ylim(y_min - v_spacer, y_max + v_spacer)
-        # gene name as y labels if not packed and not y_labels
+        # gene name as y labels if not packed and not y_labels, if the limits left any
         y_ticks_val = []
         y_ticks_name = []
-        if not packed and not y_labels:
+        if not packed and not y_labels and chrom in genesmd_df.index:
             y_ticks_val = genesmd_df.loc[chrom]["ycoord"] + 0.5
             y_ticks_val.reset_index(PR_INDEX_COL, drop=True, inplace=True)
             y_ticks_name = y_ticks_val.index
             y_ticks_val = y_ticks_val.to_list()
 
         # Add shrink rectangles
-        if ts_data:
+        if shrink_tf_d:
             ax_shrink_rects(
                 ax,
                 fig,
-                ts_data,
-                chrom,
+                shrink_tf_d[chrom],
                 y_min,
                 y_max,
                 shrunk_bkg,
                 tag_background,
+                not headless,
             )
 
         ax.tick_params(colors=plot_border, which="both")
@@ -282,7 +283,7 @@ def create_fig(
         ax.set_yticks(y_ticks_val)
         ax.set_yticklabels(list(y_ticks_name))
 
-    plt.subplots_adjust(hspace=0.7)
+    fig.subplots_adjust(hspace=0.7)
 
     # Create legend
     if legend:
@@ -20,3 +20,4 @@ BORDER_COLOR_COL = "__exon_border__"
 EXON_IX_COL = "__exon_ix__"
 TEXT_PAD_COL = "__text_pad__"
 THICK_COL = "__thickness_col__"
+TOOLTIP_COL = "__tooltip_text__"
@@ -30,9 +30,24 @@ plot_features_dict = {
         "Sequence of colors to assign to every group of intervals sharing the same “color_col” value. It can be provided as a Matplotlib colormap, a Plotly color sequence (built as lists), a string naming the previously mentioned color objects from Matplotlib and Plotly, or a dictionary with the following structure {color_column_value1: color1, color_column_value2: color2, ...}. When a specific color_col value is not specified in the dictionary it will be colored in black.",
         " ",
     ),
+    "dash_lod": (
+        None,
+        "Maximum number of intervals drawn in each plot of the Plotly app. When given, only the intervals within the shown region are sent to the browser and drawn again on zoom, genes are shown as single bars when there are more intervals than this number and direction arrows are not displayed.",
+        " ",
+    ),
     "exon_border": (None, "Color of the interval's rectangle border.", " "),
     "exon_height": (0.6, "Height of the exon rectangle in the plot.", " "),
     "fig_bkg": ("white", "Bakground color of the whole figure.", " "),
+    "file_dpi": (
+        400,
+        "Resolution in dots per inch of the files exported with Matplotlib.",
+        " ",
+    ),
+    "file_rasterized": (
+        False,
+        "Whether the intervals, introns and arrows are drawn as an image inside the files exported with Matplotlib, keeping pdf files of plots with many items light while the text remains as vector.",
+        " ",
+    ),
     "grid_color": ("lightgrey", "Color of x coordinates grid lines.", " "),
     "intron_color": (
         None,
@@ -63,6 +78,16 @@ plot_features_dict = {
         "Space where the id annotation is placed beside the interval. When text_pad is float, it represents the percentage of the plot space, while an int pad represents number of positions or base pairs.",
         " ",
     ),
+    "text_mode": (
+        "trace",
+        "How the id annotations are drawn in Plotly. 'trace' draws the annotations of each plot as one text trace, while 'annotation' adds one layout annotation per gene.",
+        " ",
+    ),
+    "text_cull": (
+        False,
+        "Whether the id annotations overlapping a previous one are not shown. The space taken by each annotation is estimated from text_size and the size of the figure, which is useful for dense plots where most of the annotations can not be read.",
+        " ",
+    ),
     "text_size": (10, "Fontsize of the text annotation beside the intervals.", " "),
     "title_color": ("black", "Color of the plots' titles.", " "),
     "title_size": (18, "Size of the plots' titles.", " "),
@@ -1,3 +1,4 @@
+import copy
 import pandas as pd
 import numpy as np
 
@@ -12,17 +13,24 @@ from .core import (
     set_theme,
     get_theme,
     set_options,
+    cache_key,
+    cache_get,
+    cache_put,
 )
 from .plot_features import prp_cmap
 from .data_preparation import (
+    limits_filter,
     make_subset,
+    split_utr,
+    template_columns,
     get_genes_metadata,
     get_chromosome_metadata,
     compute_thresh,
     compute_tpad,
     subdf_assigncolor,
 )
-from .introns_off import introns_resize, recalc_axis
+from .region_index import RegionIndex
+from .introns_off import introns_resize, recalc_axis, ShrinkTransform
 from pyranges.core.names import CHROM_COL, START_COL, END_COL, STRAND_COL
 from .names import (
     PR_INDEX_COL,
@@ -53,10 +61,21 @@ try:
 except ImportError:
     missing_ply_flag = 1
 
+# Check for raster dependencies
+try:
+    from .raster_base.plot_exons_raster import plot_exons_raster
+
+    missing_raster_flag = 0
+except ImportError:
+    missing_raster_flag = 1
+
+from .svg_base.plot_exons_svg import plot_exons_svg
+
 
 def plot(
     data,
     *,
+    region=None,
     id_col=None,
     warnings=None,
     max_shown=25,
@@ -76,6 +95,7 @@ def plot(
     tooltip=None,
     to_file=None,
     theme=None,
+    render=None,
     **kargs,
 ):
     """
@@ -83,8 +103,13 @@ def plot(
 
     Parameters
     ----------
-    data: {pyranges.PyRanges or list of pyranges.PyRanges}
-        Pyranges, derived dataframe or list of them with annotation data.
+    data: {pyranges.PyRanges or list of pyranges.PyRanges or RegionIndex}
+        Pyranges, derived dataframe or list of them with annotation data. A RegionIndex can be given
+        to plot the genes of a region.
+
+    region: tuple, default None
+        Region to plot from a RegionIndex given as data, as (chromosome, start, end). When limits are
+        not given, the region is used as limits.
 
     id_col: str, default None
         Name of the column containing gene ID.
@@ -127,6 +152,7 @@ def plot(
         and the limits data, the limits will be defined by the minimum and maximum coordinates
         in the pyranges object defined as limits. If some plotted chromosomes are not present they
         will be left as default.
+        Only the genes overlapping the given limits are prepared and counted for max_shown.
 
     thick_cds: bool, default False
         Display differentially transcript regions belonging and not belonging to CDS. The CDS/exon information
@@ -157,13 +183,22 @@ def plot(
         strings. If you want to introduce a newline you can use a newline character "\" + "n".
 
     to_file: {str, tuple}, default None
-        Name of the file to export specifying the desired extension. The supported extensions are '.png' and '.pdf'.
+        Name of the file to export specifying the desired extension. The supported extensions are '.png', '.pdf' and
+        '.svg'.
         Optionally, a tuple can be privided where the file name is specified as a str in the first position and in the
         second position there is a tuple specifying the height and width of the figure in px.
 
     theme: str, default "light"
         General color appearance of the plot. Available modes: "light", "dark", "Mariotti_lab", "swimming_pool".
 
+    render: str, default None
+        Strategy used to draw the intervals. When None, every interval is drawn as an individual plot item. Use
+        "batched" to draw the intervals of each subplot as a few grouped items (Plotly traces sharing color or
+        Matplotlib collections), which is much faster for plots with many intervals. Use "webgl" to draw the
+        batched Plotly traces with WebGL, so plots with a large number of intervals can still be panned and zoomed
+        smoothly. In that case the hover information appears over the interval corners. Matplotlib uses the
+        "batched" strategy when "webgl" is given.
+
     **kargs
         Customizable plot features can be defined using kargs. Use print_options() function to check the variables'
         nomenclature, description and default values.
@@ -190,15 +225,58 @@ def plot(
     >>> plot([p, p], id_col="transcript_id", y_labels=["first_p", "second_p"], packed=False, to_file='my_plot.pdf')
     """
 
-    # Treat input data as list
-    if not isinstance(data, list):
-        data = [data]
+    # Check plot options before preparing the data
+    n_data = len(data) if isinstance(data, list) else 1
+    check_render_args(y_labels, n_data, to_file, render)
+
+    # data columns used only when rendering
+    columns = []
+    if isinstance(text, str):
+        columns += template_columns(text)
+    if depth_col is not None:
+        columns.append(depth_col)
+
+    prepared = prepare(
+        data,
+        region=region,
+        id_col=id_col,
+        max_shown=max_shown,
+        packed=packed,
+        color_col=color_col,
+        thickness_col=thickness_col,
+        shrink=shrink,
+        limits=limits,
+        thick_cds=thick_cds,
+        tooltip=tooltip,
+        theme=theme,
+        columns=columns,
+        **kargs,
+    )
+
+    return prepared.render(
+        warnings=warnings,
+        return_plot=return_plot,
+        add_aligned_plots=add_aligned_plots,
+        depth_col=depth_col,
+        text=text,
+        legend=legend,
+        title_chr=title_chr,
+        y_labels=y_labels,
+        to_file=to_file,
+        theme=theme,
+        render=render,
+        **kargs,
+    )
+
+
+def check_render_args(y_labels, n_data, to_file, render):
+    """Check the plot options not depending on the data and provide the file name and size."""
 
     # Ensure correct y_labels
     if y_labels:
-        if len(y_labels) != len(data):
+        if len(y_labels) != n_data:
             raise Exception(
-                f"The number of provided y_labels {y_labels} does not match the number of PyRanges objects ({len(data)})."
+                f"The number of provided y_labels {y_labels} does not match the number of PyRanges objects ({n_data})."
             )
 
     # Deal with export
@@ -206,17 +284,17 @@ def plot(
         # given str file name
         if isinstance(to_file, str):
             ext = to_file[-4:]
-            if ext not in [".pdf", ".png"]:
+            if ext not in [".pdf", ".png", ".svg"]:
                 raise Exception(
-                    "Please specify the desired format to export the file including either '.png' or '.pdf' as an extension."
+                    "Please specify the desired format to export the file including either '.png', '.pdf' or '.svg' as an extension."
                 )
             file_size = (1600, 800)
         # given tuple (name, size)
         else:
             ext = to_file[0][-4:]
-            if ext not in [".pdf", ".png"]:
+            if ext not in [".pdf", ".png", ".svg"]:
                 raise Exception(
-                    "Please specify the desired format to export the file including either '.png' or '.pdf' as an extension."
+                    "Please specify the desired format to export the file including either '.png', '.pdf' or '.svg' as an extension."
                 )
             file_size = to_file[1]
             to_file = to_file[0]
@@ -224,46 +302,18 @@ def plot(
     else:
         file_size = (1600, 800)
 
-    # Deal with id column
-    if id_col is None:
-        ID_COL = get_id_col()
-        if not ID_COL:
-            ID_COL = ["__interval_index__"]
-    else:
-        ID_COL = id_col
-    # treat as list
-    if isinstance(ID_COL, str):
-        ID_COL = [ID_COL]
-
-    for df_item in data:
-        for id_str in ID_COL:
-            # Ensure correct names
-            if (
-                id_str is not None
-                and id_str not in df_item.columns
-                and id_str != "__interval_index__"
-            ):
-                raise Exception(
-                    "Please define a correct name of the ID column using either set_id_col() function or plot_generic parameter as plot_generic(..., id_col = 'your_id_col')"
-                )
-            # Avoid Nan in id column
+    # Deal with render
+    if render not in [None, "batched", "webgl"]:
+        raise Exception(
+            f"The provided render '{render}' is not valid. Accepted values are None, 'batched' and 'webgl'."
+        )
 
-    # Deal with transcript structure
-    if thick_cds:
-        for df_item in data:
-            if "Feature" not in df_item.columns:
-                raise Exception(
-                    "The transcript structure information must be stored in 'Feature' column of the data."
-                )
+    return to_file, file_size
 
-    # Deal with warnings
-    if warnings is None:
-        warnings = get_warnings()
 
-    # Deal with engine
-    engine = get_engine()
+def get_feat_dict(theme, kargs):
+    """Provide the plot features defined by the theme and kargs."""
 
-    # PREPARE DATA for plot
     # Deal with plot features as kargs
     wrong_keys = [k for k in kargs if k not in print_options(return_keys=True)]
     if wrong_keys:
@@ -312,6 +362,8 @@ def plot(
         "v_spacer": getvalue("v_spacer"),
         "text_size": float(getvalue("text_size")),
         "text_pad": getvalue("text_pad"),
+        "text_mode": getvalue("text_mode"),
+        "text_cull": getvalue("text_cull"),
         "plotly_port": getvalue("plotly_port"),
         "arrow_line_width": float(getvalue("arrow_line_width")),
         "arrow_color": getvalue("arrow_color"),
@@ -319,37 +371,239 @@ def plot(
         "shrink_threshold": getvalue("shrink_threshold"),
         "shrunk_bkg": getvalue("shrunk_bkg"),
         "x_ticks": getvalue("x_ticks"),
+        "dash_lod": getvalue("dash_lod"),
+        "file_dpi": getvalue("file_dpi"),
+        "file_rasterized": getvalue("file_rasterized"),
     }
-    shrink_threshold = feat_dict["shrink_threshold"]
-    colormap = feat_dict["colormap"]
-    if colormap == "popart":
-        colormap = prp_cmap
 
     # restore options set before plot is called
     set_theme(oldtheme)
     set_options(oldfeat_dict)
 
+    return feat_dict
+
+
+def prepare(
+    data,
+    *,
+    region=None,
+    id_col=None,
+    max_shown=25,
+    packed=True,
+    color_col=None,
+    thickness_col=None,
+    shrink=False,
+    limits=None,
+    thick_cds=False,
+    tooltip=None,
+    theme=None,
+    columns=None,
+    **kargs,
+):
+    """
+    Prepare the data of 1/+ PyRanges objects to be plotted one or several times.
+
+    Subsetting, coloring, gene placement, shrinking and default tooltips are computed once and stored in a
+    PreparedPlot, whose render method creates the plot. The data preparation is not repeated when the same
+    data is plotted with other themes, engines or export files.
+
+    Parameters
+    ----------
+    data: {pyranges.PyRanges or list of pyranges.PyRanges or RegionIndex}
+        Pyranges, derived dataframe or list of them with annotation data, or a RegionIndex.
+
+    region, id_col, max_shown, packed, color_col, thickness_col, shrink, limits, thick_cds, tooltip, theme
+        Same as in the plot function.
+
+    columns: list, default None
+        Data columns needed for rendering besides the ones used by the given options, such as the ones referred
+        in the text or the depth_col of render(). When None, all the data columns are kept. The content of
+        these columns is also compared to reuse cached prepared plots.
+
+    **kargs
+        Customizable plot features can be defined using kargs. Use print_options() function to check the variables'
+        nomenclature, description and default values.
+
+    Returns
+    -------
+    PreparedPlot
+        Prepared data to be plotted using its render method.
+
+    Examples
+    --------
+
+    >>> import pyranges as pr, pyranges_plot as prp
+
+    >>> p = pr.PyRanges({"Chromosome": [1]*5, "Strand": ["+"]*3 + ["-"]*2, "Start": [10,20,30,25,40], "End": [15,25,35,30,50], "transcript_id": ["t1"]*3 + ["t2"]*2})
+
+    >>> prepared = prp.prepare(p, id_col="transcript_id", shrink=True)
+
+    >>> prepared.render(engine="plt", theme="dark", to_file="my_plot.png")
+
+    >>> prepared.render(engine="ply", to_file="my_plot.pdf")
+    """
+
+    # Extract the genes of the region from an index
+    if isinstance(data, RegionIndex):
+        if id_col is None and data.id_col:
+            id_col = data.id_col
+        if region is not None:
+            chrom, start, end = region
+            if limits is None:
+                limits = {chrom: (start, end)}
+            data = data.query(chrom, start, end)
+        else:
+            data = data.data
+    elif region is not None:
+        raise Exception("The region parameter requires data given as a RegionIndex.")
+
+    # Treat input data as list
+    if not isinstance(data, list):
+        data = [data]
+
+    # Deal with id column
+    if id_col is None:
+        ID_COL = get_id_col()
+        if not ID_COL:
+            ID_COL = ["__interval_index__"]
+    else:
+        ID_COL = id_col
+    # treat as list
+    if isinstance(ID_COL, str):
+        ID_COL = [ID_COL]
+
+    for df_item in data:
+        for id_str in ID_COL:
+            # Ensure correct names
+            if (
+                id_str is not None
+                and id_str not in df_item.columns
+                and id_str != "__interval_index__"
+            ):
+                raise Exception(
+                    "Please define a correct name of the ID column using either set_id_col() function or plot_generic parameter as plot_generic(..., id_col = 'your_id_col')"
+                )
+            # Avoid Nan in id column
+
+    # Deal with transcript structure
+    if thick_cds:
+        for df_item in data:
+            if "Feature" not in df_item.columns:
+                raise Exception(
+                    "The transcript structure information must be stored in 'Feature' column of the data."
+                )
+
+    # PREPARE DATA for plot
+    feat_dict = get_feat_dict(theme, kargs)
+
+    # Columns referred by the options, all of them if tooltips are templates stored in a column
+    if tooltip is not None and tooltip.startswith("$"):
+        option_cols = None
+    else:
+        option_cols = [CHROM_COL, START_COL, END_COL] + ID_COL + SPECIAL_COLS
+        if isinstance(color_col, str):
+            option_cols.append(color_col)
+        elif color_col is not None:
+            option_cols += color_col
+        if thickness_col is not None:
+            option_cols.append(thickness_col)
+        if tooltip is not None:
+            option_cols += template_columns(tooltip)
+        option_cols = set(option_cols)
+    if columns is None or option_cols is None:
+        used_cols = None
+    else:
+        used_cols = option_cols | set(columns)
+
+    # Reuse the prepared data of the same content in the used columns and options if cached
+    cache_data = list(data)
+    if isinstance(limits, pd.DataFrame):
+        cache_data.append(limits[[CHROM_COL, START_COL, END_COL]])
+        limits_opt = "data"
+    else:
+        limits_opt = limits
+    key = cache_key(
+        cache_data,
+        {
+            "id_col": ID_COL,
+            "max_shown": max_shown,
+            "packed": packed,
+            "color_col": color_col,
+            "thickness_col": thickness_col,
+            "shrink": shrink,
+            "limits": limits_opt,
+            "thick_cds": thick_cds,
+            "tooltip": tooltip,
+            "columns": columns,
+            "feat_dict": feat_dict,
+            "engine": get_engine(),
+            "warnings": get_warnings(),
+        },
+        option_cols if used_cols is None else used_cols,
+    )
+    prepared = cache_get(key)
+    if prepared is not None:
+        return prepared
+
+    shrink_threshold = feat_dict["shrink_threshold"]
+    colormap = feat_dict["colormap"]
+    if colormap == "popart":
+        colormap = prp_cmap
+
     # Make DataFrame subset if needed
     df_d = {}
     tot_ngenes_l = []
+    empty_l = []
     for pr_ix, df_item in enumerate(data):
         # deal with empty PyRanges
         if df_item.empty:
             continue
-        df_item = df_item.copy()
+
+        # select the genes using only the key columns, the data is not copied
+        key_cols = [CHROM_COL, START_COL, END_COL] + [
+            c for c in ID_COL if c in df_item.columns
+        ]
+        keys = pd.DataFrame({c: df_item[c].array for c in key_cols}, copy=False)
 
         # consider not known id_col, plot each interval individually
         if ID_COL == ["__interval_index__"]:
-            df_item["__interval_index__"] = [str(i) for i in range(len(df_item))]
-            df_d[pr_ix], tot_ngenes = make_subset(
-                df_item, "__interval_index__", max_shown
-            )
-            tot_ngenes_l.append(tot_ngenes)
+            keys["__interval_index__"] = [str(i) for i in range(len(keys))]
+
+        # keep only the genes overlapping the limits and their plot margin
+        in_limits = limits_filter(keys, limits, ID_COL, margin=0.05)
+        if len(in_limits) < len(keys):
+            # chromosomes left without genes keep their plot
+            empty = ~keys[CHROM_COL].isin(in_limits[CHROM_COL].unique())
+            if empty.any():
+                extent = (
+                    keys[empty]
+                    .groupby(CHROM_COL, observed=True)
+                    .agg({START_COL: "min", END_COL: "max"})
+                    .reset_index()
+                )
+                extent[PR_INDEX_COL] = pr_ix
+                empty_l.append(extent)
+            keys = in_limits
 
-        # known id_col
+        # genes counted after the limits for the subset warning
+        if keys.empty:
+            tot_ngenes = 0
         else:
-            df_d[pr_ix], tot_ngenes = make_subset(df_item, ID_COL, max_shown)
-            tot_ngenes_l.append(tot_ngenes)
+            keys, tot_ngenes = make_subset(keys, ID_COL, max_shown)
+        tot_ngenes_l.append(tot_ngenes)
+
+        # copy only the selected rows and the used columns
+        if len(keys) < len(df_item):
+            df_item = df_item.take(keys.index.to_numpy())
+        if used_cols is not None:
+            col_ix = [i for i, c in enumerate(df_item.columns) if c in used_cols]
+            if len(col_ix) < len(df_item.columns):
+                df_item = df_item.take(col_ix, axis=1)
+        if ID_COL == ["__interval_index__"]:
+            df_item = df_item.assign(
+                __interval_index__=keys["__interval_index__"].to_numpy()
+            )
+        df_d[pr_ix] = df_item
 
     for tot_ngenes in tot_ngenes_l:
         if tot_ngenes > max_shown:
@@ -361,6 +615,7 @@ def plot(
     # concat subset dataframes and create new column with input list index
     if not df_d:
         raise Exception("The provided PyRanges object/s are empty.")
+    empty_chroms = pd.concat(empty_l, ignore_index=True) if empty_l else None
     subdf = pd.concat(df_d, names=[PR_INDEX_COL]).reset_index(
         level=PR_INDEX_COL
     )  ### change to pr but doesn't work yet!!
@@ -369,8 +624,10 @@ def plot(
     # if len(ID_COL) > 1:
     #   subdf["__id_col_2count__"] = list(zip(*[subdf[c] for c in ID_COL+[PR_INDEX_COL]+[CHROM_COL]]))
     # else:
-    subdf["__id_col_2count__"] = list(
-        zip(*[subdf[c] for c in [CHROM_COL] + [PR_INDEX_COL] + ID_COL])
+    subdf["__id_col_2count__"] = pd.Series(
+        list(zip(*[subdf[c] for c in [CHROM_COL] + [PR_INDEX_COL] + ID_COL])),
+        index=subdf.index,
+        dtype=object,
     )
 
     # Deal with thickness_col
@@ -382,6 +639,8 @@ def plot(
             raise Exception(
                 "The provided data does not contain any interval containing 'exon' or 'CDS' in the Feature column, no data wil be plotted using 'thick_cds'."
             )
+        # exons reduced to their UTR parts
+        subdf = split_utr(subdf, ID_COL)
         # set proper thickness column
         thickness_col = "Feature"
 
@@ -438,6 +697,7 @@ def plot(
         packed,
         feat_dict["v_spacer"],
         feat_dict["exon_height"],
+        empty_chroms=empty_chroms,
     )
 
     # Deal with introns off
@@ -447,6 +707,7 @@ def plot(
     subdf[ORIEND_COL] = subdf[END_COL]
     tick_pos_d = {}
     ori_tick_pos_d = {}
+    shrink_tf_d = {}
 
     if shrink:
         # compute threshold
@@ -454,15 +715,23 @@ def plot(
             subdf[SHRTHRES_COL] = [shrink_threshold] * len(subdf)
         elif isinstance(shrink_threshold, float):
             subdf[SHRTHRES_COL] = [shrink_threshold] * len(subdf)
-            subdf = subdf.groupby(CHROM_COL, group_keys=False, observed=True).apply(
-                lambda x: compute_thresh(x, chrmd_df_grouped) if not x.empty else None
-            )
+            if not subdf.empty:
+                subdf = subdf.groupby(CHROM_COL, group_keys=False, observed=True).apply(
+                    lambda x: compute_thresh(x, chrmd_df_grouped)
+                    if not x.empty
+                    else None
+                )
 
-        subdf = subdf.groupby(CHROM_COL, group_keys=False, observed=True).apply(
-            lambda x: introns_resize(x, ts_data, ID_COL)  # if not x.empty else None
-        )  # empty rows when subset
+        subdf = introns_resize(
+            subdf,
+            ts_data,
+            [] if empty_chroms is None else empty_chroms[CHROM_COL].unique(),
+        )
         subdf[START_COL] = subdf[ADJSTART_COL]
         subdf[END_COL] = subdf[ADJEND_COL]
+        shrink_tf_d = {
+            chrom: ShrinkTransform(ts_chrom) for chrom, ts_chrom in ts_data.items()
+        }
 
         # recompute limits
         chrmd_df, chrmd_df_grouped = get_chromosome_metadata(
@@ -472,13 +741,14 @@ def plot(
             packed,
             feat_dict["v_spacer"],
             feat_dict["exon_height"],
-            ts_data=ts_data,
+            shrink_tf_d=shrink_tf_d,
+            empty_chroms=empty_chroms,
         )
 
         # compute new axis values and positions if needed
-        if ts_data:
+        if shrink_tf_d:
             tick_pos_d, ori_tick_pos_d = recalc_axis(
-                ts_data, tick_pos_d, ori_tick_pos_d
+                shrink_tf_d, tick_pos_d, ori_tick_pos_d
             )
 
     else:
@@ -498,90 +768,234 @@ def plot(
         subdf[TEXT_PAD_COL] = [text_pad] * len(subdf)
     elif isinstance(text_pad, float):
         subdf[TEXT_PAD_COL] = [text_pad] * len(subdf)
-        subdf = subdf.groupby(CHROM_COL, group_keys=False, observed=True).apply(
-            lambda x: compute_tpad(x, chrmd_df_grouped) if not x.empty else None
-        )
-
-    # Deal with added plots
-    if (len(chrmd_df_grouped) > 1) and add_aligned_plots:
-        raise Exception(
-            f"The parameter add_aligned_plots accepts only one chromosome in the input data. The provided data contains {len(chrmd_df_grouped)}"
-        )
+        if not subdf.empty:
+            subdf = subdf.groupby(CHROM_COL, group_keys=False, observed=True).apply(
+                lambda x: compute_tpad(x, chrmd_df_grouped) if not x.empty else None
+            )
 
     if "REF" in subdf.columns:
         subdf["REF"] = subdf["REF"].astype(str)
         subdf["REF"] = subdf["REF"].replace(["nan", "NaN", "None"], np.nan)
 
     if tooltip is None:
-        # Create a list to store the updated tooltips
-        updated_tooltips = []
-        subdf["__tooltip__"] = ""
-        for index, row in subdf.iterrows():
-            if STRAND_COL in subdf.columns:
-                strand = row.get(STRAND_COL)
-            else:
-                strand = ""
-            if "REF" in subdf.columns:
-                if pd.notna(row.get("REF", None)):
-                    tool_str = row["REF"] + ">" + row["ALT"]
-                    geneinfo = f"({(row.__oriStart__)}, {(row.__oriEnd__)})<br>ID: {row['__id_col_2count__'][2]}<br>{tool_str}"
-                else:
-                    if strand:
-                        geneinfo = f"[{strand}] ({(row.__oriStart__)}, {(row.__oriEnd__)})<br>ID: {row['__id_col_2count__'][2]}"  # default with strand
-                    else:
-                        geneinfo = f"({(row.__oriStart__)}, {(row.__oriEnd__)})<br>ID: {row['__id_col_2count__'][2]}"  # default without strand
-            else:
-                if strand:
-                    geneinfo = f"[{strand}] ({(row.__oriStart__)}, {(row.__oriEnd__)})<br>ID: {row['__id_col_2count__'][2]}"  # default with strand
-                else:
-                    geneinfo = f"({(row.__oriStart__)}, {(row.__oriEnd__)})<br>ID: {row['__id_col_2count__'][2]}"  # default without strand
+        # Build the default tooltip column-wise
+        coords_str = (
+            "("
+            + subdf[ORISTART_COL].astype(str)
+            + ", "
+            + subdf[ORIEND_COL].astype(str)
+            + ")"
+        )
+        id_str = "<br>ID: " + subdf["__id_col_2count__"].str[2].astype(str)
+        geneinfo = coords_str + id_str
+
+        # add strand when known
+        if STRAND_COL in subdf.columns:
+            strand = subdf[STRAND_COL].astype(object)
+            geneinfo = geneinfo.where(
+                ~strand.astype(bool), "[" + strand.astype(str) + "] " + geneinfo
+            )
+
+        # variants show the allele change instead
+        if "REF" in subdf.columns:
+            ref_mask = subdf["REF"].notna()
+            tool_str = subdf["REF"].astype(str) + ">" + subdf["ALT"].astype(str)
+            geneinfo = geneinfo.where(
+                ~ref_mask, coords_str + id_str + "<br>" + tool_str
+            )
 
-            updated_tooltips.append(geneinfo)
-        # Assign the updated tooltips back to the DataFrame
-        subdf["__tooltip__"] = updated_tooltips
+        subdf["__tooltip__"] = geneinfo
 
     if tooltip is None:
         tooltip = "{__tooltip__}"
 
-    # deal with engine and call proper plot
-    if engine in ["plt", "matplotlib"]:
-        if not missing_plt_flag:
-            plot_exons_plt(
-                subdf=subdf,
-                depth_col=depth_col,
-                tot_ngenes_l=tot_ngenes_l,
-                feat_dict=feat_dict,
-                genesmd_df=genesmd_df,
-                chrmd_df=chrmd_df,
-                chrmd_df_grouped=chrmd_df_grouped,
-                ts_data=ts_data,
-                max_shown=max_shown,
-                id_col=ID_COL,
-                transcript_str=thick_cds,
-                tooltip=tooltip,
-                legend=legend,
-                y_labels=y_labels,
-                text=text,
-                title_chr=title_chr,
-                packed=packed,
-                to_file=to_file,
-                file_size=file_size,
-                warnings=warnings,
-                tick_pos_d=tick_pos_d,
-                ori_tick_pos_d=ori_tick_pos_d,
+    prepared = PreparedPlot(
+        subdf=subdf,
+        genesmd_df=genesmd_df,
+        chrmd_df=chrmd_df,
+        chrmd_df_grouped=chrmd_df_grouped,
+        ts_data=ts_data,
+        tick_pos_d=tick_pos_d,
+        ori_tick_pos_d=ori_tick_pos_d,
+        shrink_tf_d=shrink_tf_d,
+        feat_dict=feat_dict,
+        id_col=ID_COL,
+        color_col=color_col,
+        max_shown=max_shown,
+        packed=packed,
+        thick_cds=thick_cds,
+        tooltip=tooltip,
+        tot_ngenes_l=tot_ngenes_l,
+        subset_warn=subset_warn,
+        n_data=len(data),
+    )
+    cache_put(
+        key,
+        prepared,
+        sum(
+            df.memory_usage(deep=True).sum()
+            for df in [subdf, genesmd_df, chrmd_df, chrmd_df_grouped]
+        ),
+    )
+
+    return prepared
+
+
+# Data columns plotted in a special way when present
+SPECIAL_COLS = [STRAND_COL, "Feature", "REF", "ALT", "vcf", "Tooltip_col"]
+
+
+# Plot features defining the placement of the prepared data
+LAYOUT_FEATURES = [
+    "exon_height",
+    "transcript_utr_width",
+    "v_spacer",
+    "text_pad",
+    "shrink_threshold",
+]
+
+
+class PreparedPlot:
+    """
+    Data of 1/+ PyRanges objects ready to be plotted, created by the prepare function.
+
+    Attributes
+    ----------
+    subdf : pandas.DataFrame
+        Intervals to plot with their colors, shrunk coordinates and tooltips.
+
+    genesmd_df : pandas.DataFrame
+        Genes metadata including their placement in the plot.
+
+    chrmd_df, chrmd_df_grouped : pandas.DataFrame
+        Chromosomes metadata including the plot limits.
+
+    ts_data : dict
+        To-shrink regions of each chromosome.
+
+    tick_pos_d, ori_tick_pos_d : dict
+        Shrunk and original positions of the x ticks of each chromosome.
+    """
+
+    def __init__(self, **attrs):
+        for name, val in attrs.items():
+            object.__setattr__(self, name, val)
+
+    def __setattr__(self, name, val):
+        raise Exception(
+            "PreparedPlot objects can not be modified, use prepare() to change the data."
+        )
+
+    def render(
+        self,
+        *,
+        engine=None,
+        theme=None,
+        to_file=None,
+        return_plot=None,
+        warnings=None,
+        add_aligned_plots=None,
+        depth_col=None,
+        text=True,
+        legend=False,
+        title_chr="Chromosome {chrom}",
+        y_labels=None,
+        render=None,
+        **kargs,
+    ):
+        """
+        Create the plot of the prepared data.
+
+        Parameters
+        ----------
+        engine: str, default None
+            Matplotlib ('plt', 'matplotlib'), Plotly ('ply', 'plotly'), raster ('raster') or SVG ('svg'). When None,
+            the engine defined with set_engine() is used. The raster engine draws the intervals, introns and arrows
+            straight into an image without text, which is written to a '.png' to_file or returned as an RGBA NumPy
+            array. The SVG engine writes the plot to a '.svg' to_file as it goes, or returns it as a string.
+
+        theme, to_file, return_plot, warnings, add_aligned_plots, depth_col, text, legend, title_chr, y_labels, render
+            Same as in the plot function.
+
+        **kargs
+            Customizable plot features. The ones defining the placement of the data (exon_height, v_spacer,
+            text_pad and shrink_threshold) must be given to prepare().
+
+        Examples
+        --------
+
+        >>> prepared.render(theme="dark", title_chr="Chrom: {chrom}", to_file="my_plot.png")
+        """
+
+        to_file, file_size = check_render_args(y_labels, self.n_data, to_file, render)
+
+        # Get plot features keeping the placement ones of the prepared data
+        feat_dict = get_feat_dict(theme, kargs)
+        wrong_keys = [
+            k for k in kargs if k in LAYOUT_FEATURES and kargs[k] != self.feat_dict[k]
+        ]
+        if wrong_keys:
+            raise Exception(
+                f"The features {wrong_keys} define the placement of the data, please provide them to prepare()."
+            )
+        for key in LAYOUT_FEATURES:
+            feat_dict[key] = self.feat_dict[key]
+
+        # the engines work on copies so the prepared data stays unchanged
+        subdf = self.subdf.copy()
+        genesmd_df = self.genesmd_df.copy()
+        chrmd_df = self.chrmd_df.copy()
+        chrmd_df_grouped = self.chrmd_df_grouped.copy()
+        ts_data = dict(self.ts_data)
+        tick_pos_d = copy.deepcopy(self.tick_pos_d)
+        ori_tick_pos_d = copy.deepcopy(self.ori_tick_pos_d)
+        shrink_tf_d = self.shrink_tf_d
+        ID_COL = self.id_col
+        tooltip = self.tooltip
+        max_shown = self.max_shown
+        packed = self.packed
+        thick_cds = self.thick_cds
+        tot_ngenes_l = self.tot_ngenes_l
+        subset_warn = self.subset_warn
+
+        # color again when the theme or kargs change the colors
+        if (
+            feat_dict["colormap"] != self.feat_dict["colormap"]
+            or feat_dict["exon_border"] != self.feat_dict["exon_border"]
+        ):
+            colormap = feat_dict["colormap"]
+            if colormap == "popart":
+                colormap = prp_cmap
+            subdf = subdf_assigncolor(
+                subdf.drop(
+                    columns=["_iterwarning!", "_blackwarning!"], errors="ignore"
+                ),
+                colormap,
+                self.color_col,
+                feat_dict["exon_border"],
             )
 
-        else:
+        # Deal with added plots
+        if (len(chrmd_df_grouped) > 1) and add_aligned_plots:
             raise Exception(
-                "Make sure to install matplotlib dependecies by running `pip install pyranges-plot[plt]`"
+                f"The parameter add_aligned_plots accepts only one chromosome in the input data. The provided data contains {len(chrmd_df_grouped)}"
             )
 
-    elif engine in ["ply", "plotly"]:
-        if not missing_ply_flag:
-            if return_plot is not None:
-                return plot_exons_ply(
+        # Deal with warnings
+        if warnings is None:
+            warnings = get_warnings()
+
+        # Deal with engine
+        if engine is None:
+            engine = get_engine()
+
+        # deal with engine and call proper plot
+        if engine in ["plt", "matplotlib"]:
+            if not missing_plt_flag:
+                plot_exons_plt(
                     subdf=subdf,
                     depth_col=depth_col,
+                    tot_ngenes_l=tot_ngenes_l,
                     feat_dict=feat_dict,
                     genesmd_df=genesmd_df,
                     chrmd_df=chrmd_df,
@@ -592,8 +1006,6 @@ def plot(
                     transcript_str=thick_cds,
                     tooltip=tooltip,
                     legend=legend,
-                    return_plot=return_plot,
-                    add_aligned_plots=add_aligned_plots,
                     y_labels=y_labels,
                     text=text,
                     title_chr=title_chr,
@@ -603,39 +1015,117 @@ def plot(
                     warnings=warnings,
                     tick_pos_d=tick_pos_d,
                     ori_tick_pos_d=ori_tick_pos_d,
-                    subset_warn=subset_warn,
+                    shrink_tf_d=shrink_tf_d,
+                    render=render,
                 )
+
             else:
-                plot_exons_ply(
+                raise Exception(
+                    "Make sure to install matplotlib dependecies by running `pip install pyranges-plot[plt]`"
+                )
+
+        elif engine in ["ply", "plotly"]:
+            if not missing_ply_flag:
+                if return_plot is not None:
+                    return plot_exons_ply(
+                        subdf=subdf,
+                        depth_col=depth_col,
+                        feat_dict=feat_dict,
+                        genesmd_df=genesmd_df,
+                        chrmd_df=chrmd_df,
+                        chrmd_df_grouped=chrmd_df_grouped,
+                        ts_data=ts_data,
+                        max_shown=max_shown,
+                        id_col=ID_COL,
+                        transcript_str=thick_cds,
+                        tooltip=tooltip,
+                        legend=legend,
+                        return_plot=return_plot,
+                        add_aligned_plots=add_aligned_plots,
+                        y_labels=y_labels,
+                        text=text,
+                        title_chr=title_chr,
+                        packed=packed,
+                        to_file=to_file,
+                        file_size=file_size,
+                        warnings=warnings,
+                        tick_pos_d=tick_pos_d,
+                        ori_tick_pos_d=ori_tick_pos_d,
+                        shrink_tf_d=shrink_tf_d,
+                        subset_warn=subset_warn,
+                        render=render,
+                    )
+                else:
+                    plot_exons_ply(
+                        subdf=subdf,
+                        depth_col=depth_col,
+                        feat_dict=feat_dict,
+                        genesmd_df=genesmd_df,
+                        chrmd_df=chrmd_df,
+                        chrmd_df_grouped=chrmd_df_grouped,
+                        ts_data=ts_data,
+                        max_shown=max_shown,
+                        id_col=ID_COL,
+                        transcript_str=thick_cds,
+                        tooltip=tooltip,
+                        legend=legend,
+                        return_plot=return_plot,
+                        add_aligned_plots=add_aligned_plots,
+                        y_labels=y_labels,
+                        text=text,
+                        title_chr=title_chr,
+                        packed=packed,
+                        to_file=to_file,
+                        file_size=file_size,
+                        warnings=warnings,
+                        tick_pos_d=tick_pos_d,
+                        ori_tick_pos_d=ori_tick_pos_d,
+                        shrink_tf_d=shrink_tf_d,
+                        subset_warn=subset_warn,
+                        render=render,
+                    )
+            else:
+                raise Exception(
+                    "Make sure to install plotly dependecies by running `pip install pyranges-plot[plotly]`"
+                )
+
+        elif engine == "raster":
+            if not missing_raster_flag:
+                return plot_exons_raster(
                     subdf=subdf,
                     depth_col=depth_col,
                     feat_dict=feat_dict,
                     genesmd_df=genesmd_df,
-                    chrmd_df=chrmd_df,
                     chrmd_df_grouped=chrmd_df_grouped,
                     ts_data=ts_data,
-                    max_shown=max_shown,
                     id_col=ID_COL,
                     transcript_str=thick_cds,
-                    tooltip=tooltip,
-                    legend=legend,
-                    return_plot=return_plot,
-                    add_aligned_plots=add_aligned_plots,
-                    y_labels=y_labels,
-                    text=text,
-                    title_chr=title_chr,
-                    packed=packed,
                     to_file=to_file,
                     file_size=file_size,
-                    warnings=warnings,
-                    tick_pos_d=tick_pos_d,
-                    ori_tick_pos_d=ori_tick_pos_d,
-                    subset_warn=subset_warn,
+                    shrink_tf_d=shrink_tf_d,
                 )
-        else:
-            raise Exception(
-                "Make sure to install plotly dependecies by running `pip install pyranges-plot[plotly]`"
+            else:
+                raise Exception(
+                    "Make sure to install raster dependecies by running `pip install pyranges-plot[raster]`"
+                )
+
+        elif engine == "svg":
+            return plot_exons_svg(
+                subdf=subdf,
+                depth_col=depth_col,
+                feat_dict=feat_dict,
+                genesmd_df=genesmd_df,
+                chrmd_df_grouped=chrmd_df_grouped,
+                ts_data=ts_data,
+                id_col=ID_COL,
+                transcript_str=thick_cds,
+                tooltip=tooltip,
+                text=text,
+                title_chr=title_chr,
+                to_file=to_file,
+                file_size=file_size,
+                shrink_tf_d=shrink_tf_d,
             )
 
-    else:
-        raise Exception("Please define engine with set_engine().")
+        else:
+            raise Exception("Please define engine with set_engine().")
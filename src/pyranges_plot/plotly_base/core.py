@@ -1,41 +1,60 @@
-from dash import Dash, dcc, html, Input, Output
+from dash import Dash, dcc, html, Input, Output, State
+from dash.exceptions import PreventUpdate
 import dash_bootstrap_components as dbc
-
-
-def coord2percent(fig, trace, X0, X1):
-    """Provides the plot percentage length from the points given. Plotly friendly"""
-
-    if trace == 1:
-        trace = ""
-    else:
-        trace = str(trace)
-
-    x_min, x_max = fig["layout"]["xaxis" + trace]["range"]
-    x_rang = x_max - x_min
-
-    percent_size = float(((X1 - X0) / x_rang))
-
-    return percent_size
-
-
-def percent2coord(fig, trace, x_percent):
-    """Provides the coordinates distance from the plot percentage given. Plotly friendly"""
-
-    if trace == 1:
-        trace = ""
-    else:
-        trace = str(trace)
-
-    x_min, x_max = fig["layout"]["xaxis" + trace]["range"]
-    x_rang = x_max - x_min
-
-    percent_coord = float(x_percent * x_rang)
-
-    return percent_coord
+import plotly.graph_objects as go
+
+# Fixed trace properties of each kind of batched item, in drawing order
+BATCH_KINDS = {
+    "gene": dict(
+        fill="toself",
+        mode="lines",
+        line_width=0,
+        hoverinfo="text",
+        hoveron="points+fills",
+        showlegend=False,
+    ),
+    "intron": dict(mode="lines", line_width=0.7, hoverinfo="skip", showlegend=False),
+    "exon": dict(fill="toself", mode="lines", hoverinfo="text", hoveron="points+fills"),
+    "arrow": dict(mode="lines", hoverinfo="skip", showlegend=False),
+}
+
+
+def add_batch_traces(fig, entries, legend, webgl=False):
+    """Add one trace per batch entry to the figure."""
+
+    scatter = go.Scattergl if webgl else go.Scatter
+    legend_names = set()
+    for kind in BATCH_KINDS:
+        for entry in entries:
+            if entry["kind"] != kind:
+                continue
+
+            trace_kargs = dict(BATCH_KINDS[kind], **entry["style"])
+            # WebGL traces show the hover over the points only
+            if webgl:
+                trace_kargs.pop("hoveron", None)
+            if entry["text"]:
+                trace_kargs["text"] = entry["text"]
+
+            # only one legend entry per name
+            if kind == "exon":
+                name = trace_kargs.get("name")
+                trace_kargs["showlegend"] = bool(
+                    legend and name and name not in legend_names
+                )
+                if name:
+                    trace_kargs["legendgroup"] = name
+                    legend_names.add(name)
+
+            fig.add_trace(
+                scatter(x=entry["x"], y=entry["y"], **trace_kargs),
+                row=entry["chrom_ix"] + 1,
+                col=1,
+            )
 
 
 # Plotly - Function to initialize Dash app layout and callbacks
-def initialize_dash_app(fig, max_shown):
+def initialize_dash_app(fig, max_shown, lod=None):
     app = Dash(__name__, external_stylesheets=[dbc.themes.BOOTSTRAP])
 
     # create alert and graph components
@@ -63,11 +82,18 @@ def initialize_dash_app(fig, max_shown):
         is_open=False,
     )
 
+    # level of detail, fig holds the axes and the shown intervals are added on zoom
+    if lod is not None:
+        fig = lod.figure({})
+
     gr = dcc.Graph(id="genes-plot", figure=fig, style={"height": "800px"})
 
-    # define layout
+    # define layout, the shown range of each subplot is stored in the browser session
     app.layout = html.Div(
-        [dbc.Row([subdf_alert, uncol_alert, iter_alert, gr], justify="around")]
+        [
+            dbc.Row([subdf_alert, uncol_alert, iter_alert, gr], justify="around"),
+            dcc.Store(id="lod-windows", data={}),
+        ]
     )
 
     # callback function
@@ -104,4 +130,36 @@ def initialize_dash_app(fig, max_shown):
         if sign == 91321:
             return True
 
+    if lod is not None:
+
+        @app.callback(
+            Output("genes-plot", "figure"),
+            Output("lod-windows", "data"),
+            Input("genes-plot", "relayoutData"),
+            State("lod-windows", "data"),
+            prevent_initial_call=True,
+        )
+        def update_lod(relayout, stored):
+            # update the shown range of the zoomed subplots of this session
+            windows = {int(chrom_ix): window for chrom_ix, window in stored.items()}
+            updated = False
+            for chrom_ix, subplot in lod.subplots.items():
+                xaxis = subplot["xaxis"]
+                if f"{xaxis}.autorange" in relayout:
+                    windows.pop(chrom_ix, None)
+                elif f"{xaxis}.range" in relayout:
+                    windows[chrom_ix] = list(relayout[f"{xaxis}.range"])
+                elif f"{xaxis}.range[0]" in relayout:
+                    windows[chrom_ix] = [
+                        relayout[f"{xaxis}.range[0]"],
+                        relayout[f"{xaxis}.range[1]"],
+                    ]
+                else:
+                    continue
+                updated = True
+
+            if not updated:
+                raise PreventUpdate
+            return lod.figure(windows), windows
+
     return app
@@ -1,425 +1,289 @@
-import pyranges as pr
-from pyranges.core.names import START_COL, END_COL
-
-from .core import coord2percent, percent2coord
-import plotly.graph_objects as go
+import numpy as np
 import pandas as pd
+import plotly.graph_objects as go
 
-from ..names import (
-    ADJSTART_COL,
-    ADJEND_COL,
-    EXON_IX_COL,
-    TEXT_PAD_COL,
-    COLOR_INFO,
-    COLOR_TAG_COL,
-    BORDER_COLOR_COL,
-    THICK_COL,
-)
-
+from .core import add_batch_traces
+from ..display_list import gene_info, draw_order
 
-def plot_direction(
-    fig,
-    strand,
-    genename,
-    item_size,
-    item_threshold,
-    start,
-    stop,
-    incl,
-    gene_ix,
-    chrom_ix,
-    exon_height,
-    arrow_color,
-    arrow_line_width,
-):
-    """Plot the direction arrow in the given item if it proceeds."""
 
-    dir_flag = 0
+def join_items(*coords):
+    """Join the points of several items in one list, separated by None to draw them independently."""
 
-    if strand:
-        # create and plot direction lines
-        if item_size <= item_threshold:
-            dir_flag = 1
-            ##diagonal_line = OX arrow extension(item middle point +- incl), OY arrow extension (item middle point + half of exon width)
-            top_plus = (
-                [(start + stop) / 2 + incl, (start + stop) / 2 - incl],
-                [gene_ix, gene_ix + exon_height / 2 - 0.01],
-            )
-            bot_plus = (
-                [(start + stop) / 2 - incl, (start + stop) / 2 + incl],
-                [gene_ix - exon_height / 2 + 0.01, gene_ix],
-            )
-            top_minus = (
-                [(start + stop) / 2 + incl, (start + stop) / 2 - incl],
-                [gene_ix - exon_height / 2 + 0.01, gene_ix],
-            )
-            bot_minus = (
-                [(start + stop) / 2 - incl, (start + stop) / 2 + incl],
-                [gene_ix, gene_ix + exon_height / 2 - 0.01],
-            )
+    pts = [np.asarray(c).astype(object) for c in coords]
+    pts.append(np.full(len(pts[0]), None))
 
-            if strand == "+":
-                arrow_bot = go.Scatter(
-                    x=bot_plus[0],
-                    y=bot_plus[1],
-                    mode="lines",
-                    line=go.scatter.Line(color=arrow_color, width=arrow_line_width),
-                    showlegend=False,
-                    name=str(genename),
-                    hoverinfo="skip",
-                )
-                arrow_top = go.Scatter(
-                    x=top_plus[0],
-                    y=top_plus[1],
-                    mode="lines",
-                    line=go.scatter.Line(color=arrow_color, width=arrow_line_width),
-                    showlegend=False,
-                    name=str(genename),
-                    hoverinfo="skip",
-                )
-                fig.add_trace(arrow_bot, row=chrom_ix + 1, col=1)
-                fig.add_trace(arrow_top, row=chrom_ix + 1, col=1)
+    return np.column_stack(pts).ravel().tolist()
 
-            elif strand == "-":
-                arrow_bot = go.Scatter(
-                    x=bot_minus[0],
-                    y=bot_minus[1],
-                    mode="lines",
-                    line=go.scatter.Line(color=arrow_color, width=arrow_line_width),
-                    showlegend=False,
-                    name=str(genename),
-                    hoverinfo="skip",
-                )
-                arrow_top = go.Scatter(
-                    x=top_minus[0],
-                    y=top_minus[1],
-                    mode="lines",
-                    line=go.scatter.Line(color=arrow_color, width=arrow_line_width),
-                    showlegend=False,
-                    name=str(genename),
-                    hoverinfo="skip",
-                )
-                fig.add_trace(arrow_bot, row=chrom_ix + 1, col=1)
-                fig.add_trace(arrow_top, row=chrom_ix + 1, col=1)
-    return dir_flag
 
+def rect_coords(x0, x1, y0, y1):
+    """Provide the vertices of the rectangles as closed polygons."""
 
-def apply_gene_bridge(
-    transcript_str,
-    text,
-    text_size,
-    df,
-    fig,
-    strand,
-    genename,
-    gene_ix,
-    chrom_ix,
-    showinfo,
-    legend,
-    return_plot,
-    arrow_size,
-    arrow_color,
-    arrow_line_width,
-    dir_flag,
-    depth_col,
-):
-    """Evaluate data and provide plot_row with right parameters."""
+    return (x0, x1, x1, x0, x0), (y0, y0, y1, y1, y0)
 
-    # If transcript structure subtract exons
-    if transcript_str:
-        cds = df[df["Feature"] == "CDS"]
-        exons = df[df["Feature"] == "exon"]
 
-        # if there are exons and cds, subtract
-        if sum([cds.empty, exons.empty]) == 2:
-            exons = exons.subtract_ranges(cds)
-        df = pr.concat([cds, exons])
+def plot_display_list(fig, display, feat_dict, tooltip, legend, render=None):
+    """Add the items of the display list to the figure."""
 
-    # Define depth order
-    if depth_col:
-        df.sort_values(depth_col, inplace=True)
+    genes = display["genes"]
+    exons = display["exons"]
+    plot_bkg = feat_dict["plot_bkg"]
+    exon_height = feat_dict["exon_height"]
+    text_mode = feat_dict["text_mode"]
 
-    df.apply(
-        plot_row,
-        args=(
-            fig,
-            strand,
-            genename,
-            gene_ix,
-            chrom_ix,
-            showinfo,
-            legend,
-            return_plot,
-            arrow_size,
-            arrow_color,
-            arrow_line_width,
-            dir_flag,
-            text,
-            text_size,
-        ),
-        axis=1,
-    )
-
-
-def plot_row(
-    row,
-    fig,
-    strand,
-    genename,
-    gene_ix,
-    chrom_ix,
-    showinfo,
-    legend,
-    return_plot,
-    arrow_size,
-    arrow_color,
-    arrow_line_width,
-    dir_flag,
-    text,
-    text_size,
-):
-    """Plot elements corresponding to one row of one gene."""
-
-    # Get the gene information to print on hover
-    # default
-    """
-    if row.get("vcf", True):
-        tooltip_col = row.get("Tooltip_col")
-        geneinfo = f"({row.__oriStart__}, {row.__oriEnd__})<br>ID: {genename}<br>{tooltip_col}"
+    # hover information of genes and intervals
+    if "vcf" in genes.columns:
+        vcf_info = (
+            "("
+            + genes["ori_start"].astype(str)
+            + ", "
+            + genes["ori_end"].astype(str)
+            + ")<br>ID: "
+            + genes["geneid"].astype(str)
+            + "<br>"
+            + genes["vcf_tooltip"].astype(str)
+        )
+        geneinfo = vcf_info.where(genes["vcf"], gene_info(genes, "<br>"))
     else:
-        if strand:
-            geneinfo = f"[{strand}] ({row.__oriStart__}, {row.__oriEnd__})<br>ID: {genename}"  # default with strand
-        else:
-            geneinfo = f"({row.__oriStart__}, {row.__oriEnd__})<br>ID: {genename}"  # default without strand
-    """
-    geneinfo = ""
-    # customized
-    showinfo_dict = row.to_dict()  # first element of gene rows
-    if showinfo:
-        if showinfo.startswith("$") and showinfo[1:] in row.index:
-            showinfo = showinfo_dict[showinfo[1:]]
-        showinfo = showinfo.replace("\n", "<br>")
-        geneinfo += "<br>" + showinfo.format(**showinfo_dict)
-
-    # consider legend
-    if legend:
-        legend = bool(row["legend_tag"])
-
-    # Exon start, stop and color
-    start = int(row[START_COL])
-    stop = int(row[END_COL])
-    exon_color = row[COLOR_INFO]
-    exon_border = row[BORDER_COLOR_COL]
-    exon_height = row[THICK_COL]
-
-    # convert to coordinates for rectangle
-    x0, x1 = start, stop
-    y0, y1 = (
-        gene_ix - exon_height / 2,
-        gene_ix + exon_height / 2,
-    )  ##gene middle point -+ half of exon size
+        geneinfo = gene_info(genes, "<br>")
+    if tooltip:
+        exoninfo = "<br>" + exons["tooltip"].astype(str)
+    else:
+        exoninfo = pd.Series("", index=exons.index)
 
-    # Plot EXON as rectangle
-    fig.add_trace(
-        go.Scatter(
-            x=[x0, x1, x1, x0, x0],
-            y=[y0, y0, y1, y1, y0],
-            fill="toself",
-            fillcolor=exon_color,
-            mode="lines",
-            line=dict(color=exon_border),
-            text=geneinfo,
-            hoverinfo="text",
-            name=str(row[COLOR_TAG_COL]),
-            showlegend=legend,
+    # gene background, same color as the first interval border if not given
+    if feat_dict["exon_border"] is None:
+        gene_border = genes["border"]
+    else:
+        gene_border = pd.Series(feat_dict["exon_border"], index=genes.index)
+    gene_y0 = genes["y"] - exon_height / 160
+    gene_y1 = genes["y"] + exon_height / 160
+
+    # exon names only for the intervals shown in the legend
+    exon_legend = exons["legend"] & legend
+    exon_name = exons["color_tag"].where(exon_legend, "")
+
+    intron_dash = np.where(display["introns"]["shrunk"], "dot", "solid")
+
+    # arrows as chevrons through the tip, from the end of the bottom segment to the top one
+    arrows = display["arrows"]
+    bot = arrows[arrows["sub"] == 0]
+    top = arrows[arrows["sub"] == 1]
+    plus = bot["sign"].to_numpy() > 0
+    arrow_entries = batch_entries(
+        "arrow",
+        bot["chrom_ix"],
+        {
+            "line_color": pd.Series(feat_dict["arrow_color"], index=bot.index),
+            "line_width": pd.Series(feat_dict["arrow_line_width"], index=bot.index),
+        },
+        (
+            np.where(plus, bot["x0"], bot["x1"]),
+            np.where(plus, bot["x1"], bot["x0"]),
+            np.where(plus, top["x1"], top["x0"]),
+        ),
+        (
+            np.where(plus, bot["y0"], bot["y1"]),
+            np.where(plus, bot["y1"], bot["y0"]),
+            np.where(plus, top["y1"], top["y0"]),
         ),
-        row=chrom_ix + 1,
-        col=1,
     )
 
-    # Add ID annotation if it is the first exon
-    if row[EXON_IX_COL] == 0 and text:
-        text_pad = row[TEXT_PAD_COL]
-        # text == True
-        if isinstance(text, bool):
-            ann = str(genename)
-        # text == '{string}'
-        else:
-            row_dict = row.to_dict()
-            ann = text.format(**row_dict)
-
-        fig.add_annotation(
-            dict(
-                x=x0 - text_pad,
-                y=(y0 + y1) / 2,
-                showarrow=False,
-                text=ann,
-                textangle=0,
-                xanchor="right",
-            ),
-            row=chrom_ix + 1,
-            col=1,
-            font={"size": text_size},
+    if render in ["batched", "webgl"]:
+        entries = []
+        gene_x, gene_y = rect_coords(genes["start"], genes["end"], gene_y0, gene_y1)
+        entries += batch_entries(
+            "gene",
+            genes["chrom_ix"],
+            {
+                "fillcolor": pd.Series(plot_bkg, index=genes.index),
+                "line_color": gene_border,
+            },
+            gene_x,
+            gene_y,
+            geneinfo,
         )
-
-    # Plot DIRECTION ARROW in EXON
-    # decide about placing a direction arrow
-    # arrow_size = coord2percent(fig, chrom_ix + 1, 0.05 * start, 0.05 * stop)
-    incl = percent2coord(fig, chrom_ix + 1, arrow_size / 2)  # how long in the plot (OX)
-
-    # create and plot lines
-    if not dir_flag:
-        plot_direction(
-            fig,
-            strand,
-            genename,
-            incl * 2,
-            stop - start,  # itself as threshold
-            start,
-            stop,
-            incl,
-            gene_ix,
-            chrom_ix,
-            exon_height,
-            arrow_color,
-            arrow_line_width,
+        introns = display["introns"]
+        entries += batch_entries(
+            "intron",
+            introns["chrom_ix"],
+            {"line_color": introns["color"], "line_dash": pd.Series(intron_dash)},
+            (introns["x0"], introns["x1"]),
+            (introns["y"], introns["y"]),
         )
-
-
-def plot_introns(
-    introns,
-    ts_chrom,
-    fig,
-    gene_ix,
-    color,
-    chrom_ix,
-    strand,
-    genename,
-    exon_height,
-    arrow_color,
-    arrow_line_width,
-    arrow_size,
-):
-    """Plot intron lines as needed."""
-
-    dir_flag = []
-
-    def apply_plot_intron(row):
-        """Plot intron df as lines."""
-
-        start = row[START_COL]
-        stop = row[END_COL]
-
-        # NOT introns off
-        if ts_chrom.empty:
-            ts_intron = pd.DataFrame()
-
-        # INTRONS OFF
-        else:
-            ts_intron = ts_chrom[
-                (ts_chrom[ADJSTART_COL] >= start) & (ts_chrom[ADJSTART_COL] < stop)
-            ].reset_index()
-
-        # Plot LINES binding exons
-        # No to-shrink regions in intron
-        if ts_intron.empty:
-            # create continuous line
-            x0, x1 = start, stop
-            y0, y1 = gene_ix, gene_ix
-            intron_line = go.Scatter(
-                x=[x0, x1],
-                y=[y0, y1],
+        exon_x, exon_y = rect_coords(exons["x0"], exons["x1"], exons["y0"], exons["y1"])
+        entries += batch_entries(
+            "exon",
+            exons["chrom_ix"],
+            {
+                "fillcolor": exons["color"],
+                "line_color": exons["border"],
+                "name": exon_name,
+            },
+            exon_x,
+            exon_y,
+            exoninfo,
+        )
+        entries += arrow_entries
+        add_batch_traces(fig, entries, legend, webgl=render == "webgl")
+        add_labels(fig, display["labels"], feat_dict["text_size"], text_mode)
+        return
+
+    # one trace per item in drawing order
+    genes_l = pd.DataFrame(
+        {
+            "chrom_ix": genes["chrom_ix"],
+            "x0": genes["start"],
+            "x1": genes["end"],
+            "y0": gene_y0,
+            "y1": gene_y1,
+            "border": gene_border,
+            "info": geneinfo,
+        }
+    ).to_dict("list")
+    introns_l = display["introns"].to_dict("list")
+    introns_l["dash"] = intron_dash.tolist()
+    exons_l = exons.to_dict("list")
+    exons_l["info"] = exoninfo.tolist()
+    exons_l["legend"] = exon_legend.tolist()
+
+    traces = []
+    rows = []
+    for kind, i in draw_order(display):
+        if kind == "genes":
+            x, y = rect_coords(
+                genes_l["x0"][i], genes_l["x1"][i], genes_l["y0"][i], genes_l["y1"][i]
+            )
+            trace = go.Scatter(
+                x=list(x),
+                y=list(y),
+                fill="toself",
+                fillcolor=plot_bkg,
                 mode="lines",
-                line=dict(color=color, width=0.7, dash="solid"),
+                line=dict(color=genes_l["border"][i], width=0),
+                hoverinfo="text",
+                text=genes_l["info"][i],
+                showlegend=False,
+            )
+            chrom_ix = genes_l["chrom_ix"][i]
+        elif kind == "introns":
+            trace = go.Scatter(
+                x=[introns_l["x0"][i], introns_l["x1"][i]],
+                y=[introns_l["y"][i], introns_l["y"][i]],
+                mode="lines",
+                line=dict(
+                    color=introns_l["color"][i], width=0.7, dash=introns_l["dash"][i]
+                ),
                 hoverinfo="skip",
                 showlegend=False,
             )
-            fig.add_trace(intron_line, row=chrom_ix + 1, col=1)
-
-        # Intron has to-shrink regions
+            chrom_ix = introns_l["chrom_ix"][i]
+        elif kind == "exons":
+            x, y = rect_coords(
+                exons_l["x0"][i], exons_l["x1"][i], exons_l["y0"][i], exons_l["y1"][i]
+            )
+            trace = go.Scatter(
+                x=list(x),
+                y=list(y),
+                fill="toself",
+                fillcolor=exons_l["color"][i],
+                mode="lines",
+                line=dict(color=exons_l["border"][i]),
+                text=exons_l["info"][i],
+                hoverinfo="text",
+                name=exons_l["color_tag"][i],
+                showlegend=exons_l["legend"][i],
+            )
+            chrom_ix = exons_l["chrom_ix"][i]
         else:
-            # alternating fixed and to-shrink regions or vice versa
-            prev_tsend = None
-
-            # Iterate over to-shrink regions
-            for ix, row in ts_intron.iterrows():
-                # (1) Add previous fixed region if needed
-                # consider intron starts with fixed region
-                if not prev_tsend and row[ADJSTART_COL] != start:
-                    prev_tsend = start
-
-                # create continuous line
-                x0, x1 = prev_tsend, row[ADJSTART_COL]
-                y0, y1 = gene_ix, gene_ix
-                intron_line = go.Scatter(
-                    x=[x0, x1],
-                    y=[y0, y1],
-                    mode="lines",
-                    line=dict(color=color, width=0.7, dash="solid"),
-                    hoverinfo="skip",
-                    showlegend=False,
-                )
-                fig.add_trace(intron_line, row=chrom_ix + 1, col=1)
-
-                # (2) Add to-shrink region
-                x0, x1 = row[ADJSTART_COL], row[ADJEND_COL]
-                y0, y1 = gene_ix, gene_ix
-                intron_line = go.Scatter(
-                    x=[x0, x1],
-                    y=[y0, y1],
-                    mode="lines",
-                    line=dict(color=color, width=0.7, dash="dot"),
+            continue
+        traces.append(trace)
+        rows.append(chrom_ix + 1)
+
+    if traces:
+        fig.add_traces(traces, rows=rows, cols=[1] * len(rows))
+    add_batch_traces(fig, arrow_entries, legend)
+    add_labels(fig, display["labels"], feat_dict["text_size"], text_mode)
+
+
+def batch_entries(kind, chrom_ix, style, xs, ys, text=None):
+    """Group the items of one kind sharing subplot and style in batch entries."""
+
+    if not len(chrom_ix):
+        return []
+
+    # items in drawing order, entries in order of appearance
+    groups = pd.DataFrame({"chrom_ix": np.asarray(chrom_ix)})
+    for name, val in style.items():
+        groups[name] = np.asarray(val)
+    indices = groups.groupby(list(groups.columns), sort=False, dropna=False).indices
+    entries = []
+    for key, ix in sorted(indices.items(), key=lambda item: item[1][0]):
+        entry_style = dict(zip(style, key[1:]))
+        # unnamed items are not shown in the legend
+        if entry_style.get("name") == "":
+            del entry_style["name"]
+        entry = {
+            "kind": kind,
+            "chrom_ix": int(key[0]),
+            "style": entry_style,
+            "x": join_items(*[np.asarray(x)[ix] for x in xs]),
+            "y": join_items(*[np.asarray(y)[ix] for y in ys]),
+            "text": [],
+        }
+        if text is not None:
+            entry["text"] = join_items(*[np.asarray(text)[ix]] * len(xs))
+        entries.append(entry)
+
+    return entries
+
+
+def add_labels(fig, labels, text_size, text_mode="trace"):
+    """Add the gene labels as one text trace per subplot or as annotations."""
+
+    if labels.empty:
+        return
+
+    # right aligned beside the first interval, shown above the rest of items
+    if text_mode == "trace":
+        traces = []
+        rows = []
+        for chrom_ix, ix in labels.groupby("chrom_ix", sort=False).indices.items():
+            traces.append(
+                go.Scatter(
+                    x=labels["x"].to_numpy()[ix],
+                    y=labels["y"].to_numpy()[ix],
+                    text=labels["text"].astype(str).to_numpy()[ix],
+                    mode="text",
+                    textposition="middle left",
+                    textfont={"size": text_size},
+                    cliponaxis=False,
                     hoverinfo="skip",
                     showlegend=False,
                 )
-                fig.add_trace(intron_line, row=chrom_ix + 1, col=1)
-
-                # (3) Add final fixed region if needed
-                if (ix == len(ts_intron) - 1) and (row[ADJEND_COL] != stop):
-                    # add last fixed region
-                    # create continuous line
-                    x0, x1 = row[ADJEND_COL], stop
-                    y0, y1 = gene_ix, gene_ix
-                    intron_line = go.Scatter(
-                        x=[x0, x1],
-                        y=[y0, y1],
-                        mode="lines",
-                        line=dict(color=color, width=0.7, dash="solid"),
-                        hoverinfo="skip",
-                        showlegend=False,
-                    )
-                    fig.add_trace(intron_line, row=chrom_ix + 1, col=1)
-
-                # store interval end for next iteration
-                prev_tsend = row[ADJEND_COL]
-
-        # Plot DIRECTION ARROW in INTRONS if strand is known
-        intron_size = coord2percent(fig, chrom_ix + 1, start, stop)
-        incl = percent2coord(
-            fig, chrom_ix + 1, arrow_size / 2
-        )  # how long in the plot (OX)
-
-        dir_flag.append(
-            plot_direction(
-                fig,
-                strand,
-                genename,
-                arrow_size,  # size of arrow as threshold
-                intron_size,
-                start,
-                stop,
-                incl,
-                gene_ix,
-                chrom_ix,
-                exon_height,
-                arrow_color,
-                arrow_line_width,
+            )
+            rows.append(int(chrom_ix) + 1)
+        fig.add_traces(traces, rows=rows, cols=[1] * len(rows))
+        return
+
+    annotations = []
+    for chrom_ix, x, y, label in zip(
+        labels["chrom_ix"].tolist(),
+        labels["x"].tolist(),
+        labels["y"].tolist(),
+        labels["text"].tolist(),
+    ):
+        subplot = fig.get_subplot(int(chrom_ix) + 1, 1)
+        annotations.append(
+            dict(
+                x=x,
+                y=y,
+                showarrow=False,
+                text=str(label),
+                textangle=0,
+                xanchor="right",
+                font={"size": text_size},
+                xref=subplot.xaxis.plotly_name.replace("axis", ""),
+                yref=subplot.yaxis.plotly_name.replace("axis", ""),
             )
         )
-
-    introns.apply(apply_plot_intron, axis=1)
-
-    if 1 in dir_flag:
-        return 1
-    else:
-        return 0
+    fig.layout.annotations += tuple(annotations)
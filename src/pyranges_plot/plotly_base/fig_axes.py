@@ -2,9 +2,7 @@ import plotly.subplots as sp
 import plotly.graph_objects as go
 import numpy as np
 import pandas as pd
-from pyranges.core.names import START_COL, END_COL
-from pyranges_plot.core import cumdelting
-from pyranges_plot.names import PR_INDEX_COL, CUM_DELTA_COL
+from pyranges_plot.names import PR_INDEX_COL
 
 
 def calculate_ticks(chrom_md_grouped, chrom, num_ticks=10):
@@ -33,7 +31,7 @@ def create_fig(
     chrmd_df_grouped,
     genesmd_df,
     id_col,
-    ts_data,
+    shrink_tf_d,
     title_chr,
     title_dict_ply,
     grid_color,
@@ -47,6 +45,7 @@ def create_fig(
     exon_height,
     plot_border,
     add_aligned_plots,
+    render=None,
 ):
     """Generate the figure and axes fitting the data."""
 
@@ -81,6 +80,18 @@ def create_fig(
         else:
             raise ValueError("add_aligned_plots must be a list.")
 
+        # aligned scatter plots drawn with WebGL too, dropping the properties it lacks
+        if render == "webgl":
+            additional_plots = [
+                go.Scattergl(
+                    {k: v for k, v in plot.to_plotly_json().items() if k != "type"},
+                    skip_invalid=True,
+                )
+                if isinstance(plot, go.Scatter)
+                else plot
+                for plot in additional_plots
+            ]
+
     # Defining vertical spacing between plots
     def_vertical_spacing = 0.25
     if custom_dict_list:
@@ -213,8 +224,7 @@ def create_fig(
                     to_add_val += original_ticks
 
                 # compute new coordinates of conserved previous ticks
-                to_add = to_add_val.copy()
-                to_add = cumdelting(to_add, ts_data, chrom)
+                to_add = shrink_tf_d[chrom].shrink(to_add_val).tolist()
 
                 # set new ticks
                 x_ticks_val = sorted(to_add)
@@ -240,28 +250,21 @@ def create_fig(
             y_ticks_val = []
             y_ticks_name = []
 
-            # gene names in y axis
-            if not packed and not y_labels:
+            # gene names in y axis, if the limits left any
+            if not packed and not y_labels and chrom in genesmd_df.index:
                 y_ticks_val = genesmd_df.loc[chrom]["ycoord"] + 0.5
                 y_ticks_val.reset_index(PR_INDEX_COL, drop=True, inplace=True)
                 y_ticks_name = y_ticks_val.index
                 y_ticks_val = y_ticks_val.to_list()
 
             # Add shrink rectangles
-            if ts_data:
-                rects_df = ts_data[chrom]
-                rects_df["cumdelta_end"] = rects_df[CUM_DELTA_COL]
-                rects_df["cumdelta_start"] = rects_df[CUM_DELTA_COL].shift(
-                    periods=1, fill_value=0
-                )
-                rects_df[START_COL] -= rects_df["cumdelta_start"]
-                rects_df[END_COL] -= rects_df["cumdelta_end"]
-
-                for a, b, c, d in zip(
-                    rects_df[START_COL],
-                    rects_df[END_COL],
-                    rects_df["cumdelta_start"],
-                    rects_df["cumdelta_end"],
+            if shrink_tf_d:
+                shrink_tf = shrink_tf_d[chrom]
+                for a, b, ori_a, ori_b in zip(
+                    shrink_tf.shrink(shrink_tf.starts),
+                    shrink_tf.shrink(shrink_tf.ends),
+                    shrink_tf.starts,
+                    shrink_tf.ends,
                 ):
                     x0, x1 = a, b
                     y0, y1 = y_min - 1, y_max + 1
@@ -273,7 +276,7 @@ def create_fig(
                             fillcolor=shrunk_bkg,
                             mode="lines",
                             line={"color": "lightyellow"},
-                            text=f"Shrinked region:\n[{x0+c} - {x1+d}]",
+                            text=f"Shrinked region:\n[{ori_a} - {ori_b}]",
                             hoverinfo="text",
                             line_width=0,
                             showlegend=False,
@@ -0,0 +1,187 @@
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+
+from .data2plot import plot_display_list
+from ..display_list import gene_info
+
+# Assumed plot width in pixels to find the genes closer than one pixel
+LOD_PIXELS = 1000
+
+
+class LevelOfDetail:
+    """
+    Display list of each subplot kept to draw only the shown region of a figure on zoom.
+
+    Parameters
+    ----------
+    skeleton: plotly.graph_objects.Figure
+        Figure with the subplots and axes, to which the shown items are added.
+
+    display: dict
+        Display list of all the genes, as given by make_display_list.
+
+    chrmd_df_grouped: pandas.DataFrame
+        Chromosomes metadata with the subplot index of each chromosome.
+
+    feat_dict, tooltip, legend, render
+        Plot features and options used to draw the items as in the whole figure.
+
+    max_items: int
+        Maximum number of intervals shown in a subplot, genes are drawn as bars beyond it.
+    """
+
+    def __init__(
+        self,
+        skeleton,
+        display,
+        chrmd_df_grouped,
+        feat_dict,
+        tooltip,
+        legend,
+        render,
+        max_items,
+    ):
+        self.skeleton = skeleton
+        self.feat_dict = feat_dict
+        self.tooltip = tooltip
+        self.legend = legend
+        self.render = render
+        self.max_items = max_items
+
+        # items of each subplot with its axes and full range
+        self.subplots = {}
+        for chrom_ix in chrmd_df_grouped["chrom_ix"]:
+            subplot = skeleton.get_subplot(int(chrom_ix) + 1, 1)
+            self.subplots[int(chrom_ix)] = {
+                "xaxis": subplot.xaxis.plotly_name,
+                "xref": subplot.xaxis.plotly_name.replace("axis", ""),
+                "yref": subplot.yaxis.plotly_name.replace("axis", ""),
+                "range": list(subplot.xaxis.range),
+                "display": {
+                    kind: table[table["chrom_ix"] == chrom_ix]
+                    for kind, table in display.items()
+                },
+            }
+
+    def figure(self, windows):
+        """Create the figure showing the items within the given range of each subplot."""
+
+        fig = go.Figure(self.skeleton)
+        shown = []
+
+        for chrom_ix, subplot in self.subplots.items():
+            x_min, x_max = windows.get(chrom_ix, subplot["range"])
+            fig.layout[subplot["xaxis"]].range = [x_min, x_max]
+            display = window_display(subplot["display"], x_min, x_max)
+
+            # too many intervals, show genes as bars
+            if len(display["exons"]) > self.max_items:
+                genes = display["genes"].assign(
+                    geneinfo=gene_info(display["genes"], "<br>")
+                )
+                bars = collapse_genes(genes, (x_max - x_min) / LOD_PIXELS)
+                bars["height"] = self.feat_dict["exon_height"]
+                bars["text"] = bars["geneinfo"]
+                rect_traces(fig, bars, subplot["xref"], subplot["yref"])
+                continue
+
+            shown.append(display)
+
+        # shown items drawn as in the whole figure
+        if shown:
+            display = {
+                kind: pd.concat([d[kind] for d in shown], ignore_index=True)
+                for kind in shown[0]
+            }
+            plot_display_list(
+                fig, display, self.feat_dict, self.tooltip, self.legend, self.render
+            )
+
+        return fig
+
+
+def window_display(display, x_min, x_max):
+    """Provide the items of the display list of the genes within the given range, and their intervals and introns in it."""
+
+    genes = display["genes"]
+    in_window = (genes["end"] >= x_min) & (genes["start"] <= x_max)
+    shown_genes = genes["gene"].to_numpy()[in_window.to_numpy()]
+
+    window = {}
+    for kind, table in display.items():
+        keep = np.isin(table["gene"].to_numpy(), shown_genes)
+        if kind in ["introns", "exons"]:
+            keep &= (table["x1"] >= x_min).to_numpy()
+            keep &= (table["x0"] <= x_max).to_numpy()
+        window[kind] = table[keep]
+
+    return window
+
+
+def collapse_genes(genes, min_gap):
+    """Merge the genes of each row closer than the given distance into single bars."""
+
+    genes = genes.sort_values(["y", "start"])
+    covered_end = genes.groupby("y")["end"].cummax()
+
+    # a bar starts with each row or after a gap of at least the given distance
+    new_row = genes["y"].to_numpy()[1:] != genes["y"].to_numpy()[:-1]
+    new_gap = genes["start"].to_numpy()[1:] > covered_end.to_numpy()[:-1] + min_gap
+    bar_ix = np.concatenate([[0], np.cumsum(new_row | new_gap)])
+
+    bars = genes.groupby(bar_ix).agg(
+        start=("start", "min"),
+        end=("end", "max"),
+        ori_start=("ori_start", "min"),
+        ori_end=("ori_end", "max"),
+        y=("y", "first"),
+        color=("color", "first"),
+        border=("border", "first"),
+        geneinfo=("geneinfo", "first"),
+        n_genes=("geneinfo", "size"),
+    )
+
+    # bars merging several genes tell how many
+    merged = bars["n_genes"] > 1
+    bars.loc[merged, "geneinfo"] = (
+        bars["n_genes"].astype(str)
+        + " genes ("
+        + bars["ori_start"].astype(str)
+        + ", "
+        + bars["ori_end"].astype(str)
+        + ")"
+    )[merged]
+
+    return bars
+
+
+def rect_traces(fig, rects, xref, yref):
+    """Add the given rectangles as one trace per fill and border color."""
+
+    for (color, border), ix in rects.groupby(
+        ["color", "border"], sort=False
+    ).indices.items():
+        x0 = rects["start"].to_numpy()[ix]
+        x1 = rects["end"].to_numpy()[ix]
+        y0 = rects["y"].to_numpy()[ix] - rects["height"].to_numpy()[ix] / 2
+        y1 = rects["y"].to_numpy()[ix] + rects["height"].to_numpy()[ix] / 2
+        nan = np.full(len(ix), np.nan)
+
+        # rectangles are separated by gaps to be drawn as independent polygons
+        fig.add_trace(
+            go.Scatter(
+                x=np.column_stack([x0, x1, x1, x0, x0, nan]).ravel(),
+                y=np.column_stack([y0, y0, y1, y1, y0, nan]).ravel(),
+                text=np.repeat(rects["text"].to_numpy()[ix], 6),
+                fill="toself",
+                fillcolor=color,
+                mode="lines",
+                line_color=border,
+                hoverinfo="text",
+                hoveron="points+fills",
+                showlegend=False,
+                xaxis=xref,
+                yaxis=yref,
+            )
+        )
@@ -0,0 +1,132 @@
+import numpy as np
+import pandas as pd
+from PIL import Image, ImageColor
+
+
+def to_rgba(colors):
+    """Convert the given colors to an array of RGBA values, unknown colors are black."""
+
+    # each distinct color converted once
+    codes, uniques = pd.factorize(pd.Series(list(colors), dtype=object))
+    rgba = np.zeros((len(uniques) + 1, 4), dtype=np.uint8)
+    rgba[:, 3] = 255
+    for i, color in enumerate(uniques):
+        if isinstance(color, str):
+            try:
+                rgba[i] = ImageColor.getcolor(color, "RGBA")
+            except ValueError:
+                pass
+        else:
+            # Matplotlib tuples with values between 0 and 1
+            values = np.asarray(color, dtype=float)
+            if values.max() <= 1:
+                values = values * 255
+            rgba[i, : len(values)] = np.round(values)
+
+    return rgba[codes]
+
+
+def create_canvas(width, height):
+    """Provide an empty canvas of the given size in pixels."""
+
+    width, height = int(width), int(height)
+    return {
+        "width": width,
+        "height": height,
+        "image": np.zeros((height, width, 4), dtype=np.uint8),
+        "rects": [],
+    }
+
+
+def pixel_rects(x0, x1, y0, y1, rgba):
+    """Round rectangles given in pixel coordinates to whole pixels, at least one in each direction."""
+
+    x0 = np.floor(np.asarray(x0, dtype=float)).astype(int)
+    y0 = np.floor(np.asarray(y0, dtype=float)).astype(int)
+    x1 = np.maximum(np.floor(np.asarray(x1, dtype=float)).astype(int), x0 + 1)
+    y1 = np.maximum(np.floor(np.asarray(y1, dtype=float)).astype(int), y0 + 1)
+    rgba = np.broadcast_to(np.asarray(rgba, dtype=np.uint8), (len(x0), 4))
+
+    return x0, x1, y0, y1, rgba
+
+
+def fill_rects(canvas, x0, x1, y0, y1, rgba):
+    """Paint a few large rectangles, such as backgrounds, straight into the canvas."""
+
+    image = canvas["image"]
+    for a, b, c, d, color in zip(*pixel_rects(x0, x1, y0, y1, rgba)):
+        image[max(c, 0) : max(d, 0), max(a, 0) : max(b, 0)] = color
+
+
+def add_rects(canvas, x0, x1, y0, y1, rgba):
+    """Add filled rectangles given in pixel coordinates, from x0 to x1 and y0 to y1 not included."""
+
+    canvas["rects"].append(pixel_rects(x0, x1, y0, y1, rgba))
+
+
+def add_segments(canvas, x0, y0, x1, y1, rgba):
+    """Add one pixel wide line segments given in pixel coordinates."""
+
+    x0, y0, x1, y1 = (np.asarray(c, dtype=float) for c in (x0, y0, x1, y1))
+
+    # one point per pixel along the longest direction
+    n_pts = np.ceil(np.maximum(np.abs(x1 - x0), np.abs(y1 - y0))).astype(int) + 1
+    seg = np.repeat(np.arange(len(x0)), n_pts)
+    step = (np.arange(n_pts.sum()) - np.repeat(np.cumsum(n_pts) - n_pts, n_pts)) / (
+        np.maximum(n_pts - 1, 1)[seg]
+    )
+    x = x0[seg] + (x1 - x0)[seg] * step
+    y = y0[seg] + (y1 - y0)[seg] * step
+    rgba = np.broadcast_to(np.asarray(rgba, dtype=np.uint8), (len(x0), 4))[seg]
+    add_rects(canvas, x, x + 1, y, y + 1, rgba)
+
+
+def rasterize(canvas):
+    """Paint the added rectangles over the filled ones, in the order they were added, and provide the RGBA image array."""
+
+    width = canvas["width"]
+    height = canvas["height"]
+    if not canvas["rects"]:
+        return canvas["image"]
+    x0, x1, y0, y1, rgba = (
+        np.concatenate([rects[i] for rects in canvas["rects"]]) for i in range(5)
+    )
+
+    # rectangles within the canvas
+    x0, x1 = np.clip(x0, 0, width), np.clip(x1, 0, width)
+    y0, y1 = np.clip(y0, 0, height), np.clip(y1, 0, height)
+    shown = (x1 > x0) & (y1 > y0)
+    item = np.flatnonzero(shown)
+    x0, x1, y0, y1 = x0[shown], x1[shown], y0[shown], y1[shown]
+
+    # rectangles to row spans and spans to pixels
+    n_rows = y1 - y0
+    span = np.repeat(np.arange(len(item)), n_rows)
+    row = (
+        y0[span]
+        + np.arange(n_rows.sum())
+        - np.repeat(np.cumsum(n_rows) - n_rows, n_rows)
+    )
+    n_px = (x1 - x0)[span]
+    px_span = np.repeat(np.arange(len(span)), n_px)
+    px = (
+        row[px_span] * width
+        + x0[span][px_span]
+        + np.arange(n_px.sum())
+        - np.repeat(np.cumsum(n_px) - n_px, n_px)
+    )
+
+    # each pixel takes the color of the last rectangle covering it
+    top = np.full(width * height, -1)
+    np.maximum.at(top, px, item[span][px_span])
+    image = canvas["image"].reshape(width * height, 4)
+    painted = top >= 0
+    image[painted] = rgba[top[painted]]
+
+    return canvas["image"]
+
+
+def write_png(image, to_file):
+    """Write the RGBA image array as a PNG file."""
+
+    Image.fromarray(image, "RGBA").save(to_file, format="png")
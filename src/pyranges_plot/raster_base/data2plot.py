@@ -0,0 +1,49 @@
+from .core import add_rects, add_segments, to_rgba
+from ..display_list import to_px_x, to_px_y
+
+
+def plot_display_list(canvas, boxes, display, feat_dict):
+    """Add the items of the display list to the canvas, each kind at once."""
+
+    # intron lines one pixel high
+    introns = display["introns"]
+    chrom_ix = introns["chrom_ix"].to_numpy()
+    y = to_px_y(boxes, chrom_ix, introns["y"].to_numpy())
+    add_rects(
+        canvas,
+        to_px_x(boxes, chrom_ix, introns["x0"].to_numpy()),
+        to_px_x(boxes, chrom_ix, introns["x1"].to_numpy()),
+        y,
+        y + 1,
+        to_rgba(introns["color"]),
+    )
+
+    # intervals as a border rectangle with the filled one inside
+    exons = display["exons"]
+    chrom_ix = exons["chrom_ix"].to_numpy()
+    x0 = to_px_x(boxes, chrom_ix, exons["x0"].to_numpy())
+    x1 = to_px_x(boxes, chrom_ix, exons["x1"].to_numpy())
+    y0 = to_px_y(boxes, chrom_ix, exons["y1"].to_numpy())
+    y1 = to_px_y(boxes, chrom_ix, exons["y0"].to_numpy())
+    add_rects(canvas, x0, x1, y0, y1, to_rgba(exons["border"]))
+    inner = (x1 - x0 > 2) & (y1 - y0 > 2)
+    add_rects(
+        canvas,
+        x0[inner] + 1,
+        x1[inner] - 1,
+        y0[inner] + 1,
+        y1[inner] - 1,
+        to_rgba(exons["color"][inner]),
+    )
+
+    # direction arrows as line segments
+    arrows = display["arrows"]
+    chrom_ix = arrows["chrom_ix"].to_numpy()
+    add_segments(
+        canvas,
+        to_px_x(boxes, chrom_ix, arrows["x0"].to_numpy()),
+        to_px_y(boxes, chrom_ix, arrows["y0"].to_numpy()),
+        to_px_x(boxes, chrom_ix, arrows["x1"].to_numpy()),
+        to_px_y(boxes, chrom_ix, arrows["y1"].to_numpy()),
+        to_rgba([feat_dict["arrow_color"]]),
+    )
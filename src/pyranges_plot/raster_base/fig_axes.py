@@ -0,0 +1,48 @@
+import numpy as np
+
+from .core import create_canvas, fill_rects, to_rgba
+from ..display_list import plot_boxes, to_px_x
+
+
+def create_fig(width, height, chrmd_df_grouped, shrink_tf_d, feat_dict):
+    """Generate the canvas and the pixel box of each plot fitting the data."""
+
+    # plots one below the other with a small margin around them
+    canvas = create_canvas(width, height)
+    margin = max(2, round(0.03 * min(width, height)))
+    boxes = plot_boxes(width, height, chrmd_df_grouped, feat_dict["v_spacer"], margin)
+
+    # figure background, plot border and plot background
+    fill_rects(canvas, [0], [width], [0], [height], to_rgba([feat_dict["fig_bkg"]]))
+    fill_rects(
+        canvas,
+        boxes["left"] - 1,
+        boxes["right"] + 1,
+        boxes["top"] - 1,
+        boxes["bottom"] + 1,
+        to_rgba([feat_dict["plot_border"]]),
+    )
+    fill_rects(
+        canvas,
+        boxes["left"],
+        boxes["right"],
+        boxes["top"],
+        boxes["bottom"],
+        to_rgba([feat_dict["plot_bkg"]]),
+    )
+
+    # shrunk regions across the whole plot height
+    if shrink_tf_d:
+        for chrom, ix in chrmd_df_grouped["chrom_ix"].items():
+            shrink_tf = shrink_tf_d[chrom]
+            n_regions = len(shrink_tf.starts)
+            fill_rects(
+                canvas,
+                to_px_x(boxes, ix, shrink_tf.shrink(shrink_tf.starts)),
+                to_px_x(boxes, ix, shrink_tf.shrink(shrink_tf.ends)),
+                np.full(n_regions, boxes["top"][ix]),
+                np.full(n_regions, boxes["bottom"][ix]),
+                to_rgba([feat_dict["shrunk_bkg"]]),
+            )
+
+    return canvas, boxes
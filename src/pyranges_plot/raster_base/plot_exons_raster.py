@@ -0,0 +1,51 @@
+from .core import rasterize, write_png
+from .fig_axes import create_fig
+from .data2plot import plot_display_list
+from ..display_list import make_display_list, merge_subpixel
+
+
+def plot_exons_raster(
+    subdf,
+    depth_col,
+    feat_dict,
+    genesmd_df,
+    chrmd_df_grouped,
+    ts_data,
+    id_col,
+    transcript_str=False,
+    to_file=None,
+    file_size=None,
+    shrink_tf_d=None,
+):
+    """Create raster image, written as PNG or returned as an RGBA array."""
+
+    if to_file is not None and not to_file.endswith(".png"):
+        raise Exception("The raster engine can only export '.png' files.")
+
+    # Create canvas and plot boxes
+    width, height = file_size
+    canvas, boxes = create_fig(width, height, chrmd_df_grouped, shrink_tf_d, feat_dict)
+
+    # Plot genes, items under one pixel are merged and text is not drawn
+    display = make_display_list(
+        subdf,
+        genesmd_df,
+        chrmd_df_grouped,
+        ts_data,
+        id_col,
+        feat_dict,
+        transcript_str,
+        depth_col,
+        False,
+        file_size,
+    )
+    display = merge_subpixel(
+        display, chrmd_df_grouped, boxes["right"][0] - boxes["left"][0]
+    )
+    plot_display_list(canvas, boxes, display, feat_dict)
+    image = rasterize(canvas)
+
+    # Provide output
+    if to_file is None:
+        return image
+    write_png(image, to_file)
@@ -0,0 +1,103 @@
+import numpy as np
+from pyranges.core.names import CHROM_COL, START_COL, END_COL
+
+from .core import get_id_col
+
+
+class RegionIndex:
+    """
+    Index of the genes of a PyRanges object to plot several regions of it.
+
+    Intervals are sorted by chromosome and gene start once, so the genes overlapping a region are
+    found by binary search instead of scanning all the data.
+
+    Parameters
+    ----------
+    data: pyranges.PyRanges
+        Pyranges or derived dataframe with annotation data.
+
+    id_col: {str, list}, default None
+        Name of the column containing gene ID. When None, the one defined with set_id_col() is used
+        or, if not defined, each interval is considered a gene.
+
+    Examples
+    --------
+    >>> import pyranges as pr, pyranges_plot as prp
+
+    >>> index = prp.RegionIndex(gtf, id_col="transcript_id")
+
+    >>> prp.plot(index, region=("1", 10000, 60000))
+    """
+
+    def __init__(self, data, id_col=None):
+        if id_col is None:
+            id_col = get_id_col()
+        if isinstance(id_col, str):
+            id_col = [id_col]
+        self.data = data
+        self.id_col = id_col
+
+        # genes as groups of intervals, single intervals if no id_col
+        if id_col:
+            gene_ix = data.groupby(
+                [CHROM_COL] + id_col, observed=True, sort=False, dropna=False
+            ).ngroup()
+            gene_ix = gene_ix.to_numpy()
+        else:
+            gene_ix = np.arange(len(data))
+        n_genes = gene_ix.max() + 1 if len(data) else 0
+
+        # gene spans
+        starts = data[START_COL].to_numpy()
+        ends = data[END_COL].to_numpy()
+        gene_start = np.full(n_genes, np.iinfo(np.int64).max)
+        gene_end = np.full(n_genes, np.iinfo(np.int64).min)
+        np.minimum.at(gene_start, gene_ix, starts)
+        np.maximum.at(gene_end, gene_ix, ends)
+
+        # rows sorted by chromosome and gene start, contiguous for each gene
+        chrom_ix, chroms = data[CHROM_COL].factorize()
+        chrom_ix = np.asarray(chrom_ix)
+        self.rows = np.lexsort((gene_ix, gene_start[gene_ix], chrom_ix))
+        sorted_genes = gene_ix[self.rows]
+        gene_first = np.flatnonzero(
+            np.concatenate([[True], sorted_genes[1:] != sorted_genes[:-1]])
+        )
+        gene_bounds = np.append(gene_first, len(self.rows))
+
+        # per chromosome sorted gene starts and running maximum of gene ends
+        genes = sorted_genes[gene_first]
+        genes_chrom = chrom_ix[self.rows[gene_first]]
+        chrom_bounds = np.searchsorted(genes_chrom, np.arange(len(chroms) + 1))
+        self.chroms = {}
+        for i, chrom in enumerate(chroms):
+            b, e = chrom_bounds[i], chrom_bounds[i + 1]
+            self.chroms[chrom] = {
+                "start": gene_start[genes[b:e]],
+                "end": gene_end[genes[b:e]],
+                "end_cummax": np.maximum.accumulate(gene_end[genes[b:e]]),
+                "row_bounds": gene_bounds[b : e + 1],
+            }
+
+    def query(self, chrom, start, end):
+        """Provide the intervals of the genes overlapping the given region."""
+
+        if chrom not in self.chroms:
+            return self.data.iloc[[]]
+        genes = self.chroms[chrom]
+
+        # genes starting before the region end and not all ending before its start
+        lo = np.searchsorted(genes["end_cummax"], start, side="right")
+        hi = np.searchsorted(genes["start"], end, side="left")
+        cand = np.arange(lo, hi)
+        cand = cand[genes["end"][cand] > start]
+
+        # rows of the overlapping genes
+        row_lo = genes["row_bounds"][cand]
+        row_hi = genes["row_bounds"][cand + 1]
+        n_rows = row_hi - row_lo
+        pos = np.repeat(row_lo - np.cumsum(n_rows) + n_rows, n_rows) + np.arange(
+            n_rows.sum()
+        )
+
+        return self.data.iloc[self.rows[pos]]
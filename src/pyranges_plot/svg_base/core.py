@@ -0,0 +1,70 @@
+import numpy as np
+import pandas as pd
+from xml.sax.saxutils import escape, quoteattr
+
+# Chevron of each arrow direction in a unit box, tip at the end for + and at the start for -
+ARROW_POINTS = {"plus": "0,0 1,0.5 0,1", "minus": "1,0 0,0.5 1,1"}
+
+
+def svg_color(color):
+    """Provide the CSS value of a color given as string or Matplotlib tuple."""
+
+    if isinstance(color, str):
+        return color
+    values = np.asarray(color, dtype=float)
+    if values.max() <= 1:
+        values = values * 255
+    return "rgb({}, {}, {})".format(*np.round(values[:3]).astype(int))
+
+
+def color_classes(prefix, colors, prop):
+    """Provide the CSS class of each distinct color, by its string, and the style rules defining them."""
+
+    colors = pd.Series(list(colors), dtype=object)
+    values = colors.groupby(colors.astype(str), sort=False).first()
+    classes = {key: f"{prefix}{i}" for i, key in enumerate(values.index)}
+    rules = [
+        f".{classes[key]} {{{prop}: {svg_color(color)}}}"
+        for key, color in values.items()
+    ]
+
+    return classes, rules
+
+
+def write_header(f, width, height, feat_dict, rules):
+    """Write the svg opening tag and the definitions shared by all the items."""
+
+    arrow_color = svg_color(feat_dict["arrow_color"])
+    arrow_width = feat_dict["arrow_line_width"]
+    f.write(
+        '<svg xmlns="http://www.w3.org/2000/svg" xmlns:xlink="http://www.w3.org/1999/xlink" '
+        f'width="{width}" height="{height}" viewBox="0 0 {width} {height}">\n'
+    )
+    f.write("<defs>\n")
+    for direction, points in ARROW_POINTS.items():
+        f.write(
+            f'<symbol id="arrow-{direction}" viewBox="0 0 1 1" preserveAspectRatio="none" overflow="visible">'
+            f'<polyline points="{points}" fill="none" stroke="{arrow_color}" stroke-width="{arrow_width}" '
+            'stroke-linecap="round" vector-effect="non-scaling-stroke"/></symbol>\n'
+        )
+    f.write("<style>\n")
+    f.write(".intron {stroke-width: 0.7; fill: none}\n")
+    f.write(".shrunk {stroke-dasharray: 2 2}\n")
+    f.write("\n".join(rules) + "\n")
+    f.write("</style>\n</defs>\n")
+
+
+def title(text):
+    """Provide the title element with the given tooltip text, Plotly line breaks as newlines."""
+
+    text = str(text).replace("<br>", "\n")
+    return f"<title>{escape(text)}</title>"
+
+
+def text_element(x, y, text, size, color, anchor):
+    """Provide a text element vertically centered at the given position."""
+
+    return (
+        f'<text x="{x:.2f}" y="{y:.2f}" font-size="{size}" fill={quoteattr(svg_color(color))} '
+        f'text-anchor="{anchor}" dominant-baseline="central" font-family="sans-serif">{escape(str(text))}</text>'
+    )
@@ -0,0 +1,304 @@
+import io
+
+import numpy as np
+import pandas as pd
+from pyranges.core.names import CHROM_COL
+
+from .core import color_classes, write_header, title, text_element, svg_color
+from ..names import PR_INDEX_COL, COLOR_INFO, BORDER_COLOR_COL, TOOLTIP_COL
+from ..data_preparation import format_tooltips
+from ..display_list import (
+    make_display_list,
+    cull_labels,
+    draw_order,
+    gene_info,
+    plot_boxes,
+    to_px_x,
+    to_px_y,
+)
+
+# Number of genes whose display list is built and written at once
+CHUNK_GENES = 1000
+
+
+def plot_exons_svg(
+    subdf,
+    depth_col,
+    feat_dict,
+    genesmd_df,
+    chrmd_df_grouped,
+    ts_data,
+    id_col,
+    transcript_str=False,
+    tooltip=None,
+    text=True,
+    title_chr=None,
+    to_file=None,
+    file_size=None,
+    shrink_tf_d=None,
+):
+    """Create SVG plot, written to file or returned as string."""
+
+    if to_file is not None and not to_file.endswith(".svg"):
+        raise Exception("The svg engine can only export '.svg' files.")
+
+    # Place plots leaving space for the titles
+    width, height = file_size
+    margin = max(2, round(0.03 * min(width, height)))
+    title_space = 1.5 * feat_dict["title_dict_ply"]["size"]
+    boxes = plot_boxes(
+        width, height, chrmd_df_grouped, feat_dict["v_spacer"], margin, title_space
+    )
+
+    # Provide output
+    args = (
+        subdf,
+        depth_col,
+        feat_dict,
+        genesmd_df,
+        chrmd_df_grouped,
+        ts_data,
+        id_col,
+        transcript_str,
+        tooltip,
+        text,
+        title_chr,
+        file_size,
+        shrink_tf_d,
+        boxes,
+    )
+    if to_file is None:
+        f = io.StringIO()
+        write_svg(f, *args)
+        return f.getvalue()
+    with open(to_file, "w") as f:
+        write_svg(f, *args)
+
+
+def write_svg(
+    f,
+    subdf,
+    depth_col,
+    feat_dict,
+    genesmd_df,
+    chrmd_df_grouped,
+    ts_data,
+    id_col,
+    transcript_str,
+    tooltip,
+    text,
+    title_chr,
+    file_size,
+    shrink_tf_d,
+    boxes,
+):
+    """Write the plots and then the items of the genes, building the display list of a few genes at a time."""
+
+    # one css class per color of the data, arrows as one symbol per direction
+    classes = {}
+    classes["fill"], fill_rules = color_classes("f", subdf[COLOR_INFO], "fill")
+    classes["border"], border_rules = color_classes(
+        "b", subdf[BORDER_COLOR_COL], "stroke"
+    )
+    if feat_dict["intron_color"] is None:
+        intron_colors = subdf[COLOR_INFO]
+    else:
+        intron_colors = [feat_dict["intron_color"]]
+    classes["intron"], intron_rules = color_classes("i", intron_colors, "stroke")
+    write_header(f, *file_size, feat_dict, fill_rules + border_rules + intron_rules)
+    write_plots(f, boxes, chrmd_df_grouped, shrink_tf_d, feat_dict, title_chr)
+
+    # rows of the genes in chunks, in plotting order and keeping the data order
+    gene_ix = (
+        subdf.groupby(id_col + [PR_INDEX_COL, CHROM_COL], observed=True)
+        .ngroup()
+        .to_numpy()
+    )
+    gene_rows = np.argsort(gene_ix, kind="stable")
+    n_genes = int(np.nanmax(gene_ix, initial=-1)) + 1
+    limits = np.minimum(np.arange(0, n_genes + CHUNK_GENES, CHUNK_GENES), n_genes)
+    bounds = np.searchsorted(gene_ix[gene_rows], limits)
+
+    # labels are culled against the ones kept in previous chunks
+    chunk_feat = dict(feat_dict, text_cull=False)
+    kept_labels = None
+
+    opened = False
+    gene_labels = []
+    for c in range(len(limits) - 1):
+        chunk_df = subdf.iloc[np.sort(gene_rows[bounds[c] : bounds[c + 1]])]
+        if tooltip:
+            chunk_df = chunk_df.assign(
+                **{TOOLTIP_COL: format_tooltips(tooltip, chunk_df, "\n")}
+            )
+        display = make_display_list(
+            chunk_df,
+            genesmd_df,
+            chrmd_df_grouped,
+            ts_data,
+            id_col,
+            chunk_feat,
+            transcript_str,
+            depth_col,
+            text,
+            file_size,
+        )
+        if feat_dict["text_cull"]:
+            labels = pd.concat(
+                [kept_labels, display["labels"].assign(new=True)], ignore_index=True
+            )
+            labels["new"] = labels["new"].fillna(False).astype(bool)
+            kept_labels = cull_labels(
+                labels,
+                chrmd_df_grouped,
+                feat_dict["text_size"],
+                feat_dict["v_spacer"],
+                file_size,
+            )
+            display["labels"] = kept_labels[kept_labels["new"]].reset_index(drop=True)
+            kept_labels["new"] = False
+
+        # each gene as a group carrying its tooltip
+        elements = item_elements(display, classes, boxes, feat_dict, tooltip)
+        for kind, pos in draw_order(display):
+            # labels written after the clipped group of their gene, so the ones left of the plot show
+            if kind == "labels":
+                gene_labels.append(elements[kind][pos])
+                continue
+            # the group of the previous gene is closed when the next one starts
+            if kind == "genes" and opened:
+                f.write("</g>\n")
+                f.writelines(gene_labels)
+                gene_labels = []
+            opened = True
+            f.write(elements[kind][pos])
+    if opened:
+        f.write("</g>\n")
+    f.writelines(gene_labels)
+    f.write("</svg>\n")
+
+
+def write_plots(f, boxes, chrmd_df_grouped, shrink_tf_d, feat_dict, title_chr):
+    """Write the figure background and the frame, title and shrunk regions of each plot."""
+
+    title_dict = feat_dict["title_dict_ply"]
+    f.write(
+        f'<rect width="100%" height="100%" fill="{svg_color(feat_dict["fig_bkg"])}"/>\n'
+    )
+    for chrom, ix in chrmd_df_grouped["chrom_ix"].items():
+        left, right = boxes["left"][ix], boxes["right"][ix]
+        top, bottom = boxes["top"][ix], boxes["bottom"][ix]
+        f.write(
+            f'<clipPath id="plot{ix}"><rect x="{left}" y="{top:.2f}" '
+            f'width="{right - left}" height="{bottom - top:.2f}"/></clipPath>\n'
+        )
+        f.write(
+            f'<rect x="{left}" y="{top:.2f}" width="{right - left}" height="{bottom - top:.2f}" '
+            f'fill="{svg_color(feat_dict["plot_bkg"])}" stroke="{svg_color(feat_dict["plot_border"])}"/>\n'
+        )
+        f.write(
+            text_element(
+                (left + right) / 2,
+                top - 0.75 * title_dict["size"],
+                title_chr.format(**{"chrom": chrom}),
+                title_dict["size"],
+                title_dict["color"],
+                "middle",
+            )
+            + "\n"
+        )
+
+        # shrunk regions across the whole plot height
+        if shrink_tf_d:
+            shrink_tf = shrink_tf_d[chrom]
+            x0 = to_px_x(boxes, ix, shrink_tf.shrink(shrink_tf.starts))
+            x1 = to_px_x(boxes, ix, shrink_tf.shrink(shrink_tf.ends))
+            for a, b in zip(x0, x1):
+                f.write(
+                    f'<rect x="{a:.2f}" y="{top:.2f}" width="{b - a:.2f}" height="{bottom - top:.2f}" '
+                    f'fill="{svg_color(feat_dict["shrunk_bkg"])}"/>\n'
+                )
+
+
+def item_elements(display, classes, boxes, feat_dict, tooltip):
+    """Provide the svg element of each item of the display list."""
+
+    elements = {}
+
+    # genes open their group, clipped to their plot
+    genes = display["genes"]
+    elements["genes"] = [
+        f'<g clip-path="url(#plot{ix})">{title(info)}\n'
+        for ix, info in zip(genes["chrom_ix"], gene_info(genes, "\n"))
+    ]
+
+    # intron lines, dashed when shrunk
+    introns = display["introns"]
+    ix = introns["chrom_ix"].to_numpy()
+    y = to_px_y(boxes, ix, introns["y"].to_numpy())
+    elements["introns"] = [
+        f'<line x1="{a:.2f}" y1="{yy:.2f}" x2="{b:.2f}" y2="{yy:.2f}" class="intron {cls}{" shrunk" if shrunk else ""}"/>\n'
+        for a, b, yy, cls, shrunk in zip(
+            to_px_x(boxes, ix, introns["x0"].to_numpy()),
+            to_px_x(boxes, ix, introns["x1"].to_numpy()),
+            y,
+            [classes["intron"][str(color)] for color in introns["color"]],
+            introns["shrunk"],
+        )
+    ]
+
+    # intervals as rectangles, with their own tooltip if given
+    exons = display["exons"]
+    ix = exons["chrom_ix"].to_numpy()
+    x0 = to_px_x(boxes, ix, exons["x0"].to_numpy())
+    x1 = to_px_x(boxes, ix, exons["x1"].to_numpy())
+    y0 = to_px_y(boxes, ix, exons["y1"].to_numpy())
+    y1 = to_px_y(boxes, ix, exons["y0"].to_numpy())
+    tips = exons["tooltip"] if tooltip else [None] * len(exons)
+    elements["exons"] = [
+        f'<rect x="{a:.2f}" y="{c:.2f}" width="{b - a:.2f}" height="{d - c:.2f}" class="{fill} {border}"'
+        + (f">{title(tip)}</rect>\n" if tip is not None else "/>\n")
+        for a, b, c, d, fill, border, tip in zip(
+            x0,
+            x1,
+            y0,
+            y1,
+            [classes["fill"][str(color)] for color in exons["color"]],
+            [classes["border"][str(color)] for color in exons["border"]],
+            tips,
+        )
+    ]
+
+    # arrows as one symbol use per pair of segments, in the box of both segments
+    arrows = display["arrows"]
+    ix = arrows["chrom_ix"].to_numpy()[::2]
+    xs = arrows[["x0", "x1"]].to_numpy().reshape(-1, 4)
+    ys = arrows[["y0", "y1"]].to_numpy().reshape(-1, 4)
+    x0 = to_px_x(boxes, ix, xs.min(axis=1))
+    x1 = to_px_x(boxes, ix, xs.max(axis=1))
+    y0 = to_px_y(boxes, ix, ys.max(axis=1))
+    y1 = to_px_y(boxes, ix, ys.min(axis=1))
+    elements["arrows"] = []
+    for a, b, c, d, sign in zip(x0, x1, y0, y1, arrows["sign"].to_numpy()[::2]):
+        direction = "plus" if sign > 0 else "minus"
+        elements["arrows"] += [
+            f'<use xlink:href="#arrow-{direction}" x="{a:.2f}" y="{c:.2f}" width="{b - a:.2f}" height="{d - c:.2f}"/>\n',
+            "",
+        ]
+
+    # gene labels beside the first interval
+    labels = display["labels"]
+    ix = labels["chrom_ix"].to_numpy()
+    elements["labels"] = [
+        text_element(
+            x, y, label, feat_dict["text_size"], feat_dict["plot_border"], "end"
+        )
+        + "\n"
+        for x, y, label in zip(
+            to_px_x(boxes, ix, labels["x"].to_numpy()),
+            to_px_y(boxes, ix, labels["y"].to_numpy()),
+            labels["text"],
+        )
+    ]
+
+    return elements
@@ -1,5 +1,16 @@
 import pyranges as pr
-from pyranges_plot.data_preparation import make_subset
+import numpy as np
+import pandas as pd
+from pyranges_plot.data_preparation import (
+    make_subset,
+    genesmd_packed,
+    format_template,
+    template_columns,
+    limits_filter,
+    split_utr,
+)
+from pyranges_plot.introns_off import ShrinkTransform, introns_resize, get_introns
+from pyranges_plot.region_index import RegionIndex
 
 
 def test_subset():
@@ -127,3 +138,182 @@ def test_subset():
     )
 
     assert len(result_subset_5) == len(expected_subset_5)
+
+
+def test_packed():
+    # Genes are placed by start in the lowest row where they do not overlap
+    genesmd_df = pd.DataFrame(
+        {
+            "Chromosome": ["1"] * 5 + ["2"] * 2,
+            "__pr_ix__": [0] * 7,
+            "transcript_id": ["T1", "T2", "T3", "T4", "T5", "T6", "T7"],
+            "Start": [500, 300, 4500, 3700, 100, 1, 20],
+            "End": [3700, 3900, 5700, 4000, 200, 60, 50],
+        }
+    ).set_index(["Chromosome", "__pr_ix__", "transcript_id"])
+
+    result = genesmd_packed(genesmd_df)
+
+    assert result["ycoord"].to_list() == [1, 0, 0, 1, 0, 0, 1]
+
+
+def test_packed_many():
+    # Same rows as placing the genes by start in the first row where they fit
+    rng = np.random.default_rng(0)
+    n = 20000
+    starts = rng.integers(0, 1000000, n)
+    genesmd_df = pd.DataFrame(
+        {
+            "Chromosome": rng.choice(["1", "2", "3"], n),
+            "__pr_ix__": rng.integers(0, 2, n),
+            "transcript_id": [f"T{i}" for i in range(n)],
+            "Start": starts,
+            "End": starts + rng.integers(1, 5000, n),
+        }
+    ).set_index(["Chromosome", "__pr_ix__", "transcript_id"])
+
+    result = genesmd_packed(genesmd_df.copy())
+
+    expected = {}
+    for _, subdf in genesmd_df.groupby(level=[0, 1]):
+        row_ends = []
+        for id, start, end in subdf.sort_values("Start", kind="stable")[
+            ["Start", "End"]
+        ].itertuples():
+            row = next(
+                (r for r, row_end in enumerate(row_ends) if row_end <= start),
+                len(row_ends),
+            )
+            if row == len(row_ends):
+                row_ends.append(end)
+            else:
+                row_ends[row] = end
+            expected[id] = row
+
+    assert result["ycoord"].to_dict() == expected
+
+
+def test_split_utr():
+    df = pd.DataFrame(
+        {
+            "Chromosome": ["1"] * 6,
+            "__pr_ix__": [0] * 6,
+            "transcript_id": ["t1"] * 4 + ["t2"] * 2,
+            "Feature": ["exon", "CDS", "CDS", "exon", "exon", "CDS"],
+            "Start": [0, 10, 30, 45, 100, 90],
+            "End": [50, 20, 40, 60, 110, 120],
+        }
+    )
+    result = split_utr(df, ["transcript_id"])
+
+    # Exons lose the parts covered by the CDS of their transcript
+    exons = result[result["Feature"] == "exon"]
+    assert exons[["Start", "End"]].values.tolist() == [
+        [0, 10],
+        [20, 30],
+        [40, 50],
+        [45, 60],
+    ]
+    assert (result["Feature"] == "CDS").sum() == 3
+
+
+def test_format_template():
+    df = pd.DataFrame(
+        {"transcript_id": ["T1", "T2"], "Start": [10, 20], "score": [0.123, 2.0]},
+        index=[0, 0],
+    )
+
+    # Template referring to columns is formatted as str.format would do
+    template = "{transcript_id!r}: {Start} ({score:.1f}) {{x}}"
+    result = format_template(template, df)
+    expected = [template.format(**row) for row in df.to_dict("records")]
+
+    assert list(result) == expected
+    assert template_columns(template) == ["transcript_id", "Start", "score"]
+    assert template_columns("{gene_name[:4]}") == ["gene_name"]
+
+
+def test_shrink_transform():
+    # Two to-shrink regions, shrunk to 10 bases each
+    ts_chrom = pd.DataFrame(
+        {"Start": [100, 500], "End": [300, 600], "__cumdelta__": [190, 280]}
+    )
+    shrink_tf = ShrinkTransform(ts_chrom)
+
+    ori = [50, 100, 300, 400, 500, 600, 700]
+    shrunk = [50, 100, 110, 210, 310, 320, 420]
+
+    assert shrink_tf.shrink(ori).tolist() == shrunk
+    assert shrink_tf.expand(shrunk).tolist() == ori
+
+
+def test_introns_resize():
+    # Gaps of the covered union longer than 50 are shrunk to 50, per chromosome
+    df = pd.DataFrame(
+        {
+            "Chromosome": ["1", "1", "1", "2", "1"],
+            "Start": [500, 100, 150, 100, 1000],
+            "End": [600, 200, 300, 120, 1100],
+            "__shrink_threshold__": [50] * 5,
+        }
+    )
+    ts_data = {}
+    result = introns_resize(df, ts_data)
+
+    assert ts_data["1"][["Start", "End", "__cumdelta__"]].values.tolist() == [
+        [300, 500, 150],
+        [600, 1000, 500],
+    ]
+    assert ts_data["2"].empty
+    assert result["__Start_adj__"].to_list() == [350, 100, 150, 100, 500]
+    assert result["__End_adj__"].to_list() == [450, 200, 300, 120, 600]
+
+
+def test_get_introns():
+    # Gaps of the union of each group, sorted by group and start
+    group = np.array([1, 0, 0, 0, 1, 1])
+    starts = np.array([100, 40, 0, 20, 300, 150])
+    ends = np.array([200, 50, 10, 45, 400, 160])
+    result = get_introns(group, starts, ends)
+
+    assert [r.tolist() for r in result] == [[0, 1], [10, 200], [20, 300]]
+
+
+def test_limits_filter():
+    df = pd.DataFrame(
+        {
+            "Chromosome": ["1", "1", "1", "1", "2"],
+            "Start": [10, 300, 500, 900, 10],
+            "End": [100, 400, 600, 1000, 20],
+            "transcript_id": ["T1", "T1", "T2", "T3", "T4"],
+        }
+    )
+
+    # Whole genes overlapping the window are kept, other chromosomes unfiltered
+    result = limits_filter(df, {"1": (350, 700)}, ["transcript_id"])
+    assert result["transcript_id"].to_list() == ["T1", "T1", "T2", "T4"]
+
+    # Tuple limits apply to all chromosomes, None leaves a side open
+    result = limits_filter(df, (None, 50), ["transcript_id"])
+    assert result["transcript_id"].to_list() == ["T1", "T1", "T4"]
+
+    # The margin widens the window by a fraction of its range
+    result = limits_filter(df, {"1": (650, 850)}, ["transcript_id"], margin=0.3)
+    assert result["transcript_id"].to_list() == ["T2", "T3", "T4"]
+
+
+def test_region_index():
+    df = pr.PyRanges(
+        {
+            "Chromosome": ["1", "1", "1", "1", "2"],
+            "Start": [900, 10, 300, 500, 10],
+            "End": [1000, 100, 400, 600, 20],
+            "transcript_id": ["T3", "T1", "T1", "T2", "T4"],
+        }
+    )
+    index = RegionIndex(df, id_col="transcript_id")
+
+    # Whole genes overlapping the region, in start order
+    assert index.query("1", 350, 550)["transcript_id"].to_list() == ["T1", "T1", "T2"]
+    assert index.query("1", 600, 900).empty
+    assert index.query("3", 0, 100).empty
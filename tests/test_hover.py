@@ -0,0 +1,62 @@
+import matplotlib.pyplot as plt
+from matplotlib.backend_bases import MouseEvent
+import pyranges as pr
+import pyranges_plot as prp
+
+data = pr.PyRanges(
+    {
+        "Chromosome": ["1"] * 5,
+        "Strand": ["+", "+", "-", "-", "-"],
+        "Start": [100, 500, 50, 300, 2000],
+        "End": [200, 600, 90, 400, 2100],
+        "transcript_id": ["t1", "t1", "t2", "t2", "t2"],
+    }
+)
+
+
+def hover_at(fig, ax, x, y):
+    """Simulate the mouse moving to the given data coordinates."""
+
+    x_px, y_px = ax.transData.transform((x, y))
+    event = MouseEvent("motion_notify_event", fig.canvas, x_px, y_px)
+    fig.canvas.callbacks.process("motion_notify_event", event)
+
+    return [t.get_text() for t in ax.texts if t.get_visible() and "ID:" in t.get_text()]
+
+
+def test_hover():
+    prp.set_engine("plt")
+    for render in [None, "batched"]:
+        prp.plot(data, id_col="transcript_id", render=render, packed=False)
+        fig = plt.gcf()
+        ax = fig.axes[0]
+        fig.canvas.draw()
+        labels = [t.get_text() for t in ax.get_yticklabels()]
+        y_t1 = ax.get_yticks()[labels.index("t1")]
+
+        # exon and intron of t1
+        (exon_info,) = hover_at(fig, ax, 150, y_t1)
+        assert exon_info.startswith("[+] (100, 200)\nID: t1")
+        assert hover_at(fig, ax, 350, y_t1) == ["[+] (100, 600)\nID: t1"]
+
+        # nothing under the cursor
+        assert hover_at(fig, ax, 1500, y_t1) == []
+        plt.close(fig)
+
+
+def test_hover_tooltip_column():
+    prp.set_engine("plt")
+    tips = data.copy()
+    tips["tip"] = ["Start: {Start}\nEnd: {End}"] * 2 + ["{Start}<br>{End}"] * 3
+    prp.plot(tips, id_col="transcript_id", tooltip="$tip", packed=False)
+    fig = plt.gcf()
+    ax = fig.axes[0]
+    fig.canvas.draw()
+    labels = [t.get_text() for t in ax.get_yticklabels()]
+
+    # templates taken from the column, line breaks as newlines
+    (exon_info,) = hover_at(fig, ax, 150, ax.get_yticks()[labels.index("t1")])
+    assert exon_info.endswith("\nStart: 100\nEnd: 200")
+    (exon_info,) = hover_at(fig, ax, 350, ax.get_yticks()[labels.index("t2")])
+    assert exon_info.endswith("\n300\n400")
+    plt.close(fig)
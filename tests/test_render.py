@@ -0,0 +1,522 @@
+import json
+
+import matplotlib.pyplot as plt
+import numpy as np
+import plotly.graph_objects as go
+from PIL import Image
+import pytest
+import pyranges as pr
+import pyranges_plot as prp
+from pyranges_plot.display_list import ORDER_COLS, make_display_list, merge_subpixel
+
+data = pr.PyRanges(
+    {
+        "Chromosome": ["1"] * 9 + ["2"] * 3,
+        "Strand": ["+", "+", "-", "-", "-", "+", "+", "+", "-", "+", "+", "+"],
+        "Start": [i * 100 for i in [5, 35, 3, 13, 35, 45, 49, 56, 60, 1, 10, 20]],
+        "End": [i * 100 for i in [15, 37, 6, 17, 39, 47, 51, 57, 67, 5, 15, 30]],
+        "transcript_id": ["t1"] * 2 + ["t2"] * 3 + ["t3"] * 3 + ["t4"] + ["t5"] * 3,
+    }
+)
+
+
+def test_batched_ply():
+    prp.set_engine("ply")
+    fig_default = prp.plot(data, id_col="transcript_id", return_plot="fig")
+    fig_batched = prp.plot(
+        data, id_col="transcript_id", render="batched", return_plot="fig"
+    )
+
+    # fewer traces but the same intervals and labels
+    assert len(fig_batched.data) < len(fig_default.data)
+    exon_polygons = sum(
+        list(trace.x).count(None)
+        for trace in fig_batched.data
+        if trace.fill == "toself"
+        and trace.hoverinfo == "text"
+        and trace.line.width != 0
+    )
+    assert exon_polygons == len(data)
+    assert len(fig_batched.layout.annotations) == len(fig_default.layout.annotations)
+
+
+def test_arrows_ply():
+    prp.set_engine("ply")
+    fig = prp.plot(data, id_col="transcript_id", arrow_color="red", return_plot="fig")
+
+    # one chevron path trace per subplot
+    arrow_traces = [trace for trace in fig.data if trace.line.color == "red"]
+    assert len(arrow_traces) == 2
+    for trace in arrow_traces:
+        assert len(trace.x) > 0
+        assert len(trace.x) == 4 * list(trace.x).count(None)
+
+
+def test_webgl_ply():
+    prp.set_engine("ply")
+    batched = prp.plot(
+        data, id_col="transcript_id", render="batched", return_plot="fig"
+    )
+    webgl = prp.plot(data, id_col="transcript_id", render="webgl", return_plot="fig")
+
+    # the batched traces drawn with WebGL, labels stay as text traces
+    gl_traces = [trace for trace in webgl.data if trace.type == "scattergl"]
+    batch_traces = [trace for trace in batched.data if trace.mode == "lines"]
+    assert [trace.x for trace in gl_traces] == [trace.x for trace in batch_traces]
+    assert [trace.mode for trace in webgl.data[-2:]] == ["text", "text"]
+
+    # aligned scatter plots drawn with WebGL too, other traces unchanged
+    track = go.Scatter(x=[0, 1000], y=[0, 1], name="track", cliponaxis=False)
+    bars = go.Bar(x=[0, 1000], y=[1, 2], name="bars")
+    for plot, kind in [(track, "scattergl"), (bars, "bar")]:
+        fig = prp.plot(
+            data[data["Chromosome"] == "1"],
+            render="webgl",
+            add_aligned_plots=[(plot, {"title": plot.name})],
+            return_plot="fig",
+        )
+        assert [trace.type for trace in fig.data if trace.name == plot.name] == [kind]
+
+
+def test_labels_ply():
+    prp.set_engine("ply")
+    fig = prp.plot(data, id_col="transcript_id", return_plot="fig")
+
+    # one text trace per subplot by default
+    text_traces = [trace for trace in fig.data if trace.mode == "text"]
+    assert len(text_traces) == 2
+    assert sorted(sum([list(trace.text) for trace in text_traces], [])) == [
+        "t1",
+        "t2",
+        "t3",
+        "t4",
+        "t5",
+    ]
+    n_titles = len(fig.layout.annotations)
+
+    # layout annotations as an option
+    fig = prp.plot(
+        data, id_col="transcript_id", text_mode="annotation", return_plot="fig"
+    )
+    assert len(fig.layout.annotations) == n_titles + 5
+    assert not [trace for trace in fig.data if trace.mode == "text"]
+
+
+def test_text_cull():
+    dense = pr.PyRanges(
+        {
+            "Chromosome": ["1"] * 50,
+            "Start": [i * 30 for i in range(50)],
+            "End": [i * 30 + 10 for i in range(50)],
+            "transcript_id": [f"gene_{i:02}" for i in range(50)],
+        }
+    )
+    prp.set_engine("ply")
+    fig = prp.plot(dense, id_col="transcript_id", max_shown=50, return_plot="fig")
+    assert len(fig.data[-1].text) == 50
+
+    # labels overlapping a previous one are dropped, the first one is kept
+    fig = prp.plot(
+        dense, id_col="transcript_id", max_shown=50, text_cull=True, return_plot="fig"
+    )
+    culled = list(fig.data[-1].text)
+    assert culled[0] == "gene_00"
+    assert 10 < len(culled) < 50
+    assert len(np.unique(np.diff(fig.data[-1].x))) == 1
+
+
+def test_batched_plt():
+    prp.set_engine("plt")
+    prp.plot(data, render="batched")
+    fig = plt.gcf()
+
+    # one collection per kind of item in each axis, no individual patches
+    for ax in fig.axes:
+        assert len(ax.collections) == 3
+        assert not ax.patches
+    exon_rects = sum(len(ax.collections[1].get_paths()) for ax in fig.axes)
+    assert exon_rects == len(data)
+    plt.close(fig)
+
+
+def test_dash_lod():
+    prp.set_engine("ply")
+    app = prp.plot(data, id_col="transcript_id", return_plot="app", dash_lod=3)
+    fig = app.layout.children[0].children[-1].figure
+    update_lod = app.callback_map["..genes-plot.figure...lod-windows.data.."][
+        "callback"
+    ].__wrapped__
+
+    def n_rects(fig, xaxis):
+        # gene bars separated by gaps or one trace per interval, gene backgrounds aside
+        return sum(
+            max(np.isnan(np.asarray(trace.x, dtype=float)).sum(), 1)
+            for trace in fig.data
+            if trace.fill == "toself" and trace.xaxis == xaxis and trace.line.width != 0
+        )
+
+    # whole range with more intervals than the limit shows gene bars
+    assert n_rects(fig, "x") == 4
+
+    # zooming in shows the intervals in the new range
+    fig, windows = update_lod({"xaxis.range[0]": 400, "xaxis.range[1]": 1600}, {})
+    assert n_rects(fig, "x") == 3
+    assert list(fig.layout.xaxis.range) == [400, 1600]
+
+    # the range is kept in the session, other sessions keep theirs
+    windows = {str(k): v for k, v in windows.items()}
+    fig, windows = update_lod({"xaxis2.range": [0, 3000]}, windows)
+    assert list(fig.layout.xaxis.range) == [400, 1600]
+    fig, _ = update_lod({"xaxis2.range": [0, 3000]}, {})
+    assert n_rects(fig, "x") == 4
+
+
+def test_dash_lod_window():
+    prp.set_engine("ply")
+    kargs = dict(id_col="transcript_id", shrink=True, legend=True)
+    full = prp.plot(data, return_plot="fig", **kargs)
+    app = prp.plot(data, return_plot="app", dash_lod=100, **kargs)
+    update_lod = app.callback_map["..genes-plot.figure...lod-windows.data.."][
+        "callback"
+    ].__wrapped__
+
+    def traces(fig):
+        return [
+            json.dumps(t, sort_keys=True) for t in json.loads(fig.to_json())["data"]
+        ]
+
+    # the whole range draws the same items as the whole figure
+    fig = app.layout.children[0].children[-1].figure
+    assert traces(fig) == traces(full)
+
+    # a zoomed window draws the items of the whole figure within it, arrows aside
+    fig, _ = update_lod({"xaxis.range": [400, 1600]}, {})
+    items = [
+        t
+        for t, trace in zip(traces(fig), fig.data)
+        if trace.x is not None
+        and len(trace.x)
+        and not (trace.hoverinfo == "skip" and trace.line.width != 0.7)
+    ]
+    assert 0 < len(items) < len(traces(full))
+    assert set(items) <= set(traces(full))
+    assert any('"dash": "dot"' in t for t in items)
+
+
+def test_dash_lod_strand():
+    prp.set_engine("ply")
+    unstranded = data.copy()
+    unstranded["Strand"] = np.nan
+    app = prp.plot(unstranded, id_col="transcript_id", return_plot="app", dash_lod=3)
+    fig = app.layout.children[0].children[-1].figure
+
+    # no strand in the hover of the gene bars of the first plot
+    texts = [
+        t
+        for trace in fig.data
+        if trace.xaxis == "x" and trace.text is not None
+        for t in trace.text
+    ]
+    assert texts and not any("[nan]" in str(t) for t in texts)
+
+
+def test_prepare():
+    prp.set_engine("ply")
+    prepared = prp.prepare(data, id_col="transcript_id", shrink=True)
+    subdf = prepared.subdf.copy()
+
+    # rendering the prepared data matches plot
+    fig = prepared.render(return_plot="fig")
+    fig_plot = prp.plot(data, id_col="transcript_id", shrink=True, return_plot="fig")
+    assert fig.to_json() == fig_plot.to_json()
+
+    # restyled renders leave the prepared data unchanged
+    fig_dark = prepared.render(return_plot="fig", theme="dark")
+    assert fig_dark.layout.paper_bgcolor != fig.layout.paper_bgcolor
+    assert prepared.subdf.equals(subdf)
+
+    # placement features belong to the preparation
+    with pytest.raises(Exception):
+        prepared.render(return_plot="fig", exon_height=0.2)
+    with pytest.raises(Exception):
+        prepared.subdf = subdf
+
+
+def test_cache():
+    prp.set_engine("ply")
+    prp.set_cache(max_entries=2)
+    try:
+        first = prp.prepare(data, id_col="transcript_id")
+        assert prp.prepare(data, id_col="transcript_id") is first
+        assert prp.get_cache_info()["hits"] == 1
+
+        # other content or options are prepared again
+        changed = data.copy()
+        changed["End"] += 10
+        assert prp.prepare(changed, id_col="transcript_id") is not first
+        assert prp.prepare(data, id_col="transcript_id", packed=False) is not first
+        info = prp.get_cache_info()
+        assert info["misses"] == 3
+        assert info["entries"] == 2
+
+        # least recently used entry was discarded
+        assert prp.prepare(data, id_col="transcript_id") is not first
+
+        # columns not used by the options are not compared
+        second = prp.prepare(data, id_col="transcript_id")
+        extra = data.copy()
+        extra["score"] = range(len(extra))
+        assert prp.prepare(extra, id_col="transcript_id") is second
+        assert (
+            prp.prepare(extra, id_col="transcript_id", tooltip="{score}") is not second
+        )
+    finally:
+        prp.set_cache(0)
+    assert prp.get_cache_info()["entries"] == 0
+
+
+def test_prepare_columns():
+    wide = data.copy()
+    wide["gene_name"] = wide["transcript_id"].str.upper()
+    wide["unused"] = 0
+
+    # only the selected genes and the referred columns are kept
+    prepared = prp.prepare(
+        wide, id_col="transcript_id", max_shown=2, columns=["gene_name"]
+    )
+    assert "unused" not in prepared.subdf.columns
+    assert "gene_name" in prepared.subdf.columns
+    assert set(prepared.subdf["transcript_id"]) == {"t1", "t2"}
+    assert wide.columns.to_list()[-1] == "unused"
+
+    # all columns kept by default
+    assert "unused" in prp.prepare(wide, id_col="transcript_id").subdf.columns
+
+
+def test_display_list():
+    prepared = prp.prepare(data, id_col="transcript_id")
+    display = make_display_list(
+        prepared.subdf,
+        prepared.genesmd_df,
+        prepared.chrmd_df_grouped,
+        prepared.ts_data,
+        prepared.id_col,
+        prepared.feat_dict,
+    )
+
+    # one item per gene, interval and gap between intervals of a gene
+    assert display["genes"]["geneid"].to_list() == ["t1", "t2", "t3", "t4", "t5"]
+    assert len(display["exons"]) == len(data)
+    assert len(display["introns"]) == 7
+    assert display["labels"]["text"].to_list() == ["t1", "t2", "t3", "t4", "t5"]
+
+    # arrows as pairs of segments, every table in drawing order
+    assert len(display["arrows"]) % 2 == 0
+    for table in display.values():
+        ordered = table.sort_values(ORDER_COLS, kind="stable")
+        assert ordered.index.equals(table.index)
+
+
+def test_display_list_nan_ids(tmp_path):
+    gff = prp.ncbi_gff()
+    prepared = prp.prepare(gff, id_col="gene_id", max_shown=30)
+    display = make_display_list(
+        prepared.subdf,
+        prepared.genesmd_df,
+        prepared.chrmd_df_grouped,
+        prepared.ts_data,
+        prepared.id_col,
+        prepared.feat_dict,
+    )
+
+    # rows without id are not plotted
+    assert len(display["exons"]) == gff["gene_id"].notna().sum()
+
+    # by any engine
+    prepared.render(engine="plt", to_file=str(tmp_path / "t.png"))
+    prepared.render(engine="ply", return_plot="fig")
+    prepared.render(engine="raster")
+    prepared.render(engine="svg")
+
+
+def test_merge_subpixel():
+    prepared = prp.prepare(data, id_col="transcript_id")
+    display = make_display_list(
+        prepared.subdf,
+        prepared.genesmd_df,
+        prepared.chrmd_df_grouped,
+        prepared.ts_data,
+        prepared.id_col,
+        prepared.feat_dict,
+    )
+
+    # nothing changes when every item is wider than a pixel
+    same = merge_subpixel(display, prepared.chrmd_df_grouped, 1600)
+    assert len(same["exons"]) == len(display["exons"])
+    assert len(same["introns"]) == len(display["introns"])
+
+    # at 10 px wide, intervals of a gene closer than a pixel are one span and arrows are dropped
+    small = merge_subpixel(display, prepared.chrmd_df_grouped, 10)
+    assert len(small["exons"]) < len(display["exons"])
+    assert len(small["introns"]) < len(display["introns"])
+    assert small["arrows"].empty
+    assert small["exons"]["x1"].max() == display["exons"]["x1"].max()
+    ordered = small["exons"].sort_values(ORDER_COLS, kind="stable")
+    assert ordered.index.equals(small["exons"].index)
+
+
+def test_raster(tmp_path):
+    prepared = prp.prepare(data, id_col="transcript_id")
+    image = prepared.render(engine="raster", theme="dark")
+
+    # RGBA array of the figure size, painted with the theme colors
+    assert image.shape == (800, 1600, 4)
+    assert image[0, 0].tolist() == [31, 31, 31, 255]
+    assert (image == [51, 102, 204, 255]).all(axis=2).any()
+
+    # written as PNG, other formats are not supported
+    prepared.render(engine="raster", to_file=(str(tmp_path / "t.png"), (400, 100)))
+    assert Image.open(tmp_path / "t.png").size == (400, 100)
+    with pytest.raises(Exception):
+        prepared.render(engine="raster", to_file=str(tmp_path / "t.pdf"))
+
+
+def test_svg(tmp_path, monkeypatch):
+    prepared = prp.prepare(data, id_col="transcript_id", tooltip="{Start}")
+    svg = prepared.render(engine="svg")
+    display = make_display_list(
+        prepared.subdf,
+        prepared.genesmd_df,
+        prepared.chrmd_df_grouped,
+        prepared.ts_data,
+        prepared.id_col,
+        prepared.feat_dict,
+    )
+
+    # one group per gene and one symbol use per arrow
+    assert svg.startswith("<svg") and svg.endswith("</svg>\n")
+    assert svg.count("<g clip-path") == 5
+    assert svg.count('<symbol id="arrow-') == 2
+    assert svg.count("<use ") == len(display["arrows"]) // 2
+    assert svg.count("<text") == 2 + len(display["labels"])
+
+    # same output written a few genes at a time, default tooltip lines kept
+    small = str(tmp_path / "small.svg")
+    prepared.render(engine="svg", to_file=(small, (60, 40)), text_cull=True)
+    culled = open(small).read()
+    monkeypatch.setattr(prp.svg_base.plot_exons_svg, "CHUNK_GENES", 1)
+    assert prepared.render(engine="svg") == svg
+    prepared.render(engine="svg", to_file=(small, (60, 40)), text_cull=True)
+    assert open(small).read() == culled and culled.count("<text") < svg.count("<text")
+    default = prp.prepare(data, id_col="transcript_id").render(engine="svg")
+    assert "&lt;br&gt;" not in default and "\n" in default.split("<title>")[-1]
+
+    # tooltip templates taken from a column
+    tips = data.copy()
+    tips["tip"] = "Start: {Start}\nEnd: {End}"
+    tip_svg = prp.prepare(tips, id_col="transcript_id", tooltip="$tip").render(
+        engine="svg"
+    )
+    assert "<title>Start: 500\nEnd: 1500</title>" in tip_svg
+    assert "$tip" not in tip_svg
+
+    # labels outside the groups clipped to the plots
+    clipped = False
+    for line in svg.splitlines():
+        clipped = line.startswith("<g clip-path") or (clipped and line != "</g>")
+        assert not (clipped and line.startswith("<text"))
+
+    # written as SVG, other formats are not supported
+    prepared.render(engine="svg", to_file=str(tmp_path / "t.svg"))
+    assert (tmp_path / "t.svg").read_text() == svg
+    with pytest.raises(Exception):
+        prepared.render(engine="svg", to_file=str(tmp_path / "t.pdf"))
+
+
+def test_export_many(tmp_path):
+    prepared = prp.prepare(data, id_col="transcript_id")
+    fig = prepared.render(engine="ply", return_plot="fig")
+    paths = [str(tmp_path / name) for name in ["t.svg", "t.png", "fig.png"]]
+    futures = prp.export_many([prepared, prepared, fig], paths, workers=2, engine="svg")
+
+    # futures give the paths once written, workers kept for the next call
+    assert futures[0].result() == paths[0]
+    assert (tmp_path / "t.svg").read_text() == prepared.render(engine="svg")
+    with pytest.raises(Exception):
+        futures[1].result()
+    assert Image.open(futures[2].result()).size == (700, 500)
+    pool = prp.export.EXPORT_POOL
+    prp.export_many([prepared], [paths[0]], workers=2, engine="svg")[0].result()
+    assert prp.export.EXPORT_POOL is pool
+    prp.shutdown_export_pool()
+
+    # one path per figure
+    with pytest.raises(Exception):
+        prp.export_many([prepared], paths)
+
+
+def test_plt_file(tmp_path):
+    prepared = prp.prepare(data, id_col="transcript_id", shrink=True)
+    plt.close("all")
+    for render in [None, "batched"]:
+        prepared.render(
+            engine="plt",
+            to_file=(str(tmp_path / "t.png"), (400, 100)),
+            render=render,
+            file_dpi=200,
+        )
+
+        # built outside pyplot, image size given by the dpi
+        assert plt.get_fignums() == []
+        assert Image.open(tmp_path / "t.png").size == (800, 200)
+
+        # intervals, introns and arrows as an image inside the pdf
+        prepared.render(engine="plt", to_file=str(tmp_path / "t.pdf"), render=render)
+        assert b"/Subtype /Image" not in (tmp_path / "t.pdf").read_bytes()
+        prepared.render(
+            engine="plt",
+            to_file=str(tmp_path / "t.pdf"),
+            render=render,
+            file_rasterized=True,
+        )
+        assert b"/Subtype /Image" in (tmp_path / "t.pdf").read_bytes()
+
+
+def test_limits_empty_window():
+    prepared = prp.prepare(data, id_col="transcript_id", limits=(15000, 25000))
+
+    # every chromosome keeps its plot, with no gene drawn
+    assert list(prepared.chrmd_df_grouped.index) == ["1", "2"]
+    assert prepared.subdf.empty
+    assert prepared.render(engine="svg").count("<g clip-path") == 0
+    prepared.render(engine="ply", return_plot="fig")
+
+
+def test_limits_past_max_shown():
+    many = pr.PyRanges(
+        {
+            "Chromosome": ["1"] * 40 + ["2"],
+            "Strand": ["+"] * 41,
+            "Start": [i * 1000 for i in range(40)] + [0],
+            "End": [i * 1000 + 500 for i in range(40)] + [500],
+            "transcript_id": [f"t{i:02d}" for i in range(41)],
+        }
+    )
+
+    # genes in the window are selected before max_shown, counted for the warning
+    prepared = prp.prepare(
+        many, id_col="transcript_id", max_shown=10, limits=(30000, 35500)
+    )
+    assert sorted(prepared.subdf["transcript_id"]) == [f"t{i}" for i in range(30, 36)]
+    assert prepared.subset_warn == 0
+    assert prepared.render(engine="svg").count("<g clip-path") == 6
+
+    # the chromosome without genes in the window keeps its plot and limits
+    assert list(prepared.chrmd_df_grouped.index) == ["1", "2"]
+    assert list(prepared.chrmd_df_grouped.loc["2", "min_max"]) == [30000, 35500]
+
+    prepared = prp.prepare(
+        many, id_col="transcript_id", max_shown=10, limits=(0, 25000)
+    )
+    assert prepared.subdf["transcript_id"].nunique() == 10
+    assert prepared.subset_warn == 1